@@ -20,6 +20,7 @@ class Product extends Model
         'base_price',
         'main_image_url',
         'gallery',
+        'thumbnail_url',
     ];
 
     protected $casts = [
@@ -9,10 +9,18 @@ class ProductVariant extends Model
     protected $fillable = [
         'product_id',
         'sku',
+        'source_sku',
+        'import_key',
         'name',
         'price',
         'stock_quantity',
         'attributes',
+        'variant_attributes',
+        'weight_kg',
+        'length_cm',
+        'width_cm',
+        'height_cm',
+        'volumetric_weight_kg',
         'is_active',
     ];
 
@@ -20,9 +28,26 @@ class ProductVariant extends Model
         'price' => 'decimal:2',
         'stock_quantity' => 'integer',
         'attributes' => 'array',
+        'variant_attributes' => 'array',
+        'weight_kg' => 'decimal:3',
+        'length_cm' => 'decimal:2',
+        'width_cm' => 'decimal:2',
+        'height_cm' => 'decimal:2',
+        'volumetric_weight_kg' => 'decimal:3',
         'is_active' => 'boolean',
     ];
 
+    /**
+     * Weight shipping is charged on: the larger of the actual and the
+     * volumetric weight (both stored by the import), or null if neither is known.
+     */
+    public function billableWeightKg(): ?float
+    {
+        $weights = array_filter([$this->weight_kg, $this->volumetric_weight_kg], fn ($weight) => $weight !== null);
+
+        return $weights ? (float) max(array_map('floatval', $weights)) : null;
+    }
+
     public function product()
     {
         return $this->belongsTo(Product::class);
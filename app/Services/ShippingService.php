@@ -33,11 +33,9 @@ public function getShippingOptions(Commune $userCommune, Collection $cartItems):
         // For simplicity, we get all unique shipping classes involved
         $shippingClassIds = $cartItems->map(fn($item) => $item->productVariant->product->shipping_class_id)->unique();
         
-        // Calculate weight (assuming weight is on variant or product, fallback to 1kg for now if not set)
-        // Note: Product model needs a weight attribute potentially, or we assume a default
+        // Billable weight stored per variant by the import (actual vs volumetric), 1kg when the sheet had no measures
         foreach ($cartItems as $item) {
-             // Future: Add weight to ProductVariant or Product
-             $weight = $item->productVariant->weight ?? 1.0; 
+             $weight = $item->productVariant->billableWeightKg() ?? 1.0;
              $totalWeight += $weight * $item->quantity;
         }
 
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from catalog_import.instrumentation import git_revision, peak_rss_mb
+from catalog_import.output import JsonArrayWriter
+from catalog_import.reader import open_workbook, product_sheet_names, sheet_frames
+from catalog_import.schema import CACHE_DIR, scan_sheet
+from catalog_import.synthetic import write_workbook
+from catalog_import.transform import build_column_plan, transform_sheet
+
+DEFAULT_ROWS = [1000, 10000, 100000]
+STAGES = ['open', 'header', 'read', 'transform', 'serialize']
+
+
+def synthetic_workbook(rows, sheets, attributes, seed):
+    """Path of the synthetic workbook for these parameters, generated on first use."""
+    path = os.path.join(CACHE_DIR, 'bench', f"synthetic-r{rows}-s{sheets}-a{attributes}-seed{seed}.xlsx")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.xlsx"
+        write_workbook(tmp_path, rows, sheets, attributes, seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def run_stages(path, rows):
+    """Time each stage of the import on one workbook. Runs in a fresh process so peak RSS is its own."""
+    stages = {}
+
+    def finish(stage, started):
+        seconds = time.perf_counter() - started
+        stages[stage] = {
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds) if seconds else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    started = time.perf_counter()
+    workbook = open_workbook(path)
+    sheet_names = product_sheet_names(workbook)
+    finish('open', started)
+
+    started = time.perf_counter()
+    schemas = [scan_sheet(workbook[name], name) for name in sheet_names]
+    finish('header', started)
+
+    # Frames are kept so that reading and transforming are timed separately
+    started = time.perf_counter()
+    sheets = []
+    for schema in schemas:
+        columns, frames = sheet_frames(workbook[schema.sheet_name], schema.header_row or 0)
+        sheets.append((schema.sheet_name, columns, list(frames)))
+    workbook.close()
+    finish('read', started)
+
+    started = time.perf_counter()
+    products = []
+    for sheet_name, columns, frames in sheets:
+        plan = build_column_plan(columns)
+        for df in frames:
+            products.extend(transform_sheet(df, plan, sheet_name, 'outdoor'))
+    finish('transform', started)
+
+    started = time.perf_counter()
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as f:
+        writer = JsonArrayWriter(f)
+        for product in products:
+            writer.write(product)
+        writer.close()
+        size = f.tell()
+    finish('serialize', started)
+
+    return {"products": len(products), "export_bytes": size, "stages": stages}
+
+
+def previous_result(path, params):
+    """The last result recorded in path for the same parameters, or None."""
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            result = json.loads(line)
+            if all(result.get(k) == v for k, v in params.items()):
+                last = result
+    return last
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the import stages on synthetic Fichas técnicas workbooks.")
+    parser.add_argument('--rows', default=','.join(map(str, DEFAULT_ROWS)),
+                        help="comma-separated product row counts (default: 1000,10000,100000)")
+    parser.add_argument('--sheets', type=int, default=4, help="product sheets per workbook (default: 4)")
+    parser.add_argument('--attributes', type=int, default=20,
+                        help="attribute columns per sheet, not counting _UNIT columns (default: 20)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the generator (default: 0)")
+    parser.add_argument('--results', default='benchmark_results.jsonl',
+                        help="JSON-lines file the results are appended to (default: benchmark_results.jsonl)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    revision = git_revision()
+
+    for rows in [int(r) for r in args.rows.split(',')]:
+        params = {"rows": rows, "sheets": args.sheets, "attributes": args.attributes, "seed": args.seed}
+        started = time.perf_counter()
+        path = synthetic_workbook(rows, args.sheets, args.attributes, args.seed)
+        print(f"\n{rows} rows x {args.sheets} sheets x {args.attributes} attributes "
+              f"({os.path.getsize(path) / 1024:.0f} KiB, ready in {time.perf_counter() - started:.1f}s)")
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            measured = executor.submit(run_stages, path, rows).result()
+
+        result = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "commit": revision,
+            "python": platform.python_version(),
+            **params,
+            **measured,
+            "total_seconds": round(sum(s['seconds'] for s in measured['stages'].values()), 4),
+        }
+        previous = previous_result(args.results, params)
+
+        for stage in STAGES:
+            s = result['stages'][stage]
+            line = f"  {stage:<10} {s['seconds']:9.3f}s {s['rows_per_second'] or 0:>10} rows/s {s['peak_rss_mb']:8.1f} MiB peak"
+            if previous:
+                before = previous['stages'][stage]['seconds']
+                line += f"   {(s['seconds'] - before) / before * 100 if before else 0:+6.1f}% vs {previous['commit']}"
+            print(line)
+        print(f"  {'total':<10} {result['total_seconds']:9.3f}s  {result['products']} products")
+
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    print(f"\nAppended to {args.results}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+"""Shared helpers for turning the MercadoLibre "Fichas técnicas" exports into
+the JSON consumed by ImportExcelProductsSeeder."""
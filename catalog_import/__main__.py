@@ -0,0 +1,3 @@
+from catalog_import.cli import main
+
+main()
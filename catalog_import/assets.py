@@ -0,0 +1,396 @@
+"""Product images: the sheets' picture URLs, fetched once into the app's public storage.
+
+MercadoLibre exports list a listing's pictures as URLs in one or more
+picture columns (schema.ALIASES "image"), several per cell. transform_sheet()
+extracts them into each record's "images"; with --fetch-images the generator
+runs them through ImagePipeline before the records are exported, which sets
+"main_image_url", "gallery" and "thumbnail_url" to files the app serves.
+
+- Fetching is I/O bound: a sheet's new URLs are fetched concurrently from an
+  asyncio loop, at most `connections` at a time. Each worker thread keeps one
+  keep-alive connection per host (the pictures come from a handful of CDN
+  hosts), so TLS handshakes are not paid per image. Connection errors,
+  timeouts, 429 and 5xx responses are retried with exponential backoff.
+- Files are content-addressed: named after the SHA-256 of their bytes under
+  storage/app/public/products/import/ (the "public" disk the admin panel
+  uploads to), so the same picture behind two URLs is stored once.
+  .import_cache/assets/index.json maps every URL to its file, so later runs
+  fetch only URLs they have not seen; URLs that answered 4xx are remembered
+  as missing too.
+- Only pictures are stored: a response that is not image/*, or whose bytes
+  Pillow cannot open (without Pillow: whose magic bytes are not those of a
+  JPEG, PNG, WebP, GIF or AVIF), is remembered as missing like a 4xx, and
+  a file's extension is that of the type its bytes turned out to be.
+- Thumbnails are CPU bound and made on a process pool, with Pillow; without
+  Pillow the pictures are stored as they are and no thumbnails are made.
+"""
+import asyncio
+import functools
+import hashlib
+import http.client
+import io
+import json
+import os
+import re
+import threading
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from catalog_import.manifest import write_json_atomic
+from catalog_import.schema import ALIASES, CACHE_DIR
+
+ASSET_INDEX_PATH = os.path.join(CACHE_DIR, 'assets', 'index.json')
+ASSET_DIR = 'storage/app/public/products/import'
+ASSET_URL = '/storage/products/import'
+
+DEFAULT_CONNECTIONS = 8
+DEFAULT_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 20
+MAX_REDIRECTS = 5
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+USER_AGENT = 'facchile-catalog-import'
+
+THUMBNAIL_SIZE = (400, 400)
+THUMBNAIL_SUFFIX = '-thumb.jpg'
+
+# Columns the URLs are read from, in this order
+IMAGE_COLUMNS = ALIASES['image']
+
+# Cells list several URLs separated by commas, semicolons, pipes or whitespace
+_URL = re.compile(r'https?://[^\s,;|"\'<>]+', re.IGNORECASE)
+
+EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+    'image/avif': '.avif',
+}
+
+
+def plan_images(columns):
+    """The picture columns of a sheet, in IMAGE_COLUMNS order, or None when it has none."""
+    available = set(columns)
+    planned = [c for c in IMAGE_COLUMNS if c in available]
+    return planned or None
+
+
+def image_urls(plan, index, present, text):
+    """The distinct picture URLs of every row, in column and cell order."""
+    rows = [[] for _ in range(len(text))]
+    for column in plan:
+        i = index[column]
+        for row in range(len(text)):
+            if present[row, i]:
+                for url in _URL.findall(text[row, i]):
+                    if url not in rows[row]:
+                        rows[row].append(url)
+    return rows
+
+
+def merge_images(lists):
+    """The ordered union of several rows' URLs (a product's variants share its pictures)."""
+    merged = []
+    for urls in lists:
+        merged.extend(url for url in urls if url not in merged)
+    return merged
+
+
+class FetchError(Exception):
+    def __init__(self, url, status=None, reason=None):
+        super().__init__(f"{url}: {reason or status}")
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+    @property
+    def retryable(self):
+        # No status: the connection failed or timed out
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+def sniff_type(body):
+    """The image MIME type body's magic bytes announce, or None."""
+    if body.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if body.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if body.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if body[:4] == b'RIFF' and body[8:12] == b'WEBP':
+        return 'image/webp'
+    if body[4:8] == b'ftyp' and body[8:12] in (b'avif', b'avis'):
+        return 'image/avif'
+    return None
+
+
+def image_type(body):
+    """The MIME type of body if it is a picture of one of the EXTENSIONS types, else None.
+
+    With Pillow the bytes must decode; without it, their magic bytes decide.
+    """
+    if not pillow_available():
+        kind = sniff_type(body)
+    else:
+        from PIL import Image
+
+        try:
+            with Image.open(io.BytesIO(body)) as image:
+                image.verify()
+                kind = Image.MIME.get(image.format)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+            return None
+    return kind if kind in EXTENSIONS else None
+
+
+_local = threading.local()
+
+
+def _connection(scheme, host, timeout):
+    # One keep-alive connection per host and worker thread
+    connections = _local.__dict__.setdefault('connections', {})
+    key = (scheme, host)
+    if key not in connections:
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        connections[key] = cls(host, timeout=timeout)
+    return connections[key]
+
+
+def _drop_connection(scheme, host):
+    connection = _local.__dict__.get('connections', {}).pop((scheme, host), None)
+    if connection is not None:
+        connection.close()
+
+
+def fetch(url, timeout=TIMEOUT_SECONDS, redirects=MAX_REDIRECTS):
+    """(body, image type) of url (image_type() of the body); raises FetchError."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise FetchError(url, reason='not an http(s) URL')
+    target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+    connection = _connection(parts.scheme, parts.netloc, timeout)
+    try:
+        connection.request('GET', target, headers={'User-Agent': USER_AGENT, 'Accept': 'image/*'})
+        response = connection.getresponse()
+        body = response.read(MAX_IMAGE_BYTES + 1)
+        if not response.isclosed():
+            # Larger than any picture: do not reuse a connection with a body left on it
+            _drop_connection(parts.scheme, parts.netloc)
+    except (OSError, http.client.HTTPException) as e:
+        _drop_connection(parts.scheme, parts.netloc)
+        raise FetchError(url, reason=str(e) or type(e).__name__) from e
+
+    if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+        if not redirects:
+            raise FetchError(url, reason='too many redirects')
+        location = urllib.parse.urljoin(url, response.getheader('Location'))
+        # Only to another http(s) URL (not file:, ftp:...); with the 3xx status, so it is not retried
+        if urllib.parse.urlsplit(location).scheme not in ('http', 'https'):
+            raise FetchError(url, status=response.status, reason=f"redirect to a non-http(s) URL ({location})")
+        return fetch(location, timeout, redirects - 1)
+    if response.status >= 400:
+        raise FetchError(url, status=response.status)
+    if len(body) > MAX_IMAGE_BYTES:
+        raise FetchError(url, status=response.status, reason='too large')
+    content_type = (response.getheader('Content-Type') or '').split(';')[0].strip().lower()
+    if not content_type.startswith('image/'):
+        # An error or login page served with 200
+        raise FetchError(url, status=response.status, reason=f"not an image ({content_type or 'no Content-Type'})")
+    kind = image_type(body)
+    if kind is None:
+        raise FetchError(url, status=response.status, reason=f"unreadable {content_type}")
+    return body, kind
+
+
+async def _fetch_with_retries(loop, executor, semaphore, url, retries, timeout):
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                return await loop.run_in_executor(executor, fetch, url, timeout)
+        except FetchError as e:
+            if not e.retryable or attempt == retries:
+                return e
+        # Backing off does not hold a connection slot
+        await asyncio.sleep(BACKOFF_SECONDS * 2 ** attempt)
+
+
+async def fetch_all(urls, executor, connections=DEFAULT_CONNECTIONS, retries=DEFAULT_RETRIES, timeout=TIMEOUT_SECONDS):
+    """{url: (body, image type) or FetchError}, fetched at most `connections` at a time."""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(connections)
+    results = await asyncio.gather(*(
+        _fetch_with_retries(loop, executor, semaphore, url, retries, timeout) for url in urls
+    ))
+    return dict(zip(urls, results))
+
+
+class AssetStore:
+    """Content-addressed picture files, and the URL -> file index that keeps them from being fetched twice."""
+
+    def __init__(self, root=ASSET_DIR, index_path=ASSET_INDEX_PATH, base_url=ASSET_URL):
+        self.root = root
+        self.index_path = index_path
+        self.base_url = base_url
+        self.index = {}
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+            # Files removed since (e.g. storage cleared) are fetched again
+            self.index = {url: entry for url, entry in self.index.items()
+                          if entry.get('file') is None or os.path.exists(os.path.join(root, entry['file']))}
+        self.dirty = False
+
+    def known(self, url):
+        return url in self.index
+
+    def file(self, url):
+        entry = self.index.get(url)
+        return entry.get('file') if entry else None
+
+    def url(self, name):
+        return f"{self.base_url}/{name}"
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def put(self, url, body, kind):
+        """Store body, a picture of type kind (image_type()), once per content as url's file.
+
+        Returns (file name, whether it is a new file).
+        """
+        name = hashlib.sha256(body).hexdigest()[:32] + EXTENSIONS[kind]
+        path = self.path(name)
+        new = not os.path.exists(path)
+        if new:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}"
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        self.index[url] = {"file": name}
+        self.dirty = True
+        return name, new
+
+    def missing(self, url, status, reason=None):
+        self.index[url] = {"file": None, "status": status}
+        if reason:
+            self.index[url]['reason'] = reason
+        self.dirty = True
+
+    def save(self):
+        if self.dirty:
+            os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+            write_json_atomic(self.index_path, self.index, indent=None)
+            self.dirty = False
+
+
+def thumbnail_name(name):
+    return os.path.splitext(name)[0] + THUMBNAIL_SUFFIX
+
+
+def make_thumbnail(source, target, size=THUMBNAIL_SIZE):
+    """Write a JPEG of source fitting in size to target; returns False if it cannot be decoded."""
+    from PIL import Image
+
+    try:
+        with Image.open(source) as image:
+            image = image.convert('RGB')
+            image.thumbnail(size)
+            tmp = f"{target}.tmp{os.getpid()}"
+            image.save(tmp, 'JPEG', quality=85, optimize=True)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+    os.replace(tmp, target)
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def pillow_available():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ImagePipeline:
+    """Resolves the "images" of export records to files in the AssetStore.
+
+    resolve() is called once per sheet with its records: their unseen URLs
+    are fetched together, then each record gets main_image_url (the first
+    of its "images" that could be stored), gallery (the others) and
+    thumbnail_url. Records without a picture are left as they
+    are, so the loaders fall back to the placeholder image.
+    """
+
+    def __init__(self, store=None, connections=DEFAULT_CONNECTIONS, retries=DEFAULT_RETRIES,
+                 thumbnail_workers=None, timeout=TIMEOUT_SECONDS):
+        self.store = store if store is not None else AssetStore()
+        self.connections = connections
+        self.retries = retries
+        self.timeout = timeout
+        self.fetcher = ThreadPoolExecutor(max_workers=connections, thread_name_prefix='image-fetch')
+        self.thumbnails = None
+        if thumbnail_workers != 0 and pillow_available():
+            self.thumbnails = ProcessPoolExecutor(max_workers=thumbnail_workers)
+        self.fetched = self.stored = self.reused = self.failed = self.thumbnailed = 0
+
+    def _thumbnail_jobs(self, names):
+        jobs = []
+        for name in names:
+            target = self.store.path(thumbnail_name(name))
+            if not os.path.exists(target):
+                jobs.append((self.store.path(name), target))
+        return jobs
+
+    def resolve(self, products):
+        urls = []
+        seen = set()
+        for product in products:
+            for url in product.get('images') or ():
+                if url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+        new_urls = [url for url in urls if not self.store.known(url)]
+        self.reused += len(urls) - len(new_urls)
+
+        if new_urls:
+            results = asyncio.run(fetch_all(new_urls, self.fetcher, self.connections, self.retries, self.timeout))
+            for url, result in results.items():
+                if isinstance(result, FetchError):
+                    self.failed += 1
+                    # Transient failures are retried on the next run; 4xx and non-pictures are not
+                    if not result.retryable:
+                        self.store.missing(url, result.status, result.reason)
+                    continue
+                self.fetched += 1
+                _, new = self.store.put(url, *result)
+                self.stored += new
+
+        if self.thumbnails is not None:
+            # Also covers files whose thumbnail a previous run did not get to make
+            names = {self.store.file(url) for url in urls} - {None}
+            jobs = self._thumbnail_jobs(sorted(names))
+            for made in self.thumbnails.map(make_thumbnail, *zip(*jobs)) if jobs else ():
+                self.thumbnailed += made
+
+        for product in products:
+            if 'images' not in product:
+                continue
+            names = [name for name in (self.store.file(url) for url in product['images']) if name]
+            names = list(dict.fromkeys(names))
+            if not names:
+                continue
+            product['main_image_url'] = self.store.url(names[0])
+            product['gallery'] = [self.store.url(name) for name in names[1:]]
+            if self.thumbnails is not None and os.path.exists(self.store.path(thumbnail_name(names[0]))):
+                product['thumbnail_url'] = self.store.url(thumbnail_name(names[0]))
+        self.store.save()
+        return products
+
+    def close(self):
+        self.fetcher.shutdown()
+        if self.thumbnails is not None:
+            self.thumbnails.shutdown()
+        self.store.save()
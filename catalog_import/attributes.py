@@ -0,0 +1,139 @@
+"""Typed, unit-normalized attributes for ProductAttribute.
+
+Every spec column becomes a key of the product's "attributes" object, with
+- measures converted to one canonical unit per attribute and the unit put
+  in the key ("weight_g": 12.5, "length_cm": 10.7, "beam_distance_m": 500),
+- other numbers as numbers ("bearings_number": 5),
+- Sí/No as booleans and anything else as the trimmed text.
+Conversion is done a column at a time over the whole frame; only the final
+per-row dicts are assembled in Python.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# unit -> (dimension, factor to the dimension's base unit: g, cm, mL)
+UNITS = {
+    'mg': ('mass', 0.001),
+    'g': ('mass', 1),
+    'kg': ('mass', 1000),
+    'oz': ('mass', 28.349523125),
+    'lb': ('mass', 453.59237),
+    'lbs': ('mass', 453.59237),
+    'mm': ('length', 0.1),
+    'cm': ('length', 1),
+    'm': ('length', 100),
+    'km': ('length', 100000),
+    '"': ('length', 2.54),
+    'in': ('length', 2.54),
+    'ft': ('length', 30.48),
+    'ml': ('volume', 1),
+    'cc': ('volume', 1),
+    'l': ('volume', 1000),
+}
+
+DEFAULT_CANONICAL = {'mass': 'g', 'length': 'cm', 'volume': 'ml'}
+
+# Attributes whose natural scale is not the dimension's default
+CANONICAL_UNITS = {
+    'MAX_WEIGHT_SUPPORTED': 'kg',
+    'MAX_DRAG': 'kg',
+    'FISHING_LINE_RESISTANCE': 'kg',
+    'TENSILE_FORCE': 'kg',
+    'BEAM_DISTANCE': 'm',
+    'MAX_IMMERSION_DEPTH': 'm',
+    'MAX_MEASURING_DISTANCE': 'm',
+    'MIN_MEASURING_DISTANCE': 'm',
+    'LINE_CAPACITY': 'm',
+    'BACKPACK_CAPACITY': 'l',
+    'VOLUME_CAPACITY': 'l',
+}
+
+BOOLEANS = {'SÍ': True, 'SI': True, 'NO': False}
+
+# Decimals kept after conversion (oz/lb factors are not round)
+PRECISION = 4
+
+# unit_column: the column's <COLUMN>_UNIT pair, or None
+AttributeColumn = namedtuple('AttributeColumn', ['column', 'key', 'unit_column'])
+
+_upper = np.frompyfunc(str.upper, 1, 1)
+
+
+def plan_attributes(columns, specs):
+    """One AttributeColumn per spec column."""
+    available = set(columns)
+    return [
+        AttributeColumn(spec.column, spec.column.lower(), spec.column + '_UNIT' if spec.column + '_UNIT' in available else None)
+        for spec in specs
+    ]
+
+
+def _unit_conversion(column, unit):
+    """(key suffix, factor) that turns a value in unit into the attribute's canonical unit."""
+    known = UNITS.get(unit.lower())
+    if known is None:
+        # Units we do not convert (psi, lm, mAh...) are kept as they are
+        return unit.lower(), 1.0
+    dimension, factor = known
+    canonical = CANONICAL_UNITS.get(column)
+    if canonical is None or UNITS[canonical][0] != dimension:
+        canonical = DEFAULT_CANONICAL[dimension]
+    return canonical, factor / UNITS[canonical][1]
+
+
+def _number(value):
+    value = round(float(value), PRECISION)
+    return int(value) if value.is_integer() else value
+
+
+def attribute_payloads(attributes, index, present, text, invalid_values):
+    """The attributes dict of every row (text: stripped cell strings, present: non-missing mask)."""
+    n = len(text)
+    payloads = [{} for _ in range(n)]
+
+    for attr in attributes:
+        i = index[attr.column]
+        values = text[:, i]
+        usable = present[:, i] & (values != '') & ~np.isin(_upper(values), invalid_values)
+        if not usable.any():
+            continue
+
+        numbers = pd.to_numeric(pd.Series(values).str.replace(',', '.', regex=False), errors='coerce').to_numpy(dtype=float)
+        numeric = usable & np.isfinite(numbers)
+        keys = np.full(n, attr.key, dtype=object)
+
+        if attr.unit_column is not None:
+            j = index[attr.unit_column]
+            units = np.where(present[:, j], text[:, j], '')
+            with_unit = numeric & (units != '')
+            # Few distinct units per column: resolve each once, then map
+            conversions = {unit: _unit_conversion(attr.column, unit) for unit in set(units[with_unit])}
+            suffixes = pd.Series(units).map({u: c[0] for u, c in conversions.items()}).to_numpy(dtype=object)
+            factors = pd.Series(units).map({u: c[1] for u, c in conversions.items()}).fillna(1.0).to_numpy(dtype=float)
+            numbers = numbers * factors
+            keys = np.where(with_unit, attr.key + '_' + suffixes.astype(str), keys)
+
+        booleans = pd.Series(_upper(values)).map(BOOLEANS)
+        is_boolean = booleans.notna().to_numpy()
+        booleans = booleans.to_numpy(dtype=object)
+        for row in np.flatnonzero(usable):
+            if numeric[row]:
+                payloads[row][keys[row]] = _number(numbers[row])
+            elif is_boolean[row]:
+                payloads[row][keys[row]] = booleans[row]
+            else:
+                payloads[row][keys[row]] = values[row]
+    return payloads
+
+
+def merge_attributes(payloads):
+    """Attributes of a grouped product: one value when all rows agree, else the distinct values in order."""
+    merged = {}
+    for payload in payloads:
+        for key, value in payload.items():
+            merged.setdefault(key, [])
+            if value not in merged[key]:
+                merged[key].append(value)
+    return {key: values[0] if len(values) == 1 else values for key, values in merged.items()}
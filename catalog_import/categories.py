@@ -0,0 +1,101 @@
+"""Sheet -> category resolution from the declarative category_map.json.
+
+The mapping file has four parts:
+- "sheets": sheet name -> category slug. Names ending in "..." are the
+  truncated names Excel's 31-character limit produces, and match any sheet
+  whose name starts with the part before the dots.
+- "keywords": word -> slug, tried in file order against sheets no name
+  matched ('pesca' -> 'pesca-deportiva').
+- "default": the slug of everything else.
+- "category_ids": MercadoLibre CATEGORY_ID -> slug, overriding the sheet's
+  category for the rows that carry it.
+
+Names are compared accent- and case-folded. load_rules() compiles the file
+once into dicts and a single keyword regex; resolve() is then a dict probe
+(memoized per sheet name).
+"""
+import json
+import os
+import re
+
+from catalog_import.text import normalize_name
+
+DEFAULT_MAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_map.json')
+TRUNCATION = '...'
+
+_rules = {}
+
+
+class CategoryRules:
+    def __init__(self, sheets, keywords, default, category_ids):
+        self.default = default
+        self.category_ids = dict(category_ids)
+
+        self.exact = {}
+        self.prefixes = {}
+        for name, slug in sheets.items():
+            if name.rstrip().endswith(TRUNCATION):
+                self.prefixes[normalize_name(name.rstrip()[:-len(TRUNCATION)])] = slug
+            else:
+                self.exact[normalize_name(name)] = slug
+        # Longest prefix first, so "cuchillos de" beats "cuchillos"
+        self.prefix_lengths = sorted({len(p) for p in self.prefixes}, reverse=True)
+
+        # One alternation; the lowest-numbered group that matched is the first rule in the file
+        self.keyword_slugs = list(keywords.values())
+        self.keyword_pattern = re.compile('|'.join(
+            f"(?P<k{i}>{re.escape(normalize_name(word))})" for i, word in enumerate(keywords)
+        )) if keywords else None
+
+        self.resolved = {}
+
+    def resolve(self, sheet_name):
+        """Category slug of a sheet: exact name, truncated name, keyword, then the default."""
+        if sheet_name not in self.resolved:
+            self.resolved[sheet_name] = self._resolve(normalize_name(sheet_name))
+        return self.resolved[sheet_name]
+
+    def _resolve(self, name):
+        if name in self.exact:
+            return self.exact[name]
+        for length in self.prefix_lengths:
+            slug = self.prefixes.get(name[:length].rstrip())
+            if slug is not None:
+                return slug
+        if self.keyword_pattern is not None:
+            matched = [int(m.lastgroup[1:]) for m in self.keyword_pattern.finditer(name)]
+            if matched:
+                return self.keyword_slugs[min(matched)]
+        return self.default
+
+    def slugs(self):
+        """Every slug the rules can produce."""
+        return {self.default, *self.exact.values(), *self.prefixes.values(), *self.keyword_slugs,
+                *self.category_ids.values()}
+
+
+def load_rules(path=DEFAULT_MAP_PATH):
+    """The compiled rules of path, memoized per (path, mtime) for this process.
+
+    A long-running process (catalog_import.watch) so keeps the compiled rules
+    and their resolved sheet names between imports, and still sees edits.
+    """
+    memo_key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if memo_key not in _rules:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        _rules[memo_key] = CategoryRules(data.get('sheets', {}), data.get('keywords', {}), data['default'],
+                                         data.get('category_ids', {}))
+    return _rules[memo_key]
+
+
+def category_id_for(slug, categories, fallback):
+    """Id of slug in categories ({slug: id}): the slug itself, its first segment
+    ("cuchillos" for "cuchillos-outdoor"), then fallback; None if none exist."""
+    found = categories.get(slug)
+    parts = slug.split('-')
+    if found is None and len(parts) > 1:
+        found = categories.get(parts[0])
+    if found is None:
+        found = categories.get(fallback)
+    return found
@@ -0,0 +1,86 @@
+"""Task checkpoints, so an interrupted or failed import resumes where it stopped.
+
+Every finished task result (a sheet, or a row range of one) is pickled to
+.import_cache/checkpoints/<key>/ as soon as it is done, through a temporary
+file and a rename, so a task's checkpoint is either complete or absent. The
+key covers the workbook's content, the plan options and the source of this
+package: a checkpoint is never reused for another input or another version
+of the transform.
+
+A rerun loads the finished tasks instead of running them again. Failed
+tasks are not saved, so they are retried. The checkpoint is removed once the
+export it was for is complete.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+from catalog_import.schema import CACHE_DIR, workbook_hash
+
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, 'checkpoints')
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class IncompleteImport(Exception):
+    """Raised when some tasks failed: the export is not assembled, the checkpoint is kept."""
+
+    def __init__(self, reports):
+        self.reports = reports
+        names = ', '.join(r.sheet_name for r in reports)
+        super().__init__(f"{len(reports)} sheet(s) failed: {names}")
+
+
+def checkpoint_key(path, plan_options):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(workbook_hash(path).encode())
+    digest.update(json.dumps(plan_options or {}, sort_keys=True, default=str).encode('utf-8'))
+    for source in sorted(glob.glob(os.path.join(PACKAGE_DIR, '*.py'))):
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _file(self, task):
+        return os.path.join(self.root, f"{task.order:04d}-{task.min_row or 0}-{task.max_row or 'end'}.pkl")
+
+    def has(self, task):
+        return os.path.exists(self._file(task))
+
+    def load(self, task):
+        """The saved result of task, or None (also when it was saved for another category)."""
+        try:
+            with open(self._file(task), 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if (result.task.sheet_name, result.task.cat_slug) != (task.sheet_name, task.cat_slug):
+            return None
+        return result
+
+    def save(self, result):
+        if result.status == 'failed':
+            return
+        path = self._file(result.task)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def remove(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def open_checkpoint(path, plan_options, resume=True):
+    """The checkpoint of an import of path with these plan options; resume=False starts it over."""
+    root = os.path.join(CHECKPOINT_DIR, checkpoint_key(path, plan_options))
+    if not resume:
+        shutil.rmtree(root, ignore_errors=True)
+    return Checkpoint(root)
@@ -0,0 +1,345 @@
+"""Command line for inspecting the Fichas técnicas workbook and running the import.
+
+    python -m catalog_import sheets                 # product sheets (--all: every sheet)
+    python -m catalog_import header "Senuelos de pesca" --rows 15
+    python -m catalog_import columns "Senuelos de pesca"
+    python -m catalog_import profile [SHEET ...]
+    python -m catalog_import diff OLD.xlsx NEW.xlsx  # patch for load_import_data.py --patch
+    python -m catalog_import merge A.xlsx B.xlsx ...  # one export, the latest workbook of a variation wins
+    python -m catalog_import --workbook STOCK.xlsx sync [--dry-run]  # prices and stock only
+    python -m catalog_import generate [generate_import_final.py options]
+    python -m catalog_import watch [--dir public] [generate_import_final.py options]
+
+sheets, header and columns read only xl/workbook.xml and the first rows of
+one sheet (catalog_import.xlsx), so they answer in milliseconds and never
+import pandas or openpyxl; sync reads the key, price and stock columns the
+same way (catalog_import.sync). profile reads every row (through the columnar
+cache) and generate runs the full import; their dependencies are imported
+by the command itself. watch runs the import on every export dropped into
+a directory (catalog_import.watch).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from catalog_import.reader import product_sheet_names
+from catalog_import.schema import HEADER_SCAN_ROWS, detect_header_row, schema_from_rows
+from catalog_import.watch import (DEFAULT_INTERVAL_SECONDS, DEFAULT_OUTPUT_DIR, DEFAULT_PATTERN, DEFAULT_SETTLE_SECONDS,
+                                  DEFAULT_WATCH_DIR)
+from catalog_import.xlsx import SheetNotFound, head_rows, workbook_sheets
+
+DEFAULT_WORKBOOK = 'public/Fichas_tecnicas-2026_02_14-18_22.xlsx'
+# Aliases shown by profile, in this order
+PROFILE_ALIASES = ['item_id', 'sku', 'title', 'brand', 'model', 'price', 'stock', 'image']
+GENERATE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'generate_import_final.py')
+
+
+def print_json(data):
+    print(json.dumps(data, indent=2, ensure_ascii=False, default=str))
+
+
+def cmd_sheets(args):
+    sheets = workbook_sheets(args.workbook)
+    if not args.all:
+        names = set(product_sheet_names([s.name for s in sheets]))
+        sheets = [s for s in sheets if s.name in names]
+    if args.json:
+        print_json([s.name for s in sheets] if not args.all else [s._asdict() for s in sheets])
+        return
+    for sheet in sheets:
+        print(sheet.name if sheet.state == 'visible' else f"{sheet.name} ({sheet.state})")
+    print(f"{len(sheets)} sheet(s)", file=sys.stderr)
+
+
+def cmd_header(args):
+    rows = head_rows(args.workbook, args.sheet, args.rows)
+    header_row = detect_header_row(rows, args.rows)
+    if args.json:
+        print_json({"header_row": header_row, "rows": rows})
+        return
+    for i, row in enumerate(rows):
+        marker = '>' if i == header_row else ' '
+        print(f"{marker} Row {i}: {row[:args.width] if args.width else row}")
+    if header_row is None:
+        print(f"No header row in the first {args.rows} rows.", file=sys.stderr)
+
+
+def cmd_columns(args):
+    schema = schema_from_rows(args.sheet, head_rows(args.workbook, args.sheet, HEADER_SCAN_ROWS))
+    if args.json:
+        print_json(schema._asdict())
+        return
+    if schema.header_row is None:
+        print(f"Could not identify the header row of {args.sheet}.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Header at row {schema.header_row}, {len(schema.columns)} columns:")
+    for column in schema.columns:
+        print(f"  {column}")
+    print("Resolved columns:")
+    for alias, column in schema.aliases.items():
+        print(f"  {alias:<15} {column}")
+
+
+def cmd_profile(args):
+    from catalog_import.columnar import load_sheet_frames
+
+    sheet_names = args.sheets or product_sheet_names([s.name for s in workbook_sheets(args.workbook)])
+    profiles = []
+    for sheet_name in sheet_names:
+        schema = schema_from_rows(sheet_name, head_rows(args.workbook, sheet_name, HEADER_SCAN_ROWS))
+        if schema.header_row is None:
+            profiles.append({"sheet": sheet_name, "header_row": None, "rows": 0, "filled": {}})
+            continue
+        columns, frames = load_sheet_frames(args.workbook, sheet_name, schema.header_row, use_cache=not args.no_cache)
+        rows = 0
+        filled = dict.fromkeys(schema.aliases, 0)
+        for df in frames:
+            rows += len(df)
+            counts = df.notna().sum()
+            for alias, column in schema.aliases.items():
+                filled[alias] += int(counts[column])
+        profiles.append({"sheet": sheet_name, "header_row": schema.header_row, "rows": rows, "filled": filled})
+
+    if args.json:
+        print_json(profiles)
+        return
+    print(f"{'sheet':<32} {'rows':>6} " + ' '.join(f"{alias:>8}" for alias in PROFILE_ALIASES))
+    for profile in profiles:
+        print(f"{profile['sheet'][:32]:<32} {profile['rows']:>6} "
+              + ' '.join(f"{profile['filled'].get(alias, '-'):>8}" for alias in PROFILE_ALIASES))
+    print(f"{'total':<32} {sum(p['rows'] for p in profiles):>6}")
+
+
+def cmd_diff(args):
+    from catalog_import.categories import load_rules
+    from catalog_import.dedup import DEFAULT_THRESHOLD
+    from catalog_import.diff import diff_workbooks
+    from catalog_import.manifest import write_json_atomic
+
+    rules = load_rules(args.category_map) if args.category_map else load_rules()
+    plan_options = {"variants": not args.no_group_variants, "attributes": not args.no_attributes,
+                    "category_overrides": rules.category_ids, "shipping": not args.no_shipping,
+                    "images": not args.no_images}
+    patch = diff_workbooks(args.base, args.new, rules, plan_options, args.workers, not args.no_cache,
+                           None if args.no_dedup else args.dedup_threshold or DEFAULT_THRESHOLD)
+    write_json_atomic(args.output, patch)
+
+    summary = patch['summary']
+    print(f"{patch['base_source']} -> {patch['source']}: {summary['added']} added, {summary['changed']} changed, "
+          f"{summary['removed']} removed, {summary['unchanged']} unchanged")
+    for record in patch['added'][:args.show]:
+        print(f"  + {record['name']}")
+    for record in patch['removed'][:args.show]:
+        print(f"  - {record['name']}")
+    for record in patch['changed'][:args.show]:
+        print(f"  ~ {record['name']}: {', '.join(record['changes'])}")
+    print(f"Saved {args.output}")
+
+
+def cmd_merge(args):
+    from catalog_import.categories import load_rules
+    from catalog_import.dedup import DEFAULT_THRESHOLD, DuplicateIndex
+    from catalog_import.loader import existing_slugs
+    from catalog_import.manifest import write_json_atomic
+    from catalog_import.merge import WorkbookMerge, merge_workbooks
+    from catalog_import.output import ExportFile
+
+    started = time.perf_counter()
+    missing = [path for path in args.workbooks if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"No workbook {missing[0]}")
+    rules = load_rules(args.category_map) if args.category_map else load_rules()
+    plan_options = {"variants": not args.no_group_variants, "attributes": not args.no_attributes,
+                    "category_overrides": rules.category_ids, "shipping": not args.no_shipping,
+                    "images": not args.no_images}
+    merge = WorkbookMerge()
+    dedup = None if args.no_dedup else DuplicateIndex(args.dedup_threshold or DEFAULT_THRESHOLD)
+    reports = []
+    taken = existing_slugs(args.slugs_from) if args.slugs_from else ()
+    with ExportFile(args.output, args.format, args.gzip) as writer:
+        for record in merge_workbooks(args.workbooks, rules, plan_options, merge, args.workers, not args.no_cache,
+                                      dedup, reports, taken):
+            writer.write(record)
+    report = merge.report()
+    report['sheets'] = [{"workbook": workbook, "sheet": r.sheet_name, "status": r.status, "rows": r.products}
+                        for workbook, r in reports]
+    if dedup is not None:
+        report['totals']['duplicates'] = sum(len(members) - 1 for members in dedup.clusters())
+    write_json_atomic(args.report, report)
+
+    for entry in report['workbooks']:
+        print(f"  {entry['workbook']}: {entry['kept']} of {entry['rows']} rows kept, "
+              f"{entry['superseded']} superseded by a newer export")
+    totals = report['totals']
+    print(f"Merged {len(args.workbooks)} workbooks into {writer.count} records ({totals['superseded']} superseded"
+          + (f", {totals['duplicates']} near-duplicates marked" if dedup is not None else '')
+          + f") in {time.perf_counter() - started:.2f}s")
+    print(f"Saved {args.output} and {args.report}")
+
+
+def cmd_sync(args):
+    from catalog_import.loader import DEFAULT_DATABASE, apply_price_stock, current_price_stock
+    from catalog_import.manifest import write_json_atomic
+    from catalog_import.sync import price_stock_delta, required_columns, workbook_price_stock
+
+    started = time.perf_counter()
+    database = args.database or DEFAULT_DATABASE
+    values, sheets, duplicates = workbook_price_stock(args.workbook, args.sheets or None)
+    if not values:
+        statuses = Counter(sheet[1] for sheet in sheets)
+        read = ', '.join(f"{count} {status}" for status, count in statuses.most_common())
+        print(f"Error: no sheet of {args.workbook} has {required_columns()} ({len(sheets)} sheet(s) read: {read or 'none'})",
+              file=sys.stderr)
+        sys.exit(1)
+    delta = price_stock_delta(args.workbook, values, current_price_stock(database), sheets, duplicates)
+    write_json_atomic(args.output, delta, indent=None)
+
+    summary = delta['summary']
+    print(f"{summary['keys']} rows read from {len([s for s in sheets if s[1] == 'ok'])} sheet(s): {summary['changed']} changed "
+          f"({summary['prices']} prices, {summary['stocks']} stock), {summary['unchanged']} unchanged, "
+          f"{summary['unknown']} not in {database}")
+    if summary['unkeyed']:
+        print(f"{summary['unkeyed']} row(s) with a price or stock but no SKU, ID or title were not synced")
+    print(f"Saved {args.output}")
+    if args.dry_run:
+        return
+    updated = apply_price_stock(database, delta['changes'], args.batch_size)
+    print(f"Updated {updated} variants in {database} in {time.perf_counter() - started:.2f}s")
+
+
+def cmd_generate(args):
+    import runpy
+
+    # The script parses its own options (a --workbook among them wins over ours)
+    sys.argv = [GENERATE_SCRIPT, '--workbook', args.workbook] + args.options
+    runpy.run_path(GENERATE_SCRIPT, run_name='__main__')
+
+
+def cmd_watch(args):
+    from catalog_import.watch import Watcher, load_generator
+
+    if not os.path.isdir(args.dir):
+        raise FileNotFoundError(f"No directory {args.dir}")
+    # Imported once, with everything the pipeline needs, before the first workbook arrives
+    watcher = Watcher(load_generator(GENERATE_SCRIPT), args.dir, args.pattern, args.output_dir, args.options,
+                      args.settle, args.interval)
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        pass
+    print(f"{watcher.imported} workbook(s) imported, {watcher.failed} failed", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m catalog_import', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workbook', default=DEFAULT_WORKBOOK, help=f"workbook to read (default: {DEFAULT_WORKBOOK})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sheets = commands.add_parser('sheets', help="list the sheets")
+    sheets.add_argument('--all', action='store_true', help="include the Ayuda/hidden sheets, with their visibility")
+    sheets.add_argument('--json', action='store_true', help="print a JSON array")
+    sheets.set_defaults(run=cmd_sheets)
+
+    header = commands.add_parser('header', help="print the first rows of a sheet, marking the detected header")
+    header.add_argument('sheet')
+    header.add_argument('--rows', type=int, default=15, help="rows to print (default: 15)")
+    header.add_argument('--width', type=int, default=10, help="cells per row to print, 0 for all (default: 10)")
+    header.add_argument('--json', action='store_true', help="print the rows and header index as JSON")
+    header.set_defaults(run=cmd_header)
+
+    columns = commands.add_parser('columns', help="list a sheet's columns and the ones resolved as title, SKU, price...")
+    columns.add_argument('sheet')
+    columns.add_argument('--json', action='store_true', help="print the sheet schema as JSON")
+    columns.set_defaults(run=cmd_columns)
+
+    profile = commands.add_parser('profile', help="rows per sheet and how many have a SKU, title, price, stock...")
+    profile.add_argument('sheets', nargs='*', metavar='SHEET', help="sheets to profile (default: every product sheet)")
+    profile.add_argument('--no-cache', action='store_true', help="read the workbook directly instead of the columnar cache")
+    profile.add_argument('--json', action='store_true', help="print one JSON object per sheet")
+    profile.set_defaults(run=cmd_profile)
+
+    diff = commands.add_parser('diff', help="what changed between two workbooks, as a patch the loader can apply")
+    diff.add_argument('base', help="older workbook")
+    diff.add_argument('new', help="newer workbook")
+    diff.add_argument('--output', default='import_data_patch.json', help="patch file (default: import_data_patch.json)")
+    diff.add_argument('--show', type=int, default=20, help="records of each kind to print (default: 20)")
+    diff.add_argument('--workers', type=int, default=1, help="process sheets on N worker processes (default: 1)")
+    diff.add_argument('--category-map', help="sheet -> category rules (default: catalog_import/category_map.json)")
+    diff.add_argument('--no-group-variants', action='store_true', help="compare one record per row, as with the generator's option")
+    diff.add_argument('--no-attributes', action='store_true', help="leave the typed attributes out, as with the generator's option")
+    diff.add_argument('--no-shipping', action='store_true', help="leave the shipping measures out, as with the generator's option")
+    diff.add_argument('--no-images', action='store_true', help="leave the picture URLs out, as with the generator's option")
+    diff.add_argument('--no-cache', action='store_true', help="read the workbooks directly instead of the columnar cache")
+    diff.add_argument('--no-dedup', action='store_true', help="leave near-duplicates unmarked, as with the generator's option")
+    diff.add_argument('--dedup-threshold', type=float, help="duplicate title similarity, as with the generator's option (default: 0.8)")
+    diff.set_defaults(run=cmd_diff)
+
+    merge = commands.add_parser('merge', help="merge several workbooks into one export; a variation's latest export wins")
+    merge.add_argument('workbooks', nargs='+', metavar='WORKBOOK', help="workbooks to merge, in any order")
+    merge.add_argument('--output', default='import_data_merged.json', help="merged export (default: import_data_merged.json)")
+    merge.add_argument('--format', choices=['json', 'ndjson'], default='json', help="as with the generator's option (default: json)")
+    merge.add_argument('--gzip', action='store_true', help="gzip-compress the export")
+    merge.add_argument('--report', default='import_merge_report.json',
+                       help="rows kept and superseded per workbook (default: import_merge_report.json)")
+    merge.add_argument('--workers', type=int, default=1, help="process the sheets of all workbooks on N worker processes (default: 1)")
+    merge.add_argument('--category-map', help="sheet -> category rules (default: catalog_import/category_map.json)")
+    merge.add_argument('--no-group-variants', action='store_true', help="export one record per row, as with the generator's option")
+    merge.add_argument('--no-attributes', action='store_true', help="leave the typed attributes out, as with the generator's option")
+    merge.add_argument('--no-shipping', action='store_true', help="leave the shipping measures out, as with the generator's option")
+    merge.add_argument('--no-images', action='store_true', help="leave the picture URLs out, as with the generator's option")
+    merge.add_argument('--no-cache', action='store_true', help="read the workbooks directly instead of the columnar cache")
+    merge.add_argument('--no-dedup', action='store_true', help="leave near-duplicates unmarked, as with the generator's option")
+    merge.add_argument('--dedup-threshold', type=float, help="duplicate title similarity, as with the generator's option (default: 0.8)")
+    merge.add_argument('--slugs-from', metavar='SQLITE_PATH',
+                       help="treat the product slugs already in this SQLite database as taken, as with the generator's option")
+    merge.set_defaults(run=cmd_merge)
+
+    sync = commands.add_parser('sync', help="update variant prices and stock from the workbook's key/price/stock columns only")
+    sync.add_argument('sheets', nargs='*', metavar='SHEET', help="sheets to read (default: every product sheet)")
+    sync.add_argument('--database', help="SQLite database to update (default: database/database.sqlite)")
+    sync.add_argument('--output', default='import_price_stock.json', help="delta file (default: import_price_stock.json)")
+    sync.add_argument('--batch-size', type=int, default=500, help="variants per batch of UPDATEs (default: 500)")
+    sync.add_argument('--dry-run', action='store_true', help="write the delta without applying it")
+    sync.set_defaults(run=cmd_sync)
+
+    generate = commands.add_parser('generate', help="run generate_import_final.py on --workbook (options are passed through)",
+                                   add_help=False)
+    generate.set_defaults(run=cmd_generate)
+
+    watch = commands.add_parser('watch', allow_abbrev=False,
+                                help="import every new or changed export dropped into a directory "
+                                "(unknown options are passed to generate_import_final.py)")
+    watch.add_argument('--dir', default=DEFAULT_WATCH_DIR, help=f"directory to watch (default: {DEFAULT_WATCH_DIR})")
+    watch.add_argument('--pattern', default=DEFAULT_PATTERN, help=f"workbook file names to import (default: {DEFAULT_PATTERN})")
+    watch.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                       help=f"where each workbook's export (<name>.json) and its other files go (default: {DEFAULT_OUTPUT_DIR})")
+    watch.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help=f"seconds a file must stay unchanged before it is imported (default: {DEFAULT_SETTLE_SECONDS:g})")
+    watch.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_SECONDS,
+                       help=f"polling interval without watchdog installed (default: {DEFAULT_INTERVAL_SECONDS:g})")
+    watch.add_argument('--once', action='store_true', help="import the workbooks there now, then exit")
+    watch.set_defaults(run=cmd_watch)
+
+    # Whatever follows "generate" is the script's (argparse.REMAINDER does not take leading options), and so
+    # are the options watch does not know
+    args, extra = parser.parse_known_args(argv)
+    if args.command in ('generate', 'watch'):
+        args.options = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        args.run(args)
+    except (SheetNotFound, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except BrokenPipeError:
+        # Output piped into head & co.
+        sys.stderr.close()
@@ -0,0 +1,218 @@
+"""Columnar (Arrow IPC) cache of parsed workbook sheets.
+
+Parsing the xlsx is the slowest step of every script, and it is repeated each
+time sheet_map or the translations change. The first run converts each sheet
+to an Arrow IPC file under .import_cache/columnar/<workbook hash>/; later runs
+memory-map those files instead of parsing the spreadsheet.
+
+The cache is keyed by the workbook's content hash. The hash is only
+recomputed when the file's size or mtime changes, so checking freshness is a
+stat() call. Cells are stored as their text (str() of the value the reader
+produced, null when missing): every consumer str()s them anyway, and it keeps
+the mixed-type MercadoLibre columns representable.
+
+pyarrow is optional. Without it open_cache() returns None and the
+load_* helpers read the workbook directly.
+"""
+import hashlib
+import json
+import os
+from itertools import islice
+
+from catalog_import.reader import (
+    DEFAULT_CHUNK_SIZE, iter_records, iter_sheet_rows, normalize_header, shared_workbook, sheet_frames
+)
+from catalog_import.schema import CACHE_DIR, workbook_hash
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+ROW_COLUMN = '__row'
+COLUMNAR_CACHE_VERSION = 1
+
+
+def _sheet_key(sheet_name, header_row):
+    digest = hashlib.blake2b(sheet_name.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{digest}-h{header_row}"
+
+
+class ColumnarCache:
+    def __init__(self, path, root=None):
+        self.path = path
+        self.root = os.path.join(root or CACHE_DIR, 'columnar')
+        self.dir = os.path.join(self.root, f"v{COLUMNAR_CACHE_VERSION}-{self._hash()}")
+
+    def _hash(self):
+        # path -> (size, mtime, hash), so an untouched workbook is never re-hashed
+        index_path = os.path.join(self.root, 'index.json')
+        index = {}
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                index = json.load(f)
+
+        stat = os.stat(self.path)
+        key = os.path.abspath(self.path)
+        entry = index.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['hash']
+
+        digest = workbook_hash(self.path)
+        index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+        _write_json(index_path, index)
+        return digest
+
+    def sheet_file(self, sheet_name, header_row=0):
+        return os.path.join(self.dir, _sheet_key(sheet_name, header_row) + '.arrow')
+
+    def has_sheet(self, sheet_name, header_row=0):
+        return os.path.exists(self.sheet_file(sheet_name, header_row))
+
+    def sheet_names(self):
+        """Sheet names of the workbook as recorded by save_sheet_names(), or None."""
+        meta_path = os.path.join(self.dir, 'workbook.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)['sheet_names']
+
+    def save_sheet_names(self, names):
+        _write_json(os.path.join(self.dir, 'workbook.json'), {"sheet_names": list(names)})
+
+    def build_sheet(self, worksheet, sheet_name, header_row=0, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Convert one sheet to an Arrow IPC file, streaming it in record batches."""
+        columns, rows = iter_sheet_rows(worksheet, header_row, row_numbers=True)
+        fields = [pa.field(f"c{i}", pa.string()) for i in range(len(columns))]
+        fields.append(pa.field(ROW_COLUMN, pa.int32()))
+        schema = pa.schema(fields, metadata={
+            'sheet_name': sheet_name,
+            'columns': json.dumps([str(c) for c in columns], ensure_ascii=False),
+        })
+
+        target = self.sheet_file(sheet_name, header_row)
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                arrays = [
+                    pa.array([None if values[i] is None else str(values[i]) for _, values in chunk], pa.string())
+                    for i in range(len(columns))
+                ]
+                arrays.append(pa.array([number for number, _ in chunk], pa.int32()))
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+        os.replace(tmp_path, target)
+
+    def read_table(self, sheet_name, header_row=0):
+        """Return (columns, table) with the table memory-mapped from the cache file."""
+        source = pa.memory_map(self.sheet_file(sheet_name, header_row), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        columns = json.loads(table.schema.metadata[b'columns'].decode('utf-8'))
+        return columns, table
+
+    def row_count(self, sheet_name, header_row=0):
+        with pa.memory_map(self.sheet_file(sheet_name, header_row), 'r') as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+    def slice_rows(self, table, row_range):
+        """The part of the table whose Excel rows fall in row_range=(min_row, max_row)."""
+        if row_range is None:
+            return table
+        import numpy as np
+
+        numbers = table.column(ROW_COLUMN).to_numpy()
+        min_row, max_row = row_range
+        start = np.searchsorted(numbers, min_row, side='left')
+        stop = len(numbers) if max_row is None else np.searchsorted(numbers, max_row, side='right')
+        return table.slice(start, stop - start)
+
+    def sheet_frames(self, sheet_name, header_row=0, chunk_size=DEFAULT_CHUNK_SIZE, normalize=True, row_range=None):
+        """Same contract as reader.sheet_frames(), served from the cache file."""
+        import numpy as np
+        import pandas as pd
+
+        columns, table = self.read_table(sheet_name, header_row)
+        table = self.slice_rows(table, row_range).drop_columns([ROW_COLUMN])
+        if normalize:
+            columns = normalize_header(columns)
+
+        def generate():
+            for start in range(0, table.num_rows, chunk_size):
+                part = table.slice(start, chunk_size)
+                # One object block for the whole chunk; per-column pandas conversion is far slower
+                values = np.empty((part.num_rows, part.num_columns), dtype=object)
+                for i, column in enumerate(part.columns):
+                    values[:, i] = column.to_numpy(zero_copy_only=False)
+                values[pd.isna(values)] = np.nan
+                yield pd.DataFrame(values, columns=columns, index=range(start, start + part.num_rows))
+
+        return columns, generate()
+
+    def iter_records(self, sheet_name, header_row=0):
+        columns, table = self.read_table(sheet_name, header_row)
+        columns = normalize_header(columns)
+        for batch in table.drop_columns([ROW_COLUMN]).to_batches():
+            for values in zip(*(col.to_pylist() for col in batch.columns)):
+                yield dict(zip(columns, values))
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+_caches = {}
+
+
+def open_cache(path):
+    """The columnar cache for a workbook, or None when pyarrow is not installed."""
+    if pa is None:
+        return None
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _caches:
+        _caches[memo_key] = ColumnarCache(path)
+    return _caches[memo_key]
+
+
+def ensure_sheet(cache, path, sheet_name, header_row=0):
+    if not cache.has_sheet(sheet_name, header_row):
+        cache.build_sheet(shared_workbook(path)[sheet_name], sheet_name, header_row)
+
+
+def load_sheet_frames(path, sheet_name, header_row=0, chunk_size=DEFAULT_CHUNK_SIZE, normalize=True,
+                      row_range=None, use_cache=True):
+    """reader.sheet_frames() for a sheet of the workbook at path, through the cache when possible."""
+    cache = open_cache(path) if use_cache else None
+    if cache is None:
+        return sheet_frames(shared_workbook(path)[sheet_name], header_row, chunk_size, normalize, row_range)
+    ensure_sheet(cache, path, sheet_name, header_row)
+    return cache.sheet_frames(sheet_name, header_row, chunk_size, normalize, row_range)
+
+
+def load_records(path, sheet_name, header_row=0, use_cache=True):
+    """reader.iter_records() for a sheet of the workbook at path, through the cache when possible."""
+    cache = open_cache(path) if use_cache else None
+    if cache is None:
+        return iter_records(shared_workbook(path)[sheet_name], header_row)
+    ensure_sheet(cache, path, sheet_name, header_row)
+    return cache.iter_records(sheet_name, header_row)
+
+
+def workbook_sheet_names(path, use_cache=True):
+    """All sheet names, without opening the workbook once the cache has recorded them."""
+    cache = open_cache(path) if use_cache else None
+    names = cache.sheet_names() if cache is not None else None
+    if names is None:
+        names = shared_workbook(path).sheetnames
+        if cache is not None:
+            cache.save_sheet_names(names)
+    return names
@@ -0,0 +1,158 @@
+"""Near-duplicate products: the same listing exported twice, under another sheet or title.
+
+Records are compared on their title tokens (text.tokenize: folded,
+stopwords out) with the Jaccard similarity. Comparing every pair is
+quadratic, so records are first split into blocks that duplicates always
+share:
+- the brand (folded), or the category when the brand is the placeholder,
+- the tokens holding digits ("300m", "x12", "3-9x40"): titles that differ
+  there are different sizes or models of a product, not duplicates.
+Within a block, prefix filtering finds the candidates: with the tokens of
+every title in one fixed order, two titles with a similarity of at least t
+share a token among the first n - ceil(t * n) + 1 of either (n = its token
+count). Only those prefix tokens are indexed, so a record is only scored
+against the few earlier records sharing one of them, and the result is the
+same as scoring every pair of the block.
+
+The index is built as the export streams: each record is matched against
+the earlier ones only, and joins the cluster of its best match. The first
+record of a cluster is its canonical record and the cluster's ID is its
+slug. Every record is exported with its "cluster_id" (the canonical record
+with its own slug: when it is written, it is not known yet whether
+duplicates will follow, so a record without duplicates is a cluster of
+one); the others also get "duplicate_of": the same slug, and neither
+loader imports them.
+"""
+import math
+import os
+from collections import defaultdict, namedtuple
+
+from catalog_import.text import fold, tokenize
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_DUPLICATES_PATH = 'import_duplicates.json'
+
+# Brand of records whose sheet had none (transform_sheet)
+PLACEHOLDER_BRAND = fold('Genérico')
+
+Member = namedtuple('Member', ['slug', 'name', 'category_slug', 'import_key', 'score'])
+
+
+def _order(token):
+    # Long words are the rare ones, so they go first and keep the prefixes selective;
+    # digit tokens are the same for the whole block and go last
+    return (any(c.isdigit() for c in token), -len(token), token)
+
+
+def title_key(record):
+    """(block, tokens) of a record: tokens are its distinct title tokens in prefix order."""
+    tokens = sorted(set(tokenize(record['name'])), key=_order)
+    brand = fold(record.get('brand_name') or '').strip()
+    owner = ('brand', brand) if brand and brand != PLACEHOLDER_BRAND else ('category', record['category_slug'])
+    return (owner, tuple(t for t in tokens if _order(t)[0])), tokens
+
+
+def jaccard(a, b):
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class DuplicateIndex:
+    """Assigns each added record to a cluster of near-duplicates of earlier records.
+
+    add() returns the cluster ID (the canonical record's slug) when the
+    record duplicates an earlier one, else None.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"similarity threshold must be in (0, 1], not {threshold}")
+        self.threshold = threshold
+        self.tokens = []    # record number -> frozenset of title tokens
+        self.cluster = []   # record number -> number of its canonical record
+        self.members = {}   # canonical record number -> [Member], canonical first
+        self.postings = defaultdict(list)  # (block, token) -> record numbers
+        self.records = 0
+        self.pairs_scored = 0
+
+    def _prefix(self, count):
+        return count - math.ceil(self.threshold * count - 1e-9) + 1
+
+    def _best_match(self, block, tokens, token_set):
+        low, high = self.threshold * len(tokens), len(tokens) / self.threshold
+        best, best_score = None, 0.0
+        seen = set()
+        for token in tokens[:self._prefix(len(tokens))]:
+            for candidate in self.postings.get((block, token), ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other = self.tokens[candidate]
+                if not low <= len(other) <= high:
+                    continue
+                self.pairs_scored += 1
+                score = jaccard(token_set, other)
+                # Earliest record wins ties, so the result does not depend on posting order
+                if score > best_score or (score == best_score and best is not None and candidate < best):
+                    best, best_score = candidate, score
+        return (best, best_score) if best_score >= self.threshold else (None, None)
+
+    def add(self, record):
+        number = self.records
+        self.records += 1
+        block, tokens = title_key(record)
+        token_set = frozenset(tokens)
+        self.tokens.append(token_set)
+        if not tokens:
+            # Nothing to compare on (a title of stopwords only)
+            self.cluster.append(number)
+            return None
+
+        match, score = self._best_match(block, tokens, token_set)
+        for token in tokens[:self._prefix(len(tokens))]:
+            self.postings[(block, token)].append(number)
+
+        member = Member(record.get('slug'), record['name'], record['category_slug'], record.get('import_key'), score)
+        if match is None:
+            self.cluster.append(number)
+            self.members[number] = [member]
+            return None
+        canonical = self.cluster[match]
+        self.cluster.append(canonical)
+        self.members[canonical].append(member)
+        return self.members[canonical][0].slug
+
+    def mark(self, record):
+        """add() the record and set its "cluster_id" (and, if it is a duplicate, "duplicate_of"); returns add()'s result."""
+        duplicate_of = self.add(record)
+        record['cluster_id'] = duplicate_of or record.get('slug')
+        if duplicate_of is not None:
+            record['duplicate_of'] = duplicate_of
+        return duplicate_of
+
+    def clusters(self):
+        """Clusters with duplicates, in export order of their canonical record."""
+        return [members for members in self.members.values() if len(members) > 1]
+
+    def report(self, source):
+        clusters = self.clusters()
+        return {
+            "source": os.path.basename(source),
+            "threshold": self.threshold,
+            "totals": {
+                "records": self.records,
+                "clusters": len(clusters),
+                "duplicates": sum(len(members) - 1 for members in clusters),
+                "pairs_scored": self.pairs_scored,
+            },
+            "clusters": [
+                {
+                    "cluster_id": members[0].slug,
+                    "members": [
+                        {**member._asdict(), "score": round(member.score, 3) if member.score is not None else None}
+                        for member in members
+                    ],
+                }
+                for members in clusters
+            ],
+        }
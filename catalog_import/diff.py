@@ -0,0 +1,135 @@
+"""Diff of two Fichas técnicas workbooks, as a patch for the loader.
+
+Both workbooks go through the same pipeline as generate_import_final.py
+(same category rules, variant grouping, attributes and slugs), and their
+records are joined on import_key: the SKU, else the publication/family ID,
+else the folded title (transform._import_keys). The base side is indexed in
+one dict, so the join is linear in records. Only records whose content hash
+differs are compared field by field.
+
+The patch has the shape of the generator's --incremental delta:
+- "added": full records of the new workbook,
+- "changed": full new records, plus "base_slug" (the slug the record had in
+  the base export, i.e. in a database loaded from it) and "changes",
+- "removed": import_key, name and slug of base records that are gone,
+so loader.apply_patch() applies either.
+"""
+import os
+
+from catalog_import.columnar import workbook_sheet_names
+from catalog_import.dedup import DEFAULT_THRESHOLD, DuplicateIndex
+from catalog_import.manifest import record_hash
+from catalog_import.pipeline import iter_sheet_results, iter_task_results, plan_tasks
+from catalog_import.reader import product_sheet_names
+from catalog_import.slugs import SlugIndex
+from catalog_import.variants import group_variants
+
+PATCH_VERSION = 1
+DEFAULT_PATCH_PATH = 'import_data_patch.json'
+
+# What a change is made of; slugs and sheet names follow from these
+CONTENT_FIELDS = ['name', 'category_slug', 'brand_name', 'sku', 'description', 'attributes', 'shipping', 'shipping_class',
+                  'images', 'variants', 'duplicate_of']
+VARIANT_FIELDS = ['name', 'sku', 'attributes', 'shipping']
+
+
+def workbook_records(path, rules, plan_options, workers=1, use_cache=True, dedup_threshold=DEFAULT_THRESHOLD):
+    """The export records of a workbook, as generate_import_final.py writes them, with unique import_keys.
+
+    dedup_threshold=None leaves duplicates unmarked (the generator's --no-dedup).
+    """
+    sheet_names = product_sheet_names(workbook_sheet_names(path, use_cache))
+    tasks = plan_tasks(sheet_names, rules, {})
+    slugs = SlugIndex()
+    dedup = DuplicateIndex(dedup_threshold) if dedup_threshold is not None else None
+    seen = {}
+    for report, products in iter_sheet_results(iter_task_results(path, tasks, workers, use_cache, plan_options)):
+        if report.status == 'failed':
+            raise RuntimeError(f"{path}: sheet {report.sheet_name} failed: {report.message}")
+        if plan_options.get('variants'):
+            products = group_variants(products)
+        for product in products:
+            product['slug'] = slugs.claim_name(product['name'])
+            if dedup is not None:
+                dedup.mark(product)
+            # Repeated keys get "#2", "#3"... in order, as in the manifest
+            key = product['import_key']
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                product['import_key'] = f"{key}#{seen[key]}"
+            yield product
+
+
+def content_hash(record):
+    return record_hash({field: record.get(field) for field in CONTENT_FIELDS})
+
+
+def _value_changes(old, new):
+    """{key: {"old", "new"}} of two dicts (None for a missing side)."""
+    old, new = old or {}, new or {}
+    return {
+        key: {"old": old.get(key), "new": new.get(key)}
+        for key in list(old) + [k for k in new if k not in old]
+        if old.get(key) != new.get(key)
+    }
+
+
+def _variant_changes(old, new):
+    old = {v['import_key']: v for v in old or []}
+    new = {v['import_key']: v for v in new or []}
+    changed = {}
+    for key in old.keys() & new.keys():
+        fields = {f: {"old": old[key].get(f), "new": new[key].get(f)} for f in VARIANT_FIELDS if old[key].get(f) != new[key].get(f)}
+        if fields:
+            changed[key] = fields
+    return {
+        "added": [new[k]['name'] for k in new if k not in old],
+        "removed": [old[k]['name'] for k in old if k not in new],
+        "changed": changed,
+    }
+
+
+def record_changes(old, new):
+    """Field-level changes between two versions of a record."""
+    changes = {}
+    for field in CONTENT_FIELDS:
+        if old.get(field) == new.get(field):
+            continue
+        if field in ('attributes', 'shipping'):
+            changes[field] = _value_changes(old.get(field), new.get(field))
+        elif field == 'variants':
+            changes[field] = _variant_changes(old.get(field), new.get(field))
+        else:
+            changes[field] = {"old": old.get(field), "new": new.get(field)}
+    return changes
+
+
+def diff_records(base, records):
+    """Return the patch between two iterables of export records (base = the older one)."""
+    # Hash join: the base side is indexed once, the new side streamed against it
+    index = {record['import_key']: (content_hash(record), record) for record in base}
+    added, changed = [], []
+    unchanged = 0
+    for record in records:
+        entry = index.pop(record['import_key'], None)
+        if entry is None:
+            added.append(record)
+            continue
+        digest, old = entry
+        if digest == content_hash(record):
+            unchanged += 1
+            continue
+        changed.append({**record, "base_slug": old['slug'], "changes": record_changes(old, record)})
+    removed = [{"import_key": key, "name": old['name'], "slug": old['slug']} for key, (_, old) in index.items()]
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "summary": {"added": len(added), "changed": len(changed), "removed": len(removed), "unchanged": unchanged},
+    }
+
+
+def diff_workbooks(base_path, path, rules, plan_options, workers=1, use_cache=True, dedup_threshold=DEFAULT_THRESHOLD):
+    patch = diff_records(workbook_records(base_path, rules, plan_options, workers, use_cache, dedup_threshold),
+                         workbook_records(path, rules, plan_options, workers, use_cache, dedup_threshold))
+    return {"version": PATCH_VERSION, "base_source": os.path.basename(base_path), "source": os.path.basename(path), **patch}
@@ -0,0 +1,202 @@
+"""Run metrics of the import, as JSON lines.
+
+Every run appends to a metrics file (import_metrics.jsonl by default):
+- one "stage" record per stage: wall seconds, rows and rows/s, the
+  process' RSS at the end of the stage and how much it grew during the
+  stage (rss_delta_mb, summed over the pieces of an interleaved stage),
+- one "sheet" record per sheet: the same, measured in the process (worker
+  or not) that read and transformed it,
+- with profiling on, "function" records for the hottest functions
+  (cProfile) and "allocation" records for the lines holding the most memory
+  at the end of the run (tracemalloc); stage records then also carry the
+  peak of the memory traced during the stage,
+- a final "run" record with the totals and the run's peak RSS.
+RSS is read from /proc (Linux); elsewhere the per-stage figures are null.
+All records of a run share its run_id, so runs can be compared over time
+with any JSON-lines tool (jq, pandas.read_json(lines=True)...).
+"""
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+DEFAULT_METRICS_PATH = 'import_metrics.jsonl'
+DEFAULT_PROFILE_PATH = 'import_profile.prof'
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+
+def peak_rss_mb():
+    """Peak RSS of the process over its whole life (so far)."""
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def rss_mb():
+    """Current RSS of the process, unrounded, or None where /proc/self/statm does not exist."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def rss_delta(before):
+    """RSS growth since before (an rss_mb() reading), or None if RSS cannot be read."""
+    after = rss_mb()
+    return None if before is None or after is None else after - before
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', '*.py']).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+dirty' if dirty else '')
+
+
+def rate(rows, seconds):
+    return round(rows / seconds) if rows is not None and seconds else None
+
+
+def _mb(value):
+    return None if value is None else round(value, 1)
+
+
+class Metrics:
+    """Collects the stage, sheet and profile records of one run; write() appends them to path.
+
+    Stages can be timed as a block (with metrics.stage(name): ...) or, when
+    their work is interleaved with other stages, accumulated piece by piece
+    with add(). With profile=True the whole run is under cProfile and
+    tracemalloc from start() to write(), which slows it down noticeably.
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_PATH, script=None, profile=False, profile_path=DEFAULT_PROFILE_PATH):
+        self.path = path
+        self.profile = profile
+        self.profile_path = profile_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.script = script or os.path.basename(sys.argv[0])
+        self.stages = {}
+        self.records = []
+        self.profiler = None
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.profile:
+            tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def _record(self, kind, **fields):
+        self.records.append({"run_id": self.run_id, "type": kind, **fields})
+
+    def add(self, stage, seconds, rows=None, rss_delta=None):
+        """Add seconds (and rows, and RSS growth in MiB) to stage; the first call fixes its position in the output."""
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "rows": None, "rss_mb": None, "rss_delta_mb": None})
+        entry['seconds'] += seconds
+        if rows is not None:
+            entry['rows'] = (entry['rows'] or 0) + rows
+        if rss_delta is not None:
+            entry['rss_delta_mb'] = (entry['rss_delta_mb'] or 0) + rss_delta
+        entry['rss_mb'] = rss_mb()
+        if self.profile:
+            entry['traced_peak_mb'] = max(entry.get('traced_peak_mb', 0), round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1))
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        rss = rss_mb()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started, rows, rss_delta(rss))
+
+    def timed(self, name, iterable):
+        """Yield the items of iterable, adding the time spent producing each to stage name."""
+        iterator = iter(iterable)
+        while True:
+            rss = rss_mb()
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - started, rss_delta=rss_delta(rss))
+                return
+            self.add(name, time.perf_counter() - started, rss_delta=rss_delta(rss))
+            yield item
+
+    def sheet(self, name, seconds, rows, products, rss_delta_mb=None, status='ok'):
+        self._record("sheet", sheet=name, status=status, seconds=round(seconds, 4), rows=rows, products=products,
+                     rows_per_second=rate(rows, seconds), rss_delta_mb=_mb(rss_delta_mb))
+
+    def _profile_records(self):
+        self.profiler.disable()
+        # Memory still held at the end of the run, leaving out the profilers' own bookkeeping
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        tracemalloc.stop()
+
+        self.profiler.dump_stats(self.profile_path)
+        stats = pstats.Stats(self.profiler)
+        hottest = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:TOP_FUNCTIONS]
+        for (filename, line, function), (_, calls, own, cumulative, _) in hottest:
+            self._record("function", function=function, file=filename, line=line, calls=calls,
+                         own_seconds=round(own, 4), cumulative_seconds=round(cumulative, 4))
+
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            self._record("allocation", file=frame.filename, line=frame.lineno, size_mb=round(stat.size / 2 ** 20, 3),
+                         blocks=stat.count)
+
+    def write(self, **totals):
+        """Append the run's records to the metrics file; totals go to the final "run" record."""
+        seconds = time.perf_counter() - self.started
+        if self.profiler is not None:
+            self._profile_records()
+
+        stage_records = [
+            {"run_id": self.run_id, "type": "stage", "stage": name, "seconds": round(entry['seconds'], 4),
+             "rows": entry['rows'], "rows_per_second": rate(entry['rows'], entry['seconds']),
+             "rss_mb": _mb(entry['rss_mb']), "rss_delta_mb": _mb(entry['rss_delta_mb']),
+             **{k: v for k, v in entry.items() if k not in ('seconds', 'rows', 'rss_mb', 'rss_delta_mb')}}
+            for name, entry in self.stages.items()
+        ]
+        run = {
+            "run_id": self.run_id,
+            "type": "run",
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "script": self.script,
+            "commit": git_revision(),
+            "python": platform.python_version(),
+            "seconds": round(seconds, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "profiled": self.profile,
+            **totals,
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in stage_records + self.records + [run]:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return run
+
+    def hottest(self, count=10):
+        """The profiled functions with the most cumulative time, as recorded by write()."""
+        return [r for r in self.records if r['type'] == 'function'][:count]
@@ -0,0 +1,481 @@
+"""Bulk loader: writes the export straight into the application's database.
+
+Does what ImportExcelProductsSeeder does, without its per-record queries:
+categories, brands and taken slugs/SKUs are read once into dicts/sets, new brands
+are inserted once per batch, and products, their variants and their
+product_attributes go in as multi-row INSERTs, all inside one transaction
+(a failed import leaves the database untouched).
+
+Only SQLite is supported (the app's default connection, database/database.sqlite).
+"""
+import json
+import re
+import sqlite3
+from datetime import datetime, timezone
+from itertools import islice
+
+from catalog_import.categories import category_id_for
+from catalog_import.slugs import SlugIndex, slugify
+
+DEFAULT_DATABASE = 'database/database.sqlite'
+DEFAULT_BATCH_SIZE = 500
+
+# Lowest SQLITE_MAX_VARIABLE_NUMBER of any SQLite build still around
+MAX_VARIABLES = 999
+
+DEFAULT_BRAND = 'Genérico'
+FALLBACK_CATEGORY = 'outdoor'
+DEFAULT_SHIPPING_CLASS = 'NORMAL'
+
+# Same defaults as the seeder (MAIN_IMAGE_URL for records without a fetched picture)
+BASE_PRICE = 14990
+MAIN_IMAGE_URL = '/images/imagenesdemo/5.png'
+VARIANT_NAME = 'Estándar'
+SKU_LENGTH = 100  # product_variants.sku
+
+PRODUCT_COLUMNS = [
+    'name', 'slug', 'category_id', 'brand_id', 'shipping_class_id', 'description', 'short_description',
+    'base_price', 'is_active', 'is_restricted', 'age_verification_required', 'main_image_url',
+    'gallery', 'thumbnail_url', 'created_at', 'updated_at',
+]
+ATTRIBUTE_COLUMNS = ['product_id', 'attributes', 'created_at', 'updated_at']
+# Keys of the export's "shipping" measures, named after their product_variants columns
+SHIPPING_MEASURES = ['weight_kg', 'length_cm', 'width_cm', 'height_cm', 'volumetric_weight_kg']
+VARIANT_COLUMNS = ['product_id', 'name', 'sku', 'source_sku', 'import_key', 'variant_attributes', 'price', 'stock_quantity', 'is_active',
+                   'created_at', 'updated_at', *SHIPPING_MEASURES]
+
+
+def unique_sku(slug, taken, length=SKU_LENGTH):
+    """The slug cut to the sku column's length, with a -N suffix (inside the limit) if taken."""
+    sku = slug[:length]
+    counter = 1
+    while sku in taken:
+        suffix = f"-{counter}"
+        sku = slug[:length - len(suffix)] + suffix
+        counter += 1
+    taken.add(sku)
+    return sku
+
+
+def _variants(record):
+    # Grouped exports list the variants; older ones get the seeder's single default variant,
+    # keyed by the record's row (without the "#N" of a repeated key)
+    return record.get('variants') or [{"name": VARIANT_NAME, "sku": None, "attributes": {},
+                                       "import_key": (record.get('import_key') or '').partition('#')[0] or None}]
+
+
+def _strip_tags(text):
+    return re.sub(r'<[^>]*>', '', text)
+
+
+def _variant_measures(record, variant):
+    # Exports without grouped variants carry the row's measures on the record itself
+    shipping = variant.get('shipping', record.get('shipping')) or {}
+    return tuple(shipping.get(key) for key in SHIPPING_MEASURES)
+
+
+def _gallery(record):
+    # Set with main_image_url by the generator's --fetch-images; products.gallery is a JSON array
+    return json.dumps(record['gallery'], ensure_ascii=False) if 'gallery' in record else None
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_rows(conn, table, columns, rows, returning=None):
+    """Multi-row INSERT of rows (tuples), split to stay under MAX_VARIABLES.
+
+    With returning (a column list), the RETURNING rows of every statement
+    are collected and returned.
+    """
+    per_statement = max(MAX_VARIABLES // len(columns), 1)
+    placeholder = '(' + ', '.join('?' * len(columns)) + ')'
+    returned = []
+    for batch in _batches(rows, per_statement):
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholder] * len(batch))}"
+        if returning:
+            sql += f" RETURNING {', '.join(returning)}"
+        cursor = conn.execute(sql, [value for row in batch for value in row])
+        if returning:
+            returned.extend(cursor.fetchall())
+    return returned
+
+
+class BulkLoader:
+    """Loads export records into an open connection; use it inside a transaction.
+
+    Records are loaded with load(iterable), or one by one with write() and
+    a final close(), which loads whatever is still pending.
+    """
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+        self.categories = dict(conn.execute("SELECT slug, id FROM categories"))
+        self.category_ids = set(self.categories.values())
+        self.brands = dict(conn.execute("SELECT slug, id FROM brands"))
+        self.slugs = SlugIndex(slug for (slug,) in conn.execute("SELECT slug FROM products"))
+        # Slugs are cut to 100 characters for the sku, so long ones can collide there
+        self.skus = {sku for (sku,) in conn.execute("SELECT sku FROM product_variants")}
+        self.shipping_class_id = self._shipping_class()
+        self.shipping_classes = dict(conn.execute("SELECT code, id FROM shipping_classes"))
+        self.resolved = {}
+        self.pending = []
+
+        self.imported = 0
+        self.skipped = []
+        self.brands_created = 0
+        self.updated = 0
+        self.deactivated = 0
+        self.duplicates = 0
+
+    def _shipping_class(self):
+        row = self.conn.execute("SELECT id FROM shipping_classes WHERE code = ?", (DEFAULT_SHIPPING_CLASS,)).fetchone()
+        if row:
+            return row[0]
+        cursor = self.conn.execute(
+            "INSERT INTO shipping_classes (code, name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (DEFAULT_SHIPPING_CLASS, 'Envío Normal', self.now, self.now)
+        )
+        return cursor.lastrowid
+
+    def shipping_class(self, record):
+        """The id of the record's shipping class (by size, from the export), None when it has none."""
+        return self.shipping_classes.get(record.get('shipping_class'))
+
+    def category_id(self, record):
+        """The record's category_id when the generator resolved it, else its slug's (with the seeder's fallbacks)."""
+        if record.get('category_id') in self.category_ids:
+            return record['category_id']
+        slug = record['category_slug']
+        if slug not in self.resolved:
+            self.resolved[slug] = category_id_for(slug, self.categories, FALLBACK_CATEGORY)
+        return self.resolved[slug]
+
+    def _brand_slugs(self, records):
+        """Brand slug of each record; brands not in the database yet are inserted in one statement."""
+        slugs = []
+        missing = {}
+        for record in records:
+            name = record.get('brand_name') or DEFAULT_BRAND
+            if name == 'nan':
+                name = DEFAULT_BRAND
+            slug = slugify(name)
+            slugs.append(slug)
+            if slug not in self.brands:
+                missing.setdefault(slug, name)
+
+        if missing:
+            rows = [(name, slug, self.now, self.now) for slug, name in missing.items()]
+            for brand_id, slug in insert_rows(self.conn, 'brands', ['name', 'slug', 'created_at', 'updated_at'],
+                                              rows, returning=['id', 'slug']):
+                self.brands[slug] = brand_id
+            self.brands_created += len(missing)
+        return slugs
+
+    def load_batch(self, records):
+        products = []
+        for record in records:
+            # Near-duplicates of another record of the export (catalog_import.dedup)
+            if record.get('duplicate_of'):
+                self.duplicates += 1
+                continue
+            category_id = self.category_id(record)
+            if category_id is None:
+                self.skipped.append(record['name'])
+                continue
+            products.append((record, category_id))
+
+        brand_slugs = self._brand_slugs([record for record, _ in products])
+
+        rows = []
+        by_slug = {}
+        for (record, category_id), brand_slug in zip(products, brand_slugs):
+            # Exports carry a slug already; it only changes if the database gained it since
+            slug = self.slugs.claim(record.get('slug') or slugify(record['name']))
+            by_slug[slug] = record
+            description = record.get('description') or 'Sin descripción.'
+            rows.append((
+                record['name'][:255], slug, category_id, self.brands[brand_slug],
+                self.shipping_class(record) or self.shipping_class_id,
+                description[:5000], _strip_tags(record.get('description') or '')[:160],
+                BASE_PRICE, True, False, False, record.get('main_image_url') or MAIN_IMAGE_URL, _gallery(record),
+                record.get('thumbnail_url'), self.now, self.now
+            ))
+
+        inserted = insert_rows(self.conn, 'products', PRODUCT_COLUMNS, rows, returning=['id', 'slug'])
+        variants = []
+        for product_id, slug in inserted:
+            for variant in _variants(by_slug[slug]):
+                attributes = json.dumps(variant['attributes'], ensure_ascii=False) if variant['attributes'] else None
+                sku = unique_sku(variant['sku'] or slug, self.skus)
+                variants.append((product_id, variant['name'], sku, variant['sku'], variant.get('import_key'), attributes, BASE_PRICE, 0,
+                                 True, self.now, self.now, *_variant_measures(by_slug[slug], variant)))
+        insert_rows(self.conn, 'product_variants', VARIANT_COLUMNS, variants)
+
+        attributes = [
+            (product_id, json.dumps(by_slug[slug]['attributes'], ensure_ascii=False), self.now, self.now)
+            for product_id, slug in inserted
+            if by_slug[slug].get('attributes')
+        ]
+        insert_rows(self.conn, 'product_attributes', ATTRIBUTE_COLUMNS, attributes)
+        self.imported += len(inserted)
+
+    def _product_ids(self, slugs):
+        """{slug: id} of the products with these slugs."""
+        found = {}
+        for batch in _batches(slugs, MAX_VARIABLES):
+            found.update(self.conn.execute(
+                f"SELECT slug, id FROM products WHERE slug IN ({', '.join('?' * len(batch))})", batch
+            ))
+        return found
+
+    def update_batch(self, records):
+        """Update products in place from changed patch records, found by base_slug (else slug).
+
+        Slugs are kept, so product URLs do not move. Variants are matched by
+        name: matches are updated, new ones inserted, and the ones no longer
+        listed deactivated. Records whose product is not in the database
+        are inserted instead; records that became duplicates of another
+        record deactivate their product.
+        """
+        duplicates = [record.get('base_slug') or record['slug'] for record in records if record.get('duplicate_of')]
+        if duplicates:
+            self.deactivate(duplicates)
+            self.duplicates += len(duplicates)
+            records = [record for record in records if not record.get('duplicate_of')]
+        slugs = [record.get('base_slug') or record['slug'] for record in records]
+        ids = self._product_ids(slugs)
+        found = [(record, ids[slug]) for record, slug in zip(records, slugs) if slug in ids]
+        missing = [record for record, slug in zip(records, slugs) if slug not in ids]
+        if missing:
+            self.load_batch(missing)
+        if not found:
+            return
+
+        brand_slugs = self._brand_slugs([record for record, _ in found])
+        self.conn.executemany(
+            "UPDATE products SET name = ?, category_id = COALESCE(?, category_id), brand_id = ?, "
+            "shipping_class_id = COALESCE(?, shipping_class_id), description = ?, short_description = ?, "
+            "main_image_url = COALESCE(?, main_image_url), gallery = COALESCE(?, gallery), "
+            "thumbnail_url = COALESCE(?, thumbnail_url), is_active = 1, "
+            "updated_at = ? WHERE id = ?",
+            [
+                (record['name'][:255], self.category_id(record), self.brands[brand_slug], self.shipping_class(record),
+                 (record.get('description') or 'Sin descripción.')[:5000], _strip_tags(record.get('description') or '')[:160],
+                 record.get('main_image_url'), _gallery(record), record.get('thumbnail_url'), self.now, product_id)
+                for (record, product_id), brand_slug in zip(found, brand_slugs)
+            ]
+        )
+
+        product_ids = [product_id for _, product_id in found]
+        existing = {}
+        for batch in _batches(product_ids, MAX_VARIABLES):
+            for variant_id, product_id, name in self.conn.execute(
+                f"SELECT id, product_id, name FROM product_variants WHERE product_id IN ({', '.join('?' * len(batch))})", batch
+            ):
+                existing.setdefault((product_id, name), []).append(variant_id)
+
+        updates, inserts = [], []
+        for record, product_id in found:
+            slug = record.get('base_slug') or record['slug']
+            for variant in _variants(record):
+                attributes = json.dumps(variant['attributes'], ensure_ascii=False) if variant['attributes'] else None
+                # Each existing variant matches at most one listed variant of the same name
+                matches = existing.get((product_id, variant['name']))
+                measures = _variant_measures(record, variant)
+                if matches:
+                    updates.append((variant['sku'], variant.get('import_key'), attributes, *measures, self.now, matches.pop(0)))
+                else:
+                    sku = unique_sku(variant['sku'] or slug, self.skus)
+                    inserts.append((product_id, variant['name'], sku, variant['sku'], variant.get('import_key'), attributes, BASE_PRICE, 0,
+                                    True, self.now, self.now, *measures))
+        self.conn.executemany(
+            "UPDATE product_variants SET source_sku = ?, import_key = ?, variant_attributes = ?, "
+            + ''.join(f"{column} = ?, " for column in SHIPPING_MEASURES)
+            + "is_active = 1, updated_at = ? WHERE id = ?", updates
+        )
+        insert_rows(self.conn, 'product_variants', VARIANT_COLUMNS, inserts)
+        dropped = [variant_id for unmatched in existing.values() for variant_id in unmatched]
+        self.conn.executemany(
+            "UPDATE product_variants SET is_active = 0, updated_at = ? WHERE id = ?", [(self.now, v) for v in dropped]
+        )
+
+        for batch in _batches(product_ids, MAX_VARIABLES):
+            self.conn.execute(f"DELETE FROM product_attributes WHERE product_id IN ({', '.join('?' * len(batch))})", batch)
+        insert_rows(self.conn, 'product_attributes', ATTRIBUTE_COLUMNS, [
+            (product_id, json.dumps(record['attributes'], ensure_ascii=False), self.now, self.now)
+            for record, product_id in found
+            if record.get('attributes')
+        ])
+        self.updated += len(found)
+
+    def deactivate(self, slugs):
+        """Deactivate (not delete: orders may point at them) the products with these slugs."""
+        for batch in _batches(slugs, MAX_VARIABLES - 1):
+            cursor = self.conn.execute(
+                f"UPDATE products SET is_active = 0, updated_at = ? WHERE slug IN ({', '.join('?' * len(batch))})",
+                [self.now, *batch]
+            )
+            self.deactivated += cursor.rowcount
+
+    # Writer interface (like output.JsonArrayWriter), so the generator can load as it exports
+
+    def write(self, record):
+        self.pending.append(record)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.load_batch(self.pending)
+            self.pending = []
+
+    def close(self):
+        self.flush()
+
+    def load(self, records):
+        for batch in _batches(records, self.batch_size):
+            self.load_batch(batch)
+        return self.imported
+
+
+def apply_patch(database, patch, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply a patch (diff.diff_workbooks()) or an --incremental delta in one transaction; returns the BulkLoader.
+
+    Changed records are found by their base_slug and removed ones by their
+    slug, which both carry (removed entries of a manifest written before
+    slugs were kept in it have none, and are left alone). Removed products
+    are deactivated, not deleted: orders may point at them.
+    """
+    conn = connect(database)
+    try:
+        with conn:
+            loader = BulkLoader(conn, batch_size)
+            loader.load(patch['added'])
+            for batch in _batches(patch['changed'], batch_size):
+                loader.update_batch(batch)
+            loader.deactivate([record['slug'] for record in patch['removed'] if record.get('slug')])
+        return loader
+    finally:
+        conn.close()
+
+
+def current_price_stock(database):
+    """{import_key: (price, stock_quantity)} of every variant in the SQLite database, keyed by its workbook row.
+
+    That is the row's import_key (sku:, id: or title:, as the export's
+    variants carry it). Variants loaded before import_key existed fall back
+    to "sku:" + their workbook SKU: source_sku, or sku before that existed.
+    Of variants sharing a key, the first one's values are returned
+    (apply_price_stock() updates them all).
+    """
+    conn = connect(database)
+    try:
+        current = {}
+        for key, price, stock in conn.execute(
+            "SELECT COALESCE(import_key, 'sku:' || COALESCE(source_sku, sku)), price, stock_quantity FROM product_variants ORDER BY id"
+        ):
+            current.setdefault(key, (price, stock))
+        return current
+    finally:
+        conn.close()
+
+
+# The variants a row key stands for, as current_price_stock() keys them (every column is indexed);
+# the parameters are the key and twice its legacy SKU (_legacy_sku())
+_KEY_MATCH = ("(import_key = ? OR (import_key IS NULL AND source_sku = ?) "
+              "OR (import_key IS NULL AND source_sku IS NULL AND sku = ?))")
+
+
+def _legacy_sku(key):
+    # What a variant loaded before import_key existed is matched on: the SKU of a "sku:" key
+    return key[len('sku:'):] if key.startswith('sku:') else None
+
+
+def apply_price_stock(database, changes, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply a price/stock sync delta ({import_key: [price, stock]}, None = keep) in one transaction.
+
+    Keys are matched as current_price_stock() keys them. Products whose
+    variant prices changed get their lowest active variant price as
+    base_price. Returns the number of variants updated.
+    """
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    items = list(changes.items())
+    conn = connect(database)
+    try:
+        with conn:
+            updated = 0
+            for batch in _batches(items, batch_size):
+                cursor = conn.executemany(
+                    "UPDATE product_variants SET price = COALESCE(?, price), stock_quantity = COALESCE(?, stock_quantity), "
+                    f"updated_at = ? WHERE {_KEY_MATCH}",
+                    [(price, stock, now, key, _legacy_sku(key), _legacy_sku(key)) for key, (price, stock) in batch]
+                )
+                updated += cursor.rowcount
+            # Then the lowest active price of every product a price changed in, one grouped query per batch
+            product_ids = set()
+            for batch in _batches([key for key, (price, _) in items if price is not None], MAX_VARIABLES // 3):
+                legacy = [sku for sku in map(_legacy_sku, batch) if sku is not None]
+                query = f"SELECT product_id FROM product_variants WHERE import_key IN ({', '.join('?' * len(batch))})"
+                if legacy:
+                    marks = ', '.join('?' * len(legacy))
+                    query += (f" UNION SELECT product_id FROM product_variants WHERE import_key IS NULL AND source_sku IN ({marks})"
+                              f" UNION SELECT product_id FROM product_variants WHERE import_key IS NULL AND source_sku IS NULL "
+                              f"AND sku IN ({marks})")
+                product_ids.update(product_id for (product_id,) in conn.execute(query, batch + legacy + legacy))
+            for batch in _batches(sorted(product_ids), MAX_VARIABLES):
+                conn.executemany("UPDATE products SET base_price = ?, updated_at = ? WHERE id = ?", [
+                    (price, now, product_id) for product_id, price in conn.execute(
+                        f"SELECT product_id, MIN(price) FROM product_variants WHERE is_active = 1 "
+                        f"AND product_id IN ({', '.join('?' * len(batch))}) GROUP BY product_id", batch
+                    ).fetchall()
+                ])
+        return updated
+    finally:
+        conn.close()
+
+
+def existing_categories(database):
+    """{slug: id} of the categories in the SQLite database at path."""
+    conn = connect(database)
+    try:
+        return dict(conn.execute("SELECT slug, id FROM categories"))
+    finally:
+        conn.close()
+
+
+def existing_slugs(database):
+    """Slugs of the products already in the SQLite database at path."""
+    conn = connect(database)
+    try:
+        return [slug for (slug,) in conn.execute("SELECT slug FROM products")]
+    finally:
+        conn.close()
+
+
+def connect(path=DEFAULT_DATABASE):
+    # file: URIs too, e.g. a shared in-memory database ("file:name?mode=memory&cache=shared")
+    conn = sqlite3.connect(path, uri=True)
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def load_records(database, records, batch_size=DEFAULT_BATCH_SIZE):
+    """Load records into the SQLite database at path in a single transaction; returns the BulkLoader."""
+    conn = connect(database)
+    try:
+        with conn:
+            loader = BulkLoader(conn, batch_size)
+            loader.load(records)
+        return loader
+    finally:
+        conn.close()
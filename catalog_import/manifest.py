@@ -0,0 +1,97 @@
+"""Content-hash manifest for incremental re-imports.
+
+The manifest maps every record's import_key to a hash of its content (and the
+record's name and slug). Comparing a fresh export against the previous
+manifest gives the records that were added, changed or removed, so only those
+need to reach the database. Like a diff.diff_workbooks() patch, the delta
+carries the slug each changed record had ("base_slug") and the slug of every
+removed one, which is how loader.apply_patch() finds them in the database:
+a re-export can claim other slugs (e.g. with --slugs-from db, where the
+old ones are all taken).
+"""
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def record_hash(record):
+    payload = {k: v for k, v in record.items() if k != 'import_key'}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def load_manifest(path):
+    """Return the manifest at path, or None if there is none (or it is from another version)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+class ManifestBuilder:
+    """Builds the manifest one record at a time, comparing against a previous one.
+
+    add() makes the record's import_key unique across the export (repeats get
+    "#2", "#3"... in order) and reports whether it was 'added', 'changed' or
+    is unchanged (None). With no previous manifest every record is added.
+    """
+
+    def __init__(self, source, previous=None):
+        self.source = os.path.basename(source)
+        self.previous = previous['records'] if previous else {}
+        self.base_source = previous['source'] if previous else None
+        self.records = {}
+        self.seen = {}
+
+    def add(self, record):
+        key = record['import_key']
+        self.seen[key] = self.seen.get(key, 0) + 1
+        if self.seen[key] > 1:
+            key = record['import_key'] = f"{key}#{self.seen[key]}"
+
+        digest = record_hash(record)
+        self.records[key] = {"hash": digest, "name": record['name'], "slug": record.get('slug')}
+
+        old = self.previous.get(key)
+        if old is None:
+            return 'added'
+        if old['hash'] != digest:
+            return 'changed'
+        return None
+
+    def base_slug(self, record):
+        """The slug the record had in the previous manifest (manifests from before slugs were kept: its own)."""
+        return self.previous[record['import_key']].get('slug') or record.get('slug')
+
+    def removed(self):
+        return [
+            {"import_key": key, "name": entry['name'], "slug": entry.get('slug')}
+            for key, entry in self.previous.items()
+            if key not in self.records
+        ]
+
+    def manifest(self):
+        return {"version": MANIFEST_VERSION, "source": self.source, "records": self.records}
+
+
+def build_delta(builder, added, changed):
+    return {
+        "base_source": builder.base_source,
+        "source": builder.source,
+        "added": added,
+        "changed": [{**record, "base_slug": builder.base_slug(record)} for record in changed],
+        "removed": builder.removed()
+    }
+
+
+def write_json_atomic(path, data, indent=2):
+    # Write next to the target and rename, so a crash never leaves half a file behind
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
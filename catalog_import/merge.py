@@ -0,0 +1,172 @@
+"""Merge of several Fichas técnicas workbooks into one export: the latest export of a variation wins.
+
+Exports come per seller account and per category family, and list some
+products more than once. merge_workbooks() runs every workbook through the
+generator's pipeline (same category rules, attributes, variant grouping,
+slugs and near-duplicate detection) in one pass, with the sheets of all
+workbooks on one process pool, newest workbook first.
+
+Precedence is decided per row, i.e. per variation, before grouping. A row's
+key is its import_key (the SKU, else the publication ID and variation, else
+the folded title: transform._import_keys); keys go into an index of 8-byte
+hashes, and a row whose key a newer workbook already exported is left out.
+Rows of the same workbook never replace each other. The kept rows are then
+grouped into products sheet by sheet, as the generator groups them: the
+rows of the sheets of the same name in every workbook form one group, so a
+family keeps the variations only an older export lists, and takes its
+product fields from its newest row, but families are never joined across
+sheets. Sheets come in the order the newest workbook lists them, then
+those only older ones have, so merging a single workbook gives exactly the
+generator's export. Since an older workbook can still add to a family, the
+kept rows are held until the last workbook is read; repeated product keys
+get "#2", "#3"..., as in the manifest.
+
+A workbook's date is the one in its file name (Fichas_tecnicas-2026_02_14-18_22.xlsx),
+else its modification time; of two with the same date, the later argument
+is the newer.
+"""
+import hashlib
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from catalog_import.columnar import workbook_sheet_names
+from catalog_import.pipeline import iter_sheet_results, plan_tasks, run_task
+from catalog_import.reader import close_shared_workbooks, product_sheet_names
+from catalog_import.slugs import SlugIndex
+from catalog_import.variants import group_variants
+
+# "2026_02_14-18_22" in the file names of MercadoLibre's exports
+_EXPORT_DATE = re.compile(r'(\d{4})_(\d{2})_(\d{2})-(\d{2})_(\d{2})')
+
+Superseded = namedtuple('Superseded', ['import_key', 'name', 'workbook', 'superseded_by'])
+
+
+def export_time(path):
+    """The export date of a workbook: from its file name, else its modification time."""
+    match = _EXPORT_DATE.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime(*map(int, match.groups())).timestamp()
+        except ValueError:
+            pass
+    return os.path.getmtime(path)
+
+
+def newest_first(paths):
+    """paths ordered from the newest export to the oldest (later arguments first on ties)."""
+    return [path for _, _, path in sorted(((export_time(p), i, p) for i, p in enumerate(paths)), reverse=True)]
+
+
+def _digest(key):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+
+
+def iter_workbook_results(paths, rules, workers=1, use_cache=True, plan_options=None):
+    """Yield (path, report, products) for every sheet, workbook by workbook in paths order.
+
+    With workers > 1 every workbook's sheets are submitted to one process
+    pool up front, so later workbooks are read while earlier ones are merged.
+    """
+    planned = [(path, plan_tasks(product_sheet_names(workbook_sheet_names(path, use_cache)), rules, {})) for path in paths]
+    if workers <= 1:
+        for path, tasks in planned:
+            results = (run_task(path, task, use_cache, plan_options) for task in tasks)
+            for report, products in iter_sheet_results(results):
+                yield path, report, products
+        return
+
+    # Sheet names of uncached workbooks were read through shared handles, which the workers must not inherit
+    close_shared_workbooks()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(path, [executor.submit(run_task, path, task, use_cache, plan_options) for task in tasks])
+                   for path, tasks in planned]
+        for path, pending in futures:
+            for report, products in iter_sheet_results(future.result() for future in pending):
+                yield path, report, products
+
+
+class WorkbookMerge:
+    """The key index of a merge, fed workbook by workbook from the newest one, one row at a time."""
+
+    def __init__(self):
+        self.owners = {}       # key hash -> position of the workbook that exported it
+        self.workbooks = []    # paths, newest first
+        self.counts = []       # per workbook: [rows, kept]
+        self.superseded = []   # Superseded, in merge order
+
+    def start(self, path):
+        self.workbooks.append(path)
+        self.counts.append([0, 0])
+
+    def add(self, row):
+        """Whether row (an ungrouped record) is kept: its key was not exported by a newer workbook."""
+        position = len(self.workbooks) - 1
+        self.counts[position][0] += 1
+        digest = _digest(row['import_key'])
+        newer = self.owners.setdefault(digest, position)
+        if newer != position:
+            self.superseded.append(Superseded(row['import_key'], row['name'], self.workbooks[position],
+                                              self.workbooks[newer]))
+            return False
+        self.counts[position][1] += 1
+        return True
+
+    def report(self):
+        return {
+            "workbooks": [
+                {"workbook": name, "rows": rows, "kept": kept, "superseded": rows - kept}
+                for name, (rows, kept) in zip(self.workbooks, self.counts)
+            ],
+            "totals": {
+                "rows": sum(rows for rows, _ in self.counts),
+                "kept": sum(kept for _, kept in self.counts),
+                "superseded": len(self.superseded),
+                "keys": len(self.owners),
+            },
+            "superseded": [entry._asdict() for entry in self.superseded],
+        }
+
+
+def merge_workbooks(paths, rules, plan_options, merge, workers=1, use_cache=True, dedup=None, reports=None,
+                    existing_slugs=()):
+    """Yield the merged export records of paths, as generate_import_final.py writes them.
+
+    merge (a WorkbookMerge) collects what was superseded; dedup, a
+    dedup.DuplicateIndex, marks near-duplicates across the merged records;
+    reports, if a list, gets (workbook, SheetReport) of every sheet.
+    existing_slugs (e.g. loader.existing_slugs() of the target database)
+    are taken, as with the generator's --slugs-from.
+    """
+    sheets = {}  # sheet name -> kept rows, newest workbook first
+    for path, report, products in iter_workbook_results(newest_first(paths), rules, workers, use_cache, plan_options):
+        if not merge.workbooks or merge.workbooks[-1] != path:
+            merge.start(path)
+        if reports is not None:
+            reports.append((os.path.basename(path), report))
+        if report.status == 'failed':
+            raise RuntimeError(f"{path}: sheet {report.sheet_name} failed: {report.message}")
+        rows = sheets.setdefault(report.sheet_name, [])
+        for row in products:
+            if merge.add(row):
+                row['workbook_source'] = os.path.basename(path)
+                rows.append(row)
+
+    slugs = SlugIndex(existing_slugs)
+    seen = {}
+    for rows in sheets.values():
+        # Families gather their rows from the sheet of every workbook; the first (newest) row supplies the product fields
+        products = group_variants(rows) if plan_options.get('variants') else rows
+        for product in products:
+            # After the variants, where the generator-shaped records have it
+            product['workbook_source'] = product.pop('workbook_source')
+            product['slug'] = slugs.claim_name(product['name'])
+            if dedup is not None:
+                dedup.mark(product)
+            key = product['import_key']
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                product['import_key'] = f"{key}#{seen[key]}"
+            yield product
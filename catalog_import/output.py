@@ -0,0 +1,117 @@
+"""Export writers that write records as they are produced.
+
+JsonArrayWriter produces exactly what json.dump(records, indent=2) used to,
+without needing the whole list in memory. NdjsonWriter writes one compact
+JSON object per line (optionally gzip-compressed), so a loader can read the
+file line by line, or from a pipe while generation is still running.
+"""
+import gzip
+import json
+import os
+import sys
+
+FORMATS = ['json', 'ndjson']
+
+
+class JsonArrayWriter:
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def write(self, record):
+        body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self.f.write(('[\n  ' if self.count == 0 else ',\n  ') + body)
+        self.count += 1
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.write('\n]' if self.count else '[]')
+
+
+class NdjsonWriter:
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def write(self, record):
+        self.f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.count += 1
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        pass
+
+
+def read_export(path):
+    """Yield the records of an export written by ExportFile (format told by the extension)."""
+    compress = path.endswith('.gz')
+    opener = gzip.open if compress else open
+    if path[:-3 if compress else None].endswith('.ndjson'):
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with opener(path, 'rt', encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+def default_output_path(fmt, compress=False):
+    path = 'import_data_final.json' if fmt == 'json' else 'import_data_final.ndjson'
+    return path + '.gz' if compress else path
+
+
+class ExportFile:
+    """Context manager returning a writer for path ('-' for stdout).
+
+    Plain NDJSON is written straight to path, a sheet at a time, so it can
+    be followed (tail -f, a loader reading lines) while the run goes on.
+    If the run fails, path keeps the records written so far, on whole lines.
+    The JSON array and gzip output are only readable once complete, so they
+    are written to a temporary file next to path and renamed into place at
+    the end (dropped if the block raises): a failed run never replaces the
+    last good export with a truncated one.
+    """
+
+    def __init__(self, path, fmt='json', compress=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.compress = compress
+        streamed = path == '-' or (fmt == 'ndjson' and not compress)
+        self.target = path if streamed else f"{path}.tmp{os.getpid()}"
+
+    def __enter__(self):
+        if self.path == '-':
+            self.f = sys.stdout.buffer if self.compress else sys.stdout
+            self.owned = False
+        else:
+            self.f = open(self.target, 'wb' if self.compress else 'w', encoding=None if self.compress else 'utf-8')
+            self.owned = True
+        if self.compress:
+            self.raw = self.f
+            self.f = gzip.open(self.raw, 'wt', encoding='utf-8')
+        self.writer = (JsonArrayWriter if self.fmt == 'json' else NdjsonWriter)(self.f)
+        return self.writer
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.writer.close()
+        if self.compress:
+            self.f.close()
+            self.f = self.raw
+        if self.owned:
+            self.f.close()
+        else:
+            self.f.flush()
+        if self.target != self.path:
+            if exc_type is None:
+                os.replace(self.target, self.path)
+            else:
+                os.remove(self.target)
+        return False
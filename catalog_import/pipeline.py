@@ -0,0 +1,146 @@
+"""Sheet-level tasks for the import generator, runnable inline or on a process pool.
+
+Sheets do not depend on each other, so each one (or each row range of a big
+sheet) is an independent task. Workers read the sheets themselves (from the
+columnar cache when it is fresh, else from the workbook); results
+are merged back in workbook order so the export is the same whatever the
+number of workers.
+"""
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog_import.columnar import load_sheet_frames
+from catalog_import.instrumentation import rss_delta, rss_mb
+from catalog_import.transform import build_column_plan, transform_sheet
+from catalog_import.validation import SheetValidation
+
+# Sheets with more data rows than this are split into row ranges when running in parallel
+DEFAULT_CHUNK_ROWS = 5000
+
+# order: position of the sheet in the workbook; min_row/max_row: 1-based Excel rows (max_row None = to the end)
+SheetTask = namedtuple('SheetTask', ['order', 'sheet_name', 'cat_slug', 'min_row', 'max_row', 'estimated_rows'])
+# status: 'ok', 'no-title', 'error' (the sheet lacks a key column) or 'failed' (anything else went wrong;
+# the only status worth retrying); message holds the exception text;
+# validation: the validation.SheetValidation of the task's rows, None unless 'ok';
+# rss_delta_mb: how much the RSS of the process that ran the task grew while it ran (None where unknown)
+TaskResult = namedtuple('TaskResult', ['task', 'status', 'products', 'seconds', 'message', 'validation', 'rss_delta_mb'],
+                        defaults=[None, None])
+SheetReport = namedtuple('SheetReport', ['sheet_name', 'status', 'products', 'tasks', 'seconds', 'message',
+                                         'validation', 'rss_delta_mb'], defaults=[None, None])
+
+
+def plan_tasks(sheet_names, rules, row_counts, chunk_rows=None, splittable=None):
+    """One task per sheet, or several row-range tasks for sheets over chunk_rows rows.
+
+    rules (categories.CategoryRules) gives each sheet's category;
+    row_counts maps each sheet to its (estimated) number of data rows;
+    splittable, if given, limits which sheets may be split.
+    """
+    tasks = []
+    for order, sheet_name in enumerate(sheet_names):
+        cat_slug = rules.resolve(sheet_name)
+        estimated = row_counts.get(sheet_name, 0)
+
+        if not chunk_rows or estimated <= chunk_rows or (splittable is not None and sheet_name not in splittable):
+            tasks.append(SheetTask(order, sheet_name, cat_slug, None, None, estimated))
+            continue
+
+        # Row counts may only be estimates; the last range is always open-ended
+        last_row = estimated + 1  # row 1 is the header
+        for first in range(2, last_row + 1, chunk_rows):
+            last = first + chunk_rows - 1
+            if last >= last_row:
+                last = None
+            tasks.append(SheetTask(order, sheet_name, cat_slug, first, last, min(chunk_rows, last_row - first + 1)))
+    return tasks
+
+
+def run_task(path, task, use_cache=True, plan_options=None):
+    rss = rss_mb()
+    start = time.perf_counter()
+    try:
+        row_range = None if task.min_row is None else (task.min_row, task.max_row)
+        columns, frames = load_sheet_frames(path, task.sheet_name, header_row=0, row_range=row_range, use_cache=use_cache)
+
+        try:
+            plan = build_column_plan(columns, **(plan_options or {}))
+        except ValueError as e:
+            return TaskResult(task, 'error', [], time.perf_counter() - start, str(e))
+        if plan is None:
+            return TaskResult(task, 'no-title', [], time.perf_counter() - start, None)
+
+        products = []
+        validation = SheetValidation(task.sheet_name)
+        for df in frames:
+            products.extend(transform_sheet(df, plan, task.sheet_name, task.cat_slug, validation))
+        return TaskResult(task, 'ok', products, time.perf_counter() - start, None, validation, rss_delta(rss))
+    except Exception as e:
+        return TaskResult(task, 'failed', [], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+
+def iter_task_results(path, tasks, workers=1, use_cache=True, plan_options=None, checkpoint=None):
+    """Yield the result of every task in task order, each as soon as it (and those before it) are done.
+
+    plan_options are keyword arguments for build_column_plan() (variants, attributes, category_overrides, shipping, images).
+    With a checkpoint (checkpoint.Checkpoint), tasks it holds are loaded instead of run, and every
+    other result is saved to it as soon as it is done.
+    """
+    def resumed(task):
+        return checkpoint.load(task) if checkpoint is not None and checkpoint.has(task) else None
+
+    def run(task):
+        result = run_task(path, task, use_cache, plan_options)
+        if checkpoint is not None:
+            checkpoint.save(result)
+        return result
+
+    if workers <= 1:
+        for task in tasks:
+            yield resumed(task) or run(task)
+        return
+
+    pending = [task for task in tasks if checkpoint is None or not checkpoint.has(task)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Biggest tasks first so a large sheet does not end up running alone at the end
+        futures = {}
+        for task in sorted(pending, key=lambda t: -t.estimated_rows):
+            futures[task] = executor.submit(run_task, path, task, use_cache, plan_options)
+            if checkpoint is not None:
+                # Saved as each task finishes, not when its turn in the output comes
+                futures[task].add_done_callback(lambda f: checkpoint.save(f.result()))
+        for task in tasks:
+            # Checkpointed results are loaded only when needed, one sheet in memory at a time
+            yield futures.pop(task).result() if task in futures else resumed(task) or run(task)
+
+
+def iter_sheet_results(results):
+    """Group task results (in task order) per sheet and yield (report, products) in workbook order.
+
+    A sheet contributes nothing if any of its tasks failed, as when sheets
+    were processed one after another. Only one sheet's products are held at a
+    time.
+    """
+    def finish(sheet_results):
+        sheet_name = sheet_results[0].task.sheet_name
+        seconds = sum(r.seconds for r in sheet_results)
+        deltas = [r.rss_delta_mb for r in sheet_results if r.rss_delta_mb is not None]
+        rss = sum(deltas) if deltas else None
+        failed = [r for r in sheet_results if r.status != 'ok']
+        if failed:
+            return SheetReport(sheet_name, failed[0].status, 0, len(sheet_results), seconds, failed[0].message, None, rss), []
+
+        products = [p for r in sheet_results for p in r.products]
+        validation = sheet_results[0].validation
+        for r in sheet_results[1:]:
+            validation.merge(r.validation)
+        return SheetReport(sheet_name, 'ok', len(products), len(sheet_results), seconds, None, validation, rss), products
+
+    current = []
+    for result in results:
+        if current and result.task.order != current[0].task.order:
+            yield finish(current)
+            current = []
+        current.append(result)
+    if current:
+        yield finish(current)
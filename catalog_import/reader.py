@@ -0,0 +1,168 @@
+"""Streaming workbook reader built on openpyxl's read-only mode.
+
+pd.ExcelFile/pd.read_excel materialize a whole sheet before the first row can
+be used, so peak memory grows with the biggest sheet. These helpers walk the
+sheet with iter_rows() instead and hand out rows as they are parsed: either
+as dict records (iter_records) or as small object-dtype DataFrames
+(sheet_frames) for code written against pandas.
+
+Cell values are converted the way pandas' openpyxl reader does (integral
+floats become ints, empty and "N/A"-like cells become missing, blank rows are
+dropped) so switching a script over does not change its output.
+"""
+from itertools import islice
+
+SKIPPED_SHEETS = ['Ayuda', 'hidden']
+
+# pandas' default na_values for read_excel
+NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+ERROR_STRINGS = {'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def open_workbook(path):
+    # Imported here: it takes a while, and the metadata-only commands never need it
+    import openpyxl
+
+    return openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+
+_shared = {}
+
+
+def shared_workbook(path):
+    """One read-only handle per path for the whole process (e.g. a pool worker)."""
+    if path not in _shared:
+        _shared[path] = open_workbook(path)
+    return _shared[path]
+
+
+def close_shared_workbooks():
+    # Call before forking workers: they must not share the parent's file handles
+    while _shared:
+        _shared.popitem()[1].close()
+
+
+def product_sheet_names(workbook):
+    """Product sheets of a workbook (or of a list of sheet names)."""
+    names = getattr(workbook, 'sheetnames', workbook)
+    return [s for s in names if s not in SKIPPED_SHEETS]
+
+
+def convert_value(value):
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, str) and (value in NA_STRINGS or value in ERROR_STRINGS):
+        return None
+    return value
+
+
+def header_names(values):
+    """Column names as pandas builds them: blanks become "Unnamed: N", repeats get ".1", ".2"..."""
+    names = []
+    seen = {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or value == '' else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def normalize_header(columns):
+    return [str(c).upper().strip() for c in columns]
+
+
+def iter_sheet_rows(worksheet, header_row=0, row_range=None, row_numbers=False):
+    """Return (columns, rows): the raw header names and a generator of converted value lists.
+
+    Rows before header_row are skipped, blank rows are dropped and every row
+    is padded or cut to the header width. row_range=(min_row, max_row) limits
+    the data rows to that 1-based Excel range (max_row None = to the end).
+    With row_numbers=True the generator yields (excel_row, values) pairs.
+    """
+    # Read-only sheets trust the stored dimensions, which exporters often get wrong
+    worksheet.reset_dimensions()
+    rows = worksheet.iter_rows(values_only=True)
+
+    header = next(islice(rows, header_row, None), None)
+    if header is None:
+        return [], iter(())
+
+    header = list(header)
+    while header and (header[-1] is None or header[-1] == ''):
+        header.pop()
+    columns = header_names([convert_value(v) if not isinstance(v, str) else v for v in header])
+    width = len(columns)
+
+    first_row = header_row + 2
+    if row_range is not None:
+        min_row, max_row = row_range
+        rows = worksheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+        first_row = min_row
+
+    def generate():
+        for number, raw in enumerate(rows, first_row):
+            values = [convert_value(v) for v in raw[:width]]
+            if all(v is None for v in values):
+                continue
+            if len(values) < width:
+                values.extend([None] * (width - len(values)))
+            yield (number, values) if row_numbers else values
+
+    return columns, generate()
+
+
+def iter_records(worksheet, header_row=0):
+    """Yield one {NORMALIZED_HEADER: value} dict per data row; missing cells are None."""
+    columns, rows = iter_sheet_rows(worksheet, header_row)
+    columns = normalize_header(columns)
+    for values in rows:
+        yield dict(zip(columns, values))
+
+
+def iter_workbook(path, header_row=0):
+    """Yield (sheet_name, records) for every product sheet of the workbook, one sheet at a time."""
+    workbook = open_workbook(path)
+    try:
+        for sheet_name in product_sheet_names(workbook):
+            yield sheet_name, iter_records(workbook[sheet_name], header_row)
+    finally:
+        workbook.close()
+
+
+def sheet_frames(worksheet, header_row=0, chunk_size=DEFAULT_CHUNK_SIZE, normalize=True, row_range=None):
+    """Return (columns, frames): the header and a generator of object-dtype DataFrames.
+
+    Each frame holds at most chunk_size rows and missing cells are NaN, like
+    in pd.read_excel. Only one chunk is held in memory at a time.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns, rows = iter_sheet_rows(worksheet, header_row, row_range)
+    if normalize:
+        columns = normalize_header(columns)
+
+    def generate():
+        start = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            df = pd.DataFrame(chunk, columns=columns, dtype=object, index=range(start, start + len(chunk)))
+            yield df.where(df.notna(), np.nan)
+            start += len(chunk)
+
+    return columns, generate()
@@ -0,0 +1,193 @@
+"""Header detection and column aliasing shared by the analysis scripts.
+
+A sheet's schema is the index of its header row, its normalized column names
+and an alias -> column map ("title" -> "TÍTULO", "stock" -> "AVAILABLE_QUANTITY",
+...). It is built from the first rows of the sheet in one pass and cached on
+disk, keyed by the workbook's content hash and the sheet name, so later runs
+do not read the workbook at all to find it.
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from catalog_import.reader import header_names, normalize_header, open_workbook
+
+# Alias -> candidate headers, best first
+ALIASES = {
+    'item_id': ['ID', 'ITEM_ID'],
+    'sku': ['SKU'],
+    'seller_sku': ['SELLER_SKU'],
+    'product_number': ['PRODUCT_NUMBER'],
+    'family_id': ['FAMILY_ID'],
+    'variation_id': ['VARIATION_ID'],
+    'category_id': ['CATEGORY_ID'],
+    'title': ['TÍTULO', 'TITLE', 'PRODUCT_NAME', 'NAME', 'TITULO'],
+    'brand': ['BRAND', 'MARCA', 'MANUFACTURER'],
+    'model': ['MODEL', 'MODELO'],
+    'price': ['PRECIO', 'PRICE'],
+    'stock': ['CANTIDAD', 'AVAILABLE_QUANTITY', 'STOCK'],
+    'image': ['IMÁGENES', 'IMAGENES', 'PICTURE_URL', 'PICTURES', 'IMAGES', 'COVER_IMAGE'],
+}
+
+# Where the import takes a sheet's key columns from: the first alias resolved wins,
+# so a sheet without a SKU column keys its rows by product number, then publication ID.
+# This is the generator's original precedence (SKU, PRODUCT_NUMBER, ID for the SKU;
+# TÍTULO, TITLE, PRODUCT_NAME, NAME for the title). The headers added since
+# (SELLER_SKU, ITEM_ID, TITULO) rank last, so they only key sheets that had no key
+# column before; tests/python/test_schema.py pins this.
+KEY_ALIASES = {
+    'title': ['title'],
+    'sku': ['sku', 'product_number', 'item_id', 'seller_sku'],
+    'brand': ['brand'],
+    'model': ['model'],
+}
+
+# A row holding any of these cells is taken as the header
+HEADER_MARKERS = {'SKU', 'TÍTULO', 'TITULO', 'TITLE', 'ITEM_ID'}
+HEADER_SCAN_ROWS = 20
+
+CACHE_DIR = os.environ.get('IMPORT_CACHE_DIR', '.import_cache')
+SCHEMA_CACHE_VERSION = 2
+
+SheetSchema = namedtuple('SheetSchema', ['sheet_name', 'header_row', 'columns', 'aliases'])
+
+_hashes = {}
+
+
+def workbook_hash(path):
+    """Content hash of the workbook, memoized per (path, size, mtime) for this process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hashes:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _hashes[memo_key] = digest.hexdigest()
+    return _hashes[memo_key]
+
+
+def _alias_lookup(aliases):
+    # candidate header -> (alias, priority), so resolving is one dict probe per column
+    lookup = {}
+    for alias, candidates in aliases.items():
+        for priority, candidate in enumerate(candidates):
+            lookup.setdefault(candidate, (alias, priority))
+    return lookup
+
+
+_LOOKUP = _alias_lookup(ALIASES)
+
+
+def resolve_columns(columns, aliases=None):
+    """Return {alias: column} for the given normalized columns in a single pass."""
+    lookup = _LOOKUP if aliases is None else _alias_lookup(aliases)
+    best = {}
+    for col in columns:
+        match = lookup.get(col)
+        if match is None:
+            continue
+        alias, priority = match
+        if alias not in best or priority < best[alias][0]:
+            best[alias] = (priority, col)
+    return {alias: col for alias, (_, col) in best.items()}
+
+
+def key_columns(aliases):
+    """{key: column or None} of the KEY_ALIASES keys, from the {alias: column} of resolve_columns()."""
+    return {key: next((aliases[a] for a in candidates if a in aliases), None) for key, candidates in KEY_ALIASES.items()}
+
+
+def detect_header_row(rows, max_rows=HEADER_SCAN_ROWS):
+    """Index of the first of the rows that looks like a header, or None."""
+    for i, row in enumerate(rows):
+        if i >= max_rows:
+            break
+        cells = {str(v).upper().strip() for v in row if v is not None}
+        if cells & HEADER_MARKERS:
+            return i
+    return None
+
+
+def scan_sheet(worksheet, sheet_name, max_rows=HEADER_SCAN_ROWS):
+    """Build the schema of a sheet by reading only its first rows."""
+    worksheet.reset_dimensions()
+    return schema_from_rows(sheet_name, list(worksheet.iter_rows(max_row=max_rows, values_only=True)), max_rows)
+
+
+def schema_from_rows(sheet_name, rows, max_rows=HEADER_SCAN_ROWS):
+    """Schema of a sheet from its first rows (lists of cell values)."""
+    header_row = detect_header_row(rows, max_rows)
+    if header_row is None:
+        return SheetSchema(sheet_name, None, [], {})
+    header = list(rows[header_row])
+    while header and header[-1] is None:
+        header.pop()
+    columns = normalize_header(header_names(header))
+    return SheetSchema(sheet_name, header_row, columns, resolve_columns(columns))
+
+
+def _cache_path(path):
+    return os.path.join(CACHE_DIR, 'schemas', f"{workbook_hash(path)}.json")
+
+
+def _load_cache(path):
+    """Return (sheet_names, schemas) from the disk cache; sheet_names is None if unknown."""
+    cache_path = _cache_path(path)
+    if not os.path.exists(cache_path):
+        return None, {}
+    with open(cache_path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != SCHEMA_CACHE_VERSION:
+        return None, {}
+    return data['sheet_names'], {name: SheetSchema(**entry) for name, entry in data['sheets'].items()}
+
+
+def _save_cache(path, sheet_names, schemas):
+    cache_path = _cache_path(path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    data = {
+        "version": SCHEMA_CACHE_VERSION,
+        "sheet_names": sheet_names,
+        "sheets": {name: schema._asdict() for name, schema in schemas.items()}
+    }
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def load_schemas(path, sheet_names=None):
+    """Return {sheet_name: SheetSchema}, scanning only sheets missing from the disk cache.
+
+    sheet_names defaults to every sheet in the workbook. When everything
+    asked for is cached the workbook is not opened at all.
+    """
+    all_names, cached = _load_cache(path)
+    names = all_names if sheet_names is None else list(sheet_names)
+    if names is not None and all(name in cached for name in names):
+        return {name: cached[name] for name in names}
+
+    workbook = open_workbook(path)
+    try:
+        all_names = workbook.sheetnames
+        if names is None:
+            names = all_names
+        for name in names:
+            if name not in cached:
+                cached[name] = scan_sheet(workbook[name], name)
+    finally:
+        workbook.close()
+
+    _save_cache(path, all_names, cached)
+    return {name: cached[name] for name in names}
+
+
+def load_schema(path, sheet_name):
+    return load_schemas(path, [sheet_name])[sheet_name]
+
+
+def sheet_names(path):
+    """All sheet names of the workbook, from the schema cache when possible."""
+    return list(load_schemas(path))
@@ -0,0 +1,291 @@
+"""Inverted search index over the exported catalog.
+
+Terms are accent-folded, case-folded Spanish tokens ("Señuelo" -> "senuelo")
+taken from the title, brand, model and attribute values of each product.
+Decimals are one term, with a decimal comma read as a point ("10,7" and
+"10.7" -> "10.7"). Numeric attributes are indexed by value and by the unit
+in their key, so {"length_cm": 10.7} matches "10.7 cm" and "10,7cm", and
+{"max_immersion_depth_m": 30} matches "30 m" and "30m".
+Documents are numbered category by category, so the postings of a term are
+sorted by category too and a category filter is one searchsorted() on the
+list instead of a scan.
+
+The file is a small JSON header followed by flat little-endian arrays:
+
+    b'CIDX' | uint32 header length | header JSON | arrays...
+
+The header lists each array as {"offset", "dtype", "count"}, offsets counted
+from the end of the header (padded so every array is 8-byte aligned).
+SearchIndex memory-maps the file and wraps the arrays without copying, so
+opening it costs the same whatever the catalog size. A query only touches
+the postings of its terms, so its time still grows with the catalog, as
+those lists do, but far slower than a scan's (search_catalog.py --benchmark).
+
+The app reads the index through this module: search_catalog.py --json
+prints the matching slugs, best first, as a JSON array of {"slug", "score"}
+objects, for CatalogController to fetch with whereIn('slug', ...) and
+order as given. A reader in another language needs the header and arrays
+above: a term's postings are posting_docs/weights[posting_offsets[t]:
+posting_offsets[t + 1]], terms and slugs are strings i of the blob from
+offsets[i] to offsets[i + 1], and category i holds the documents from
+category_starts[i] to category_starts[i + 1]. Queries must be split into
+terms as terms() does.
+"""
+import json
+import mmap
+import os
+import re
+import struct
+from collections import defaultdict
+
+import numpy as np
+
+from catalog_import.text import STOPWORDS, fold
+
+MAGIC = b'CIDX'
+INDEX_VERSION = 2
+DEFAULT_INDEX_PATH = 'import_search_index.bin'
+
+# Weight a term contributes per field it appears in (summed, capped at 255)
+FIELD_WEIGHTS = {'title': 4, 'brand': 3, 'model': 3, 'spec': 1}
+
+_MODEL = re.compile(r'<br>Modelo: (.*?)<br>')
+_TERM = re.compile(r'\d+(?:[.,]\d+)+|[a-z0-9]+')
+
+
+def terms(text):
+    """Search terms of text: text.tokenize(), but with decimals kept whole ("10,7 cm" -> ["10.7", "cm"])."""
+    return [t.replace(',', '.') for t in _TERM.findall(fold(text)) if t not in STOPWORDS]
+
+
+def _number(value):
+    # As typed: "30" for 30 and 30.0, "10.7" for 10.7
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+def _spec_text(key, value):
+    """Indexed text of an attribute value: strings as they are, numbers with the unit their key ends in."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    from catalog_import.attributes import UNITS
+
+    number = _number(value)
+    unit = key.rsplit('_', 1)[-1]
+    return f"{number} {unit} {number}{unit}" if unit in UNITS else number
+
+
+def document_fields(record):
+    """(field, text) pairs indexed for an export record."""
+    fields = [('title', record['name']), ('brand', record.get('brand_name') or '')]
+    # The model is only in the description, on the line transform_sheet() writes it
+    model = _MODEL.search(record.get('description') or '')
+    if model:
+        fields.append(('model', model.group(1)))
+    for key, value in (record.get('attributes') or {}).items():
+        for item in value if isinstance(value, list) else [value]:
+            text = _spec_text(key, item)
+            if text is not None:
+                fields.append(('spec', text))
+    return fields
+
+
+class IndexBuilder:
+    """Collects export records (add()) and writes the index file (write())."""
+
+    def __init__(self):
+        self.documents = []
+
+    def add(self, record):
+        weights = defaultdict(int)
+        for field, text in document_fields(record):
+            for token in set(terms(text)):
+                weights[token] += FIELD_WEIGHTS[field]
+        self.documents.append((record['category_slug'], record.get('slug') or '', dict(weights)))
+
+    def arrays(self):
+        # Number documents category by category (stable, so export order is kept inside each)
+        order = sorted(range(len(self.documents)), key=lambda i: self.documents[i][0])
+        documents = [self.documents[i] for i in order]
+
+        categories = []
+        category_starts = []
+        postings = defaultdict(list)
+        for doc_id, (category, _, terms) in enumerate(documents):
+            if not categories or categories[-1] != category:
+                categories.append(category)
+                category_starts.append(doc_id)
+            for term, weight in terms.items():
+                postings[term].append((doc_id, min(weight, 255)))
+        category_starts.append(len(documents))
+
+        terms = sorted(postings)
+        posting_offsets = np.zeros(len(terms) + 1, dtype='<u4')
+        np.cumsum([len(postings[t]) for t in terms], out=posting_offsets[1:])
+        flat = [entry for t in terms for entry in postings[t]]
+
+        return {
+            **_strings('term', terms),
+            'posting_offsets': posting_offsets,
+            'posting_docs': np.array([doc for doc, _ in flat], dtype='<u4'),
+            'weights': np.array([weight for _, weight in flat], dtype='u1'),
+            **_strings('category', categories),
+            'category_starts': np.array(category_starts, dtype='<u4'),
+            **_strings('slug', [slug for _, slug, _ in documents]),
+        }
+
+    def write(self, path=DEFAULT_INDEX_PATH):
+        arrays = self.arrays()
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            layout[name] = {"offset": offset, "dtype": array.dtype.str, "count": int(array.size)}
+            offset += array.nbytes
+            offset += -offset % 8  # keep every array 8-byte aligned
+
+        header = json.dumps({"version": INDEX_VERSION, "documents": len(self.documents), "arrays": layout})
+        # Pad the header (JSON allows trailing spaces) so the data starts aligned too
+        header = header.encode('utf-8')
+        header += b' ' * (-(len(MAGIC) + 4 + len(header)) % 8)
+        data_start = len(MAGIC) + 4 + len(header)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header)) + header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(array.tobytes())
+        os.replace(tmp_path, path)
+        return path
+
+
+def _strings(name, values):
+    """A list of strings as <name>_blob (utf-8 bytes) + <name>_offsets (uint32, len + 1)."""
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return {
+        f"{name}_blob": np.frombuffer(b''.join(encoded), dtype='u1'),
+        f"{name}_offsets": offsets,
+    }
+
+
+class SearchIndex:
+    """Read side of the index, memory-mapped. Use as a context manager or call close()."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.f = open(path, 'rb')
+        self.map = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:4] != MAGIC:
+            raise ValueError(f"{path} is not a search index")
+        (length,) = struct.unpack_from('<I', self.map, 4)
+        header = json.loads(self.map[8:8 + length])
+        if header['version'] != INDEX_VERSION:
+            raise ValueError(f"{path}: unsupported index version {header['version']}")
+        self.documents = header['documents']
+        data_start = 8 + length
+        for name, entry in header['arrays'].items():
+            array = np.frombuffer(self.map, dtype=entry['dtype'], count=entry['count'], offset=data_start + entry['offset'])
+            setattr(self, name, array)
+
+        self.terms = len(self.term_offsets) - 1
+        self.categories = {
+            self._string('category', i): (int(self.category_starts[i]), int(self.category_starts[i + 1]))
+            for i in range(len(self.category_offsets) - 1)
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        # Views into the map must go before it can be closed
+        for name in [n for n, v in vars(self).items() if isinstance(v, np.ndarray)]:
+            delattr(self, name)
+        self.map.close()
+        self.f.close()
+
+    def _string(self, name, i):
+        offsets = getattr(self, f"{name}_offsets")
+        return getattr(self, f"{name}_blob")[offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+
+    def _lower_bound(self, term):
+        lo, hi = 0, self.terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string('term', mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def term_ids(self, token, prefix=False):
+        """Ids of the term equal to token, or of every term starting with it."""
+        first = self._lower_bound(token)
+        last = first
+        while last < self.terms:
+            term = self._string('term', last)
+            if term != token and not (prefix and term.startswith(token)):
+                break
+            last += 1
+        return range(first, last)
+
+    def postings(self, term_id, category_range=None):
+        """(doc ids, weights) of a term, limited to a category's doc range."""
+        start, stop = int(self.posting_offsets[term_id]), int(self.posting_offsets[term_id + 1])
+        docs = self.posting_docs[start:stop]
+        weights = self.weights[start:stop]
+        if category_range is not None:
+            lo, hi = np.searchsorted(docs, category_range)
+            docs, weights = docs[lo:hi], weights[lo:hi]
+        return docs, weights
+
+    def search(self, query, category=None, limit=20, prefix=True):
+        """Slugs of the products matching every token of query, best first, as (slug, score).
+
+        The last token also matches as a prefix when prefix is set (search as
+        you type). A repeated token counts once. An unknown category matches
+        nothing.
+        """
+        tokens = terms(query)
+        if not tokens:
+            return []
+        last = tokens[-1]
+        tokens = list(dict.fromkeys(tokens))
+        category_range = None
+        if category is not None:
+            if category not in self.categories:
+                return []
+            category_range = self.categories[category]
+
+        docs = None
+        scores = None
+        for token in tokens:
+            ids = self.term_ids(token, prefix and token == last)
+            parts = [self.postings(term_id, category_range) for term_id in ids]
+            if not parts:
+                return []
+            token_docs = np.concatenate([p[0] for p in parts])
+            token_weights = np.concatenate([p[1] for p in parts]).astype(np.int32)
+            if len(parts) > 1:
+                # A prefix can match several terms of the same document: keep its best weight
+                order = np.lexsort((-token_weights, token_docs))
+                token_docs, token_weights = token_docs[order], token_weights[order]
+                first = np.r_[True, token_docs[1:] != token_docs[:-1]]
+                token_docs, token_weights = token_docs[first], token_weights[first]
+
+            if docs is None:
+                docs, scores = token_docs, token_weights
+            else:
+                docs, mine, theirs = np.intersect1d(docs, token_docs, assume_unique=True, return_indices=True)
+                scores = scores[mine] + token_weights[theirs]
+            if not len(docs):
+                return []
+
+        # Best score first, then catalog order
+        order = np.lexsort((docs, -scores))[:limit]
+        return [(self._string('slug', int(docs[i])), int(scores[i])) for i in order]
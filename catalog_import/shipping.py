@@ -0,0 +1,105 @@
+"""Shipping measures of every row: weight, size, volumetric weight and a shipping class.
+
+product_variants has weight_kg, length_cm, width_cm and height_cm, and
+checkout quotes on the billable weight: the larger of the actual weight and
+the volumetric one, L × W × H / 4000 (cm, kg), as orders.volumetric_weight_kg.
+The sheets carry the measures as spec columns with a <COLUMN>_UNIT pair, so
+they are converted (attributes.UNITS) for all rows of a sheet at once, one
+column at a time, like the typed attributes.
+
+Each measure is read from the first of its candidate columns that has a
+usable value in the row. Values without a unit, non-positive or larger than
+any parcel are left out: a fishing line's LENGTH is the 300 m on its spool,
+and rods entered as 270 m instead of 2.70 m are not rare.
+
+The shipping class is the shipping_classes bucket a row falls in by size:
+OVERSIZED from OVERSIZED_WEIGHT_KG (billable) or OVERSIZED_LENGTH_CM
+(longest side), else NORMAL, or None when the row has no measure at all.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from catalog_import.attributes import UNITS
+
+VOLUMETRIC_DIVISOR = 4000
+
+# measure -> (export key, dimension, factor from the dimension's base unit (g, cm), largest plausible parcel value)
+MEASURES = {
+    'weight': ('weight_kg', 'mass', 0.001, 1000),
+    'length': ('length_cm', 'length', 1, 500),
+    'width': ('width_cm', 'length', 1, 500),
+    'height': ('height_cm', 'length', 1, 500),
+}
+
+# Columns a measure is read from, in order of preference
+MEASURE_COLUMNS = {
+    'weight': ['WEIGHT', 'NET_WEIGHT', 'UNIT_WEIGHT', 'FISHING_ROD_WEIGHT'],
+    'length': ['LENGTH', 'TOTAL_LENGTH', 'DEPTH'],
+    'width': ['WIDTH'],
+    'height': ['HEIGHT'],
+}
+
+# shipping_classes codes, least restrictive first
+SHIPPING_CLASSES = ['NORMAL', 'OVERSIZED']
+OVERSIZED_WEIGHT_KG = 25
+OVERSIZED_LENGTH_CM = 120
+
+MeasureColumn = namedtuple('MeasureColumn', ['column', 'unit_column'])
+
+
+def plan_shipping(columns):
+    """{measure: [MeasureColumn]} of the candidate columns the sheet has with a unit column, or None."""
+    available = set(columns)
+    plan = {
+        measure: [MeasureColumn(c, c + '_UNIT') for c in candidates if c in available and c + '_UNIT' in available]
+        for measure, candidates in MEASURE_COLUMNS.items()
+    }
+    return plan if any(plan.values()) else None
+
+
+def _values(measure, column, index, present, text):
+    """The column's values in the measure's export unit, NaN where unusable."""
+    _, dimension, factor, largest = MEASURES[measure]
+    values = np.where(present[:, index[column.column]], text[:, index[column.column]], '')
+    units = pd.Series(np.where(present[:, index[column.unit_column]], text[:, index[column.unit_column]], '')).str.lower()
+    factors = units.map({u: f * factor for u, (d, f) in UNITS.items() if d == dimension}).to_numpy(dtype=float)
+    numbers = pd.to_numeric(pd.Series(values).str.replace(',', '.', regex=False), errors='coerce').to_numpy(dtype=float)
+    numbers = numbers * factors
+    with np.errstate(invalid='ignore'):
+        return np.where((numbers > 0) & (numbers <= largest), numbers, np.nan)
+
+
+def shipping_fields(plan, index, present, text):
+    """(shipping, shipping_class) of every row: shipping is the dict of known measures."""
+    n = len(text)
+    measures = {}
+    for measure in MEASURES:
+        values = np.full(n, np.nan)
+        for column in plan.get(measure, ()):
+            values = np.where(np.isnan(values), _values(measure, column, index, present, text), values)
+        measures[measure] = values
+
+    volumetric = measures['length'] * measures['width'] * measures['height'] / VOLUMETRIC_DIVISOR
+    volumetric = np.where(volumetric <= MEASURES['weight'][3], volumetric, np.nan)
+    billable = np.fmax(measures['weight'], volumetric)
+    longest = np.fmax(np.fmax(measures['length'], measures['width']), measures['height'])
+    with np.errstate(invalid='ignore'):
+        oversized = (billable > OVERSIZED_WEIGHT_KG) | (longest > OVERSIZED_LENGTH_CM)
+    known = ~np.isnan(billable) | ~np.isnan(longest)
+    classes = np.where(known, np.where(oversized, 'OVERSIZED', 'NORMAL'), None)
+
+    payloads = [{} for _ in range(n)]
+    columns = [(MEASURES[m][0], measures[m], 3 if m == 'weight' else 2) for m in MEASURES]
+    columns.append(('volumetric_weight_kg', volumetric, 3))
+    for key, values, digits in columns:
+        for row in np.flatnonzero(~np.isnan(values)):
+            payloads[row][key] = round(float(values[row]), digits)
+    return zip(payloads, classes)
+
+
+def merge_shipping_class(classes):
+    """The most restrictive of the variants' shipping classes (None when none is known)."""
+    known = [c for c in classes if c is not None]
+    return max(known, key=SHIPPING_CLASSES.index) if known else None
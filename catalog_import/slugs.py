@@ -0,0 +1,60 @@
+"""Product slugs, made unique in memory.
+
+The generator assigns every record its final slug, so neither loader has to
+ask the database whether a slug exists. SlugIndex remembers, per base slug,
+the next suffix to try, so a run of same-named products costs O(1) each
+instead of re-probing base-1, base-2... from the start every time.
+"""
+import re
+import unicodedata
+
+# Base for names that slugify to nothing
+EMPTY_SLUG = 'producto'
+
+
+def slugify(text):
+    """Python port of Laravel's Str::slug() for the Latin text found in the catalog."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    text = text.replace('_', '-').replace('@', '-at-').lower()
+    text = re.sub(r'[^-\w\s]+', '', text)
+    text = re.sub(r'[-\s_]+', '-', text)
+    return text.strip('-')
+
+
+class SlugIndex:
+    """Set of taken slugs handing out base, base-1, base-2... in claim order.
+
+    Seed it with the slugs already in the database; the result only depends
+    on those and on the order of the claims, so the same export gets the
+    same slugs every time.
+    """
+
+    def __init__(self, taken=()):
+        self.taken = set(taken)
+        self.next_suffix = {}
+
+    def __contains__(self, slug):
+        return slug in self.taken
+
+    def __len__(self):
+        return len(self.taken)
+
+    def claim(self, base):
+        """Reserve and return base, or its first free base-N."""
+        base = base or EMPTY_SLUG
+        if base not in self.taken:
+            self.taken.add(base)
+            return base
+
+        counter = self.next_suffix.get(base, 1)
+        slug = f"{base}-{counter}"
+        # Only skips slugs claimed as-is since this base was last suffixed
+        while slug in self.taken:
+            counter += 1
+            slug = f"{base}-{counter}"
+        self.taken.add(slug)
+        self.next_suffix[base] = counter + 1
+        return slug
+
+    def claim_name(self, name):
+        return self.claim(slugify(name))
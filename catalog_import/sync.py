@@ -0,0 +1,173 @@
+"""Price and stock sync: refresh product_variants from a workbook without re-running the import.
+
+A sync only needs a few columns per sheet: the ones each row is keyed by
+(SKU, ID, VARIATION_ID and the title), the price and the stock
+(schema.ALIASES "price" and "stock"). Each sheet's header is found from its
+first rows, then xlsx.column_rows() streams the sheet keeping only those
+cells; nothing else is parsed, and neither pandas nor openpyxl is imported.
+
+Rows are keyed as transform_sheet() keys them for the export ("sku:<SKU>",
+else "id:<ID>[:<VARIATION_ID>]", else "title:<folded title>"), which is the
+import_key the loaders store on each variant, so rows without a SKU (most
+of a MercadoLibre export) sync too. The values are compared with what
+product_variants holds for the same keys, read in one query, and only the
+differences make up the delta:
+
+    {"changes": {import_key: [price, stock], ...}, "summary": {...}}
+
+(None for a value the workbook has no column for). loader.apply_price_stock()
+applies it in batched UPDATEs, in one transaction. Rows with a price or
+stock but nothing to key them by are counted as "unkeyed".
+"""
+import os
+import re
+
+from catalog_import.reader import product_sheet_names
+from catalog_import.schema import ALIASES, HEADER_SCAN_ROWS, KEY_ALIASES, key_columns, schema_from_rows
+from catalog_import.xlsx import column_rows, head_rows, workbook_sheets
+
+SYNC_VERSION = 2
+DEFAULT_SYNC_PATH = 'import_price_stock.json'
+
+# "$14.990", "14.990,5": dots as thousands separators
+_THOUSANDS = re.compile(r'^\d{1,3}(\.\d{3})+(,\d+)?$')
+
+
+def parse_price(value):
+    """A price cell as a float, or None (blank, a label row, a placeholder...)."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    text = str(value).strip().lstrip('$').strip().replace(' ', '')
+    if _THOUSANDS.match(text):
+        text = text.replace('.', '')
+    try:
+        price = float(text.replace(',', '.'))
+    except ValueError:
+        return None
+    return price if price >= 0 else None
+
+
+def parse_stock(value):
+    """A stock cell as a non-negative int, or None."""
+    price = parse_price(value)
+    return int(price) if price is not None and price == int(price) else None
+
+
+# The columns transform._import_keys() keys rows by, besides the title
+KEY_COLUMNS = ['SKU', 'ID', 'VARIATION_ID']
+
+
+def _text(value):
+    # The text transform_sheet() keys the row with (str() of the cell, stripped)
+    return str(value).strip() if value is not None else ''
+
+
+def row_key(sku, item_id, variation_id, title):
+    """The import_key transform._import_keys() gives a row with these cells (None: no cell or no column), or None."""
+    if _text(sku):
+        return 'sku:' + _text(sku)
+    if item_id is not None:
+        return 'id:' + _text(item_id) + (':' + _text(variation_id) if variation_id is not None else '')
+    if title is not None:
+        return 'title:' + ' '.join(_text(title).casefold().split())
+    return None
+
+
+def required_columns():
+    """The columns a sheet needs for a sync, by their header names (for error messages)."""
+    keys = KEY_COLUMNS[:2] + [name for alias in KEY_ALIASES['title'] for name in ALIASES[alias]]
+    return (f"a key column ({', '.join(keys)}) and a price ({', '.join(ALIASES['price'])}) "
+            f"or stock ({', '.join(ALIASES['stock'])}) column")
+
+
+def sheet_price_stock(path, sheet_name):
+    """(status, {import_key: (price, stock)}, rows, duplicates, unkeyed) of one sheet; the first row of a key wins."""
+    schema = schema_from_rows(sheet_name, head_rows(path, sheet_name, HEADER_SCAN_ROWS))
+    if schema.header_row is None:
+        return 'no-header', {}, 0, 0, 0
+    # The title column transform_sheet() takes, for rows keyed by their title
+    title = key_columns(schema.aliases)['title']
+    keys = [column if column in schema.columns else None for column in KEY_COLUMNS] + [title]
+    price, stock = schema.aliases.get('price'), schema.aliases.get('stock')
+    if (keys[0] is None and keys[1] is None and title is None) or (price is None and stock is None):
+        return 'no-columns', {}, 0, 0, 0
+
+    # A missing column is read as index -1, which no cell has
+    wanted = [schema.columns.index(c) if c is not None else -1 for c in keys + [price, stock]]
+    values = {}
+    rows = duplicates = unkeyed = 0
+    for _, cells in column_rows(path, sheet_name, wanted, min_row=schema.header_row + 2):
+        price_cell, stock_cell = cells[-2:]
+        entry = (parse_price(price_cell) if price is not None else None,
+                 parse_stock(stock_cell) if stock is not None else None)
+        # Label and marker rows ("Precio", "FIXED"...) have no number in either column
+        if entry == (None, None):
+            continue
+        key = row_key(*cells[:-2])
+        if key is None:
+            unkeyed += 1
+            continue
+        rows += 1
+        if key in values:
+            duplicates += 1
+            continue
+        values[key] = entry
+    return 'ok', values, rows, duplicates, unkeyed
+
+
+def workbook_price_stock(path, sheet_names=None):
+    """({import_key: (price, stock)}, [(sheet, status, rows, keys, unkeyed)], duplicates) over the product sheets (or sheet_names)."""
+    if sheet_names is None:
+        sheet_names = product_sheet_names([s.name for s in workbook_sheets(path)])
+    values = {}
+    sheets = []
+    duplicates = 0
+    for sheet_name in sheet_names:
+        status, sheet_values, rows, sheet_duplicates, unkeyed = sheet_price_stock(path, sheet_name)
+        duplicates += sheet_duplicates
+        for key, entry in sheet_values.items():
+            if key in values:
+                duplicates += 1
+            else:
+                values[key] = entry
+        sheets.append((sheet_name, status, rows, len(sheet_values), unkeyed))
+    return values, sheets, duplicates
+
+
+def _differs(new, old):
+    # Prices are decimal(12, 2): compare what would be stored
+    return new is not None and (old is None or round(float(new), 2) != round(float(old), 2))
+
+
+def price_stock_delta(path, values, current, sheets=(), duplicates=0):
+    """The sync delta of values ({import_key: (price, stock)}) against current (the same, from product_variants)."""
+    changes = {}
+    unknown = 0
+    for key, (price, stock) in values.items():
+        if key not in current:
+            unknown += 1
+            continue
+        old_price, old_stock = current[key]
+        price = price if _differs(price, old_price) else None
+        stock = stock if _differs(stock, old_stock) else None
+        if price is not None or stock is not None:
+            changes[key] = [price, stock]
+    return {
+        "version": SYNC_VERSION,
+        "source": os.path.basename(path),
+        "changes": changes,
+        "sheets": [{"sheet": name, "status": status, "rows": rows, "keys": keys, "unkeyed": unkeyed}
+                   for name, status, rows, keys, unkeyed in sheets],
+        "summary": {
+            "keys": len(values),
+            "changed": len(changes),
+            "prices": sum(price is not None for price, _ in changes.values()),
+            "stocks": sum(stock is not None for _, stock in changes.values()),
+            "unchanged": len(values) - len(changes) - unknown,
+            "unknown": unknown,
+            "duplicates": duplicates,
+            "unkeyed": sum(sheet[4] for sheet in sheets),
+        },
+    }
@@ -0,0 +1,190 @@
+"""Synthetic "Fichas técnicas" workbooks for benchmarking.
+
+The generated files are laid out like MercadoLibre's exports: an "Ayuda"
+and a "hidden" sheet first, then one sheet per category with
+- row 1: column codes (FAMILY_ID, ID, ..., TITLE, BRAND, MODEL, attributes),
+  where some attributes come with a <NAME>_UNIT column,
+- row 2: FIXED / ATTRIBUTE / ATTRIBUTE_UNIT markers,
+- row 3: the sheet title and section headings,
+- row 4: the Spanish column labels,
+- then the product rows, with the blanks, '' cells and float measures of
+  the real files.
+Output depends only on the parameters (and seed), so results are comparable.
+
+synthetic_products() yields export-shaped records directly, for benchmarks
+of the stages after the export (search index, loaders).
+"""
+import random
+
+from openpyxl import Workbook
+
+FIXED_COLUMNS = [
+    ('FAMILY_ID', 'Agrupador de variantes'),
+    ('ID', 'Número de publicación'),
+    ('PRODUCT_NUMBER', 'Número de producto'),
+    ('SKU', 'SKU'),
+    ('VARIATION_ID', 'Variación ID'),
+    ('DOMAIN_ID', 'Dominio'),
+    ('CATEGORY_ID', 'Categoría'),
+    ('PARENT_CATEGORY_ID', 'Categoría CBT'),
+    ('TITLE', 'Título'),
+]
+KEY_ATTRIBUTES = [
+    ('GTIN', 'Código universal de producto'),
+    ('BRAND', 'Marca'),
+    ('MODEL', 'Modelo'),
+]
+
+# (code, label, units); attributes with units get a <code>_UNIT column
+ATTRIBUTE_POOL = [
+    ('WEIGHT', 'Peso', ['g', 'kg', 'oz']),
+    ('LENGTH', 'Largo', ['cm', 'm', 'mm', '"']),
+    ('WIDTH', 'Ancho', ['cm', 'mm']),
+    ('HEIGHT', 'Altura', ['cm', 'm']),
+    ('CAPACITY', 'Capacidad', ['L', 'mL']),
+    ('LURE_WEIGHT', 'Peso de señuelo', ['g', 'oz']),
+    ('MAX_DRAG', 'Freno Máximo', ['kg', 'lb']),
+    ('BEAM_DISTANCE', 'Alcance de proyección', ['m']),
+    ('COLOR', 'Color', None),
+    ('MATERIAL', 'Material', None),
+    ('IS_WATERPROOF', 'Es a prueba de agua', None),
+    ('BEARINGS_NUMBER', 'Rodamientos', None),
+    ('GEAR_RATIO', 'Relación de transmisión', None),
+    ('ROD_ACTION', 'Acción', None),
+]
+
+SHEET_NAMES = [
+    'Senuelos de pesca', 'Carretes de pesca', 'Canas de pescar', 'Linternas', 'Mochilas',
+    'Cuchillos tacticos y deportivos', 'Waders', 'Lineas de pesca', 'Bolsas secas', 'Maletas',
+]
+BRANDS = ['Rapala', 'Shimano', 'Daiwa', 'Berkley', 'Okuma', 'HuntPro', 'Abu Garcia', 'Marine Sports', '', None]
+NOUNS = ['Señuelo', 'Carrete', 'Caña', 'Linterna', 'Mochila', 'Cuchillo', 'Waders', 'Línea', 'Bolsa', 'Maleta']
+ADJECTIVES = ['Pro', 'Táctico', 'Ultraligero', 'Flotante', 'Impermeable', 'Trolling', 'Spinning', 'Kayak']
+VALUES = {
+    'COLOR': ['Negro', 'Verde/Blanco', 'Rojo', 'Azul', 'Camuflado'],
+    'MATERIAL': ['Aluminio', 'Acero inoxidable', 'Nylon', 'Grafito', 'Plástico ABS'],
+    'IS_WATERPROOF': ['Sí', 'No', ''],
+    'ROD_ACTION': ['Rápida', 'Media', 'Lenta'],
+}
+
+
+def attribute_columns(width):
+    """The first width attributes of the (repeated) pool, renamed _2, _3... on repeats."""
+    columns = []
+    for i in range(width):
+        code, label, units = ATTRIBUTE_POOL[i % len(ATTRIBUTE_POOL)]
+        repeat = i // len(ATTRIBUTE_POOL)
+        if repeat:
+            code, label = f"{code}_{repeat + 1}", f"{label} {repeat + 1}"
+        columns.append((code, label, units))
+    return columns
+
+
+def _header_rows(sheet_name, attributes):
+    codes = [code for code, _ in FIXED_COLUMNS + KEY_ATTRIBUTES]
+    kinds = ['FIXED'] * len(FIXED_COLUMNS) + ['ATTRIBUTE'] * len(KEY_ATTRIBUTES)
+    labels = [label for _, label in FIXED_COLUMNS + KEY_ATTRIBUTES]
+    for code, label, units in attributes:
+        codes.append(code)
+        kinds.append('ATTRIBUTE')
+        labels.append(label)
+        if units:
+            codes.append(f"{code}_UNIT")
+            kinds.append('ATTRIBUTE_UNIT')
+            labels.append(f"Unidad de {label}")
+
+    sections = [None] * len(codes)
+    sections[0] = f"{sheet_name}\n(*) Campos requeridos"
+    sections[len(FIXED_COLUMNS)] = 'Características del producto'
+    return [codes, kinds, sections, labels]
+
+
+def _product_row(rng, index, attributes, family):
+    title = f"{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.randint(10, 250)}mm {index % 997}"
+    row = [
+        str(family),
+        f"MLC{1000000000 + index}",
+        f"U{3000000000 + index}",
+        f"SKU-{index:07d}" if rng.random() < 0.6 else None,
+        str(rng.randint(10 ** 10, 10 ** 11)) if rng.random() < 0.3 else None,
+        'MLC-SYNTHETIC',
+        f"MLC{rng.randint(1000, 99999)}",
+        '',
+        title,
+        rng.choice(['El producto no tiene código registrado', str(rng.randint(10 ** 12, 10 ** 13))]),
+        rng.choice(BRANDS),
+        rng.choice([f"M-{rng.randint(1, 500)}", '', None]),
+    ]
+    for code, _, units in attributes:
+        # Repeated attributes (WEIGHT_2...) draw from the original's values
+        values = VALUES.get(code.rsplit('_', 1)[0] if code[-1].isdigit() else code)
+        if units:
+            if rng.random() < 0.3:
+                row.extend([None, ''])
+            else:
+                row.extend([round(rng.uniform(0.5, 500), 2), rng.choice(units)])
+        elif values:
+            row.append(rng.choice(values))
+        else:
+            row.append(str(rng.randint(1, 12)) if rng.random() < 0.7 else '')
+    return row
+
+
+def write_workbook(path, rows, sheets=4, attributes=20, seed=0):
+    """Write a synthetic workbook with rows product rows spread over sheets sheets."""
+    rng = random.Random(seed)
+    columns = attribute_columns(attributes)
+    workbook = Workbook(write_only=True)
+
+    help_sheet = workbook.create_sheet('Ayuda')
+    help_sheet.append([None, 'Modifica tus publicaciones'])
+    hidden = workbook.create_sheet('hidden')
+    hidden.append(['36a95b30-1db3-47a9-8940-17510b5634f3'])
+    hidden.append([b for b in BRANDS if b])
+
+    index = 0
+    for s in range(sheets):
+        name = SHEET_NAMES[s % len(SHEET_NAMES)]
+        if s >= len(SHEET_NAMES):
+            name = f"{name} {s // len(SHEET_NAMES) + 1}"
+        worksheet = workbook.create_sheet(name)
+        for header in _header_rows(name, columns):
+            worksheet.append(header)
+
+        sheet_rows = rows // sheets + (1 if s < rows % sheets else 0)
+        family = rng.randint(10 ** 14, 10 ** 15)
+        for _ in range(sheet_rows):
+            # Runs of variants share a FAMILY_ID
+            if rng.random() < 0.4:
+                family = rng.randint(10 ** 14, 10 ** 15)
+            worksheet.append(_product_row(rng, index, columns, family))
+            index += 1
+
+    workbook.save(path)
+    return path
+
+
+CATEGORY_SLUGS = ['senuelos', 'carretes-de-pesca', 'canas-de-pesca', 'iluminacion', 'mochilas-y-bolsos', 'cuchillos']
+
+
+def synthetic_products(count, seed=0):
+    """count export records (name, brand, description with model, attributes, slug)."""
+    rng = random.Random(seed)
+    for index in range(count):
+        name = f"{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {rng.randint(10, 250)}mm"
+        model = f"M-{rng.randint(1, 5000)}"
+        yield {
+            "name": name,
+            "category_slug": rng.choice(CATEGORY_SLUGS),
+            "brand_name": rng.choice(BRANDS) or 'Genérico',
+            "sku": None,
+            "description": f"<b>{name}</b><br>Modelo: {model}<br>",
+            "sheet_source": 'synthetic',
+            "import_key": f"id:MLC{1000000000 + index}",
+            "attributes": {
+                "color": rng.choice(VALUES['COLOR']),
+                "material": rng.choice(VALUES['MATERIAL']),
+                "weight_g": round(rng.uniform(1, 900), 1),
+            },
+            "slug": f"synthetic-{index}",
+        }
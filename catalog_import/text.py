@@ -0,0 +1,30 @@
+"""Text normalization shared by the category rules, the search index and duplicate detection.
+
+fold() is the accent- and case-free form every comparison goes through
+("Señuelo Rápido" -> "senuelo rapido"); normalize_name() also collapses
+whitespace (sheet and category names), and tokenize() splits folded text
+into the alphanumeric terms the search index and dedup compare, minus
+Spanish stopwords.
+"""
+import re
+import unicodedata
+
+STOPWORDS = {
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'la', 'las', 'los', 'o', 'para', 'por', 'sin', 'un', 'una', 'y',
+}
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    """Lower-case, accent-free form of text ("Señuelo Rápido" -> "senuelo rapido")."""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def normalize_name(name):
+    return ' '.join(fold(name).split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(fold(text)) if t not in STOPWORDS]
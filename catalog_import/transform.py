@@ -0,0 +1,313 @@
+"""Column-plan based sheet transformer.
+
+Everything that only depends on the headers (which columns become specs, their
+unit columns and their Spanish labels) is resolved once per sheet in
+build_column_plan(). transform_sheet() then builds the spec strings and the
+description HTML column by column instead of walking every cell of every row.
+"""
+from collections import namedtuple
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from catalog_import.assets import image_urls, plan_images
+from catalog_import.attributes import attribute_payloads, plan_attributes
+from catalog_import.schema import key_columns, resolve_columns
+from catalog_import.shipping import plan_shipping, shipping_fields
+
+# Translation map for common technical specs
+TRANSLATIONS = {
+    'WEIGHT': 'Peso',
+    'LENGTH': 'Largo',
+    'HEIGHT': 'Altura',
+    'WIDTH': 'Ancho',
+    'DEPTH': 'Profundidad',
+    'MATERIAL': 'Material',
+    'COLOR': 'Color',
+    'SIZE': 'Tamaño',
+    'CAPACITY': 'Capacidad',
+    'LINE_CAPACITY': 'Capacidad de línea',
+    'GEAR_RATIO': 'Relación de transmisión',
+    'MAX_DRAG': 'Freno Máximo',
+    'BEARINGS_NUMBER': 'Rodamientos',
+    'ROD_ACTION': 'Acción',
+    'ROD_POWER': 'Potencia',
+    'SECTIONS_NUMBER': 'Secciones',
+    'LURE_WEIGHT': 'Peso de señuelo',
+    'MAX_HEIGHT': 'Altura Máxima',
+    'MAX_WEIGHT_SUPPORTED': 'Peso Máximo Soportado',
+    'SHOOTING_STICK_TYPE': 'Tipo de soporte',
+    'IS_WATERPROOF': 'Es impermeable',
+    'WITH_UV_PROTECTION': 'Con protección UV',
+    'LENS_COLOR': 'Color del lente',
+    'FRAME_COLOR': 'Color del marco',
+    'TEMPLE_COLOR': 'Color de la varilla',
+    'LENS_MATERIAL': 'Material del lente',
+    'FRAME_MATERIAL': 'Material del marco'
+}
+
+# System columns never shown as specs (the sheet's key columns are added per plan)
+IGNORED_COLUMNS = [
+    'ID', 'FAMILY_ID', 'DOMAIN_ID', 'CATEGORY_ID', 'PARENT_CATEGORY_ID',
+    'CHECK_SUMS', 'VARIATION_ID', 'GTIN', 'SELLER_SKU', 'PRODUCT_NUMBER', 'ITEM_NUMBER',
+    'MAIN_COLOR', 'COLOR_PRIMARY_COLOR', 'tags', 'eshop_id', 'catalog_product_id'
+]
+
+# Metadata rows often found in these dumps ("Título", "FIXED", "ATTRIBUTE", ...)
+METADATA_TITLES = ['TÍTULO', 'TITLE', 'PRODUCT_NAME', 'NAME', 'FIXED', 'ATTRIBUTE', 'VALUES', 'GROUPS', 'TAGS']
+INVALID_VALUES = ['FIXED', 'ATTRIBUTE', 'N/A', 'NAN', 'IGNORE', 'MANDATORY', 'OPTIONAL', 'NO APLICA']
+INVALID_UNITS = ['N/A', 'NAN']
+
+MAX_SPECS = 15
+
+# MercadoLibre's per-variation attributes: COLOR_VARIATION-COLUMN, SIZE_VARIATION-COLUMN...
+VARIATION_SUFFIX = '_VARIATION-COLUMN'
+
+SpecColumn = namedtuple('SpecColumn', ['column', 'label', 'unit_columns'])
+# variations: SpecColumns of the *_VARIATION-COLUMN attributes, or None when variants are not grouped;
+# attributes: AttributeColumns of the typed attributes payload, or None when it is not emitted;
+# category_overrides: CATEGORY_ID -> category slug for rows that leave their sheet's category, or None;
+# shipping: the measure columns of shipping.plan_shipping(), or None when they are not emitted;
+# images: the picture columns of assets.plan_images(), or None when the sheet has none or they are not emitted
+ColumnPlan = namedtuple('ColumnPlan', ['title', 'sku', 'brand', 'model', 'specs', 'variations', 'attributes',
+                                       'category_overrides', 'shipping', 'images'], defaults=[None] * 5)
+
+
+def build_column_plan(columns, variants=False, attributes=False, category_overrides=None, shipping=False, images=False):
+    """Resolve key columns, spec columns, unit pairs and labels from the headers.
+
+    Returns None when the sheet has no title column. Raises ValueError when
+    one of the other key columns is missing: the old per-row loop crashed on
+    those sheets (e.g. "Suplementos" has no SKU), and the output has to stay
+    identical.
+
+    With variants, the *_VARIATION-COLUMN attributes are left out of the
+    specs and planned as variant attributes instead. With attributes, every
+    spec column is also planned for the typed "attributes" payload.
+    category_overrides (CATEGORY_ID -> slug) apply when the sheet has a
+    CATEGORY_ID column. With shipping, the weight and size columns are
+    planned for each row's "shipping" measures and "shipping_class". With
+    images, the picture URL columns (if any) are planned for "images".
+    """
+    columns = list(columns)
+    # Same alias table as the sheet schemas (schema.ALIASES), so every tool resolves the same columns
+    keys = key_columns(resolve_columns(columns))
+    title_col = keys['title']
+    if not title_col:
+        return None
+
+    sku_col, brand_col, model_col = keys['sku'], keys['brand'], keys['model']
+    missing = [name for name, col in [('sku', sku_col), ('brand', brand_col), ('model', model_col)] if col is None]
+    if missing:
+        raise ValueError(f"missing key column(s): {', '.join(missing)}")
+
+    image_columns = plan_images(columns) if images else None
+    ignored = {c.upper() for c in IGNORED_COLUMNS + [title_col, sku_col, brand_col, model_col] + (image_columns or [])}
+    available = set(columns)
+
+    specs = []
+    variations = [] if variants else None
+    for col in columns:
+        if col in ignored or col.endswith('_UNIT'):
+            continue
+        if variants and col.endswith(VARIATION_SUFFIX):
+            base = col[:-len(VARIATION_SUFFIX)]
+            variations.append(SpecColumn(col, TRANSLATIONS.get(base, base.title().replace('_', ' ')), []))
+            continue
+
+        # Same candidates the per-row lookup probed, in the same order. When
+        # the column has no unit pair the column itself matches, which is what
+        # produced the repeated "Verde/Blanco Verde/Blanco" values.
+        unit_columns = []
+        for uc in [col + '_UNIT', col.replace('WEIGHT', 'WEIGHT_UNIT'), col.replace('LENGTH', 'LENGTH_UNIT')]:
+            if uc in available and uc not in unit_columns:
+                unit_columns.append(uc)
+
+        label = TRANSLATIONS.get(col, col.title().replace('_', ' '))
+        specs.append(SpecColumn(col, label, unit_columns))
+
+    attribute_columns = plan_attributes(columns, specs) if attributes else None
+    overrides = category_overrides if category_overrides and 'CATEGORY_ID' in available else None
+    shipping_columns = (plan_shipping(columns) or {}) if shipping else None
+    return ColumnPlan(title_col, sku_col, brand_col, model_col, specs, variations, attribute_columns, overrides,
+                      shipping_columns, image_columns)
+
+
+# Elementwise str()/strip()/upper() over object arrays, as the row loop did per cell
+_str = np.frompyfunc(str, 1, 1)
+_strip = np.frompyfunc(str.strip, 1, 1)
+_upper = np.frompyfunc(str.upper, 1, 1)
+_fold = np.frompyfunc(lambda t: ' '.join(t.casefold().split()), 1, 1)
+
+
+def _spec_items(spec, index, present, text, invalid):
+    """Return (items, mask, repeated): the "<li>label: value unit</li>" strings of one spec column,
+    and the rows where the column was its own unit (value printed twice)."""
+    col = index[spec.column]
+    values = text[:, col]
+    mask = present[:, col] & ~invalid[:, col]
+
+    unit = np.full(len(values), '', dtype=object)
+    resolved = np.zeros(len(values), dtype=bool)
+    repeated = np.zeros(len(values), dtype=bool)
+    for uc in spec.unit_columns:
+        j = index[uc]
+        candidate = text[:, j]
+        usable = present[:, j] & (candidate != '') & ~np.isin(_upper(candidate), INVALID_UNITS) & ~resolved
+        unit = np.where(usable, candidate, unit)
+        resolved |= usable
+        if uc == spec.column:
+            repeated = usable
+
+    items = '<li>' + spec.label + ': ' + _strip(values + ' ' + unit) + '</li>'
+    return items, mask, repeated
+
+
+def _import_keys(index, present, text, title_clean):
+    """Stable row keys: the SKU, else the publication ID (+ variation), else the folded title."""
+    keys = 'title:' + _fold(title_clean)
+    if 'ID' in index:
+        i = index['ID']
+        id_keys = 'id:' + text[:, i]
+        if 'VARIATION_ID' in index:
+            v = index['VARIATION_ID']
+            id_keys = id_keys + np.where(present[:, v], ':' + text[:, v], '')
+        keys = np.where(present[:, i], id_keys, keys)
+    if 'SKU' in index:
+        s = index['SKU']
+        keys = np.where(present[:, s] & (text[:, s] != ''), 'sku:' + text[:, s], keys)
+    return keys
+
+
+def transform_sheet(df, plan, sheet_name, cat_slug, validation=None):
+    """Turn one sheet (normalized headers) into the product dicts for the JSON export.
+
+    validation (a validation.SheetValidation) records the rows each
+    data-quality rule flags, from the masks computed here anyway.
+    """
+    index = {col: i for i, col in enumerate(df.columns)}
+
+    titles = df[plan.title].to_numpy(dtype=object)
+    title_present = ~pd.isna(titles)
+    title_clean = _strip(_str(titles))
+    keep = title_present & ~np.isin(_upper(title_clean), METADATA_TITLES)
+    if 'ID' in index:
+        keep &= ~np.isin(_upper(_str(df['ID'].to_numpy(dtype=object))), ['ID', 'ITEM_ID'])
+
+    positions = df.index.to_numpy()
+    if validation is not None:
+        validation.rows += len(df)
+        validation.record('missing_title', positions[~title_present])
+        validation.record('metadata_row', positions[title_present & ~keep])
+        positions = positions[keep]
+    if not keep.any():
+        return []
+
+    # Whole-frame conversions, done once for the kept rows
+    raw = df.to_numpy(dtype=object)[keep]
+    present = ~pd.isna(raw)
+    raw_text = _str(raw)
+    text = _strip(raw_text)
+    title_clean = title_clean[keep]
+    n = len(raw)
+
+    description = '<b>' + title_clean + '</b><br>'
+
+    model_text = raw_text[:, index[plan.model]]
+    has_model = present[:, index[plan.model]] & (text[:, index[plan.model]] != '') & ~np.isin(_upper(model_text), ['MODEL', 'MODELO'])
+    description = description + np.where(has_model, 'Modelo: ' + model_text + '<br>', '')
+
+    if plan.specs:
+        invalid = np.isin(_upper(text), INVALID_VALUES)
+        columns = [_spec_items(spec, index, present, text, invalid) for spec in plan.specs]
+        masks = np.column_stack([mask for _, mask, _ in columns])
+        # Keep only the first MAX_SPECS specs of every row
+        masks &= np.cumsum(masks, axis=1) <= MAX_SPECS
+        specs_html = reduce(
+            lambda acc, i: acc + np.where(masks[:, i], columns[i][0], ''),
+            range(len(columns)),
+            np.full(n, '', dtype=object),
+        )
+        description = description + np.where(masks.any(axis=1), '<ul>' + specs_html + '</ul>', '')
+
+        if validation is not None:
+            spec_columns = [index[spec.column] for spec in plan.specs]
+            placeholders = (present[:, spec_columns] & invalid[:, spec_columns]).any(axis=1)
+            repeated = (np.column_stack([r for _, _, r in columns]) & masks).any(axis=1)
+            validation.record('placeholder_value', positions[placeholders])
+            validation.record('repeated_value', positions[repeated])
+
+    b = index[plan.brand]
+    brand_name = np.where(
+        present[:, b] & ~np.isin(_upper(raw_text[:, b]), ['BRAND', 'MARCA']),
+        text[:, b],
+        'Genérico',
+    )
+
+    s = index[plan.sku]
+    sku_value = np.where(present[:, s], text[:, s], None)
+
+    if validation is not None:
+        brand_upper = _upper(text[:, b])
+        placeholder_brand = ~present[:, b] | (text[:, b] == '') | np.isin(brand_upper, ['BRAND', 'MARCA'] + INVALID_VALUES)
+        validation.record('placeholder_brand', positions[placeholder_brand])
+        missing_sku = ~present[:, s] | (text[:, s] == '')
+        validation.record('missing_sku', positions[missing_sku])
+        validation.record_skus(positions, np.where(missing_sku, None, sku_value))
+
+    keys = _import_keys(index, present, text, title_clean)
+
+    category = np.full(n, cat_slug, dtype=object)
+    if plan.category_overrides is not None:
+        c = index['CATEGORY_ID']
+        overridden = pd.Series(np.where(present[:, c], text[:, c], '')).map(plan.category_overrides)
+        category = np.where(overridden.notna(), overridden.to_numpy(dtype=object), category)
+
+    products = [
+        {
+            "name": name,
+            "category_slug": category_slug,
+            "brand_name": brand_value,
+            "sku": sku_item,
+            "description": desc,
+            "sheet_source": sheet_name,
+            "import_key": key
+        }
+        for name, category_slug, brand_value, sku_item, desc, key
+        in zip(title_clean, category, brand_name, sku_value, description, keys)
+    ]
+    if plan.attributes is not None:
+        for product, payload in zip(products, attribute_payloads(plan.attributes, index, present, text, INVALID_VALUES)):
+            product['attributes'] = payload
+    if plan.shipping is not None:
+        for product, (measures, shipping_class) in zip(products, shipping_fields(plan.shipping, index, present, text)):
+            product['shipping'] = measures
+            product['shipping_class'] = shipping_class
+    if plan.images is not None:
+        for product, urls in zip(products, image_urls(plan.images, index, present, text)):
+            product['images'] = urls
+    if plan.variations is not None:
+        for product, variant in zip(products, _variant_fields(plan, index, present, text)):
+            product['_variant'] = variant
+    return products
+
+
+def _variant_fields(plan, index, present, text):
+    """Per row: the (family_id, item_id, variation_id, attributes) group_variants() works from."""
+    n = len(text)
+
+    def column(name):
+        if name not in index:
+            return np.full(n, None, dtype=object)
+        i = index[name]
+        return np.where(present[:, i] & (text[:, i] != ''), text[:, i], None)
+
+    attributes = [{} for _ in range(n)]
+    for spec in plan.variations:
+        i = index[spec.column]
+        usable = present[:, i] & (text[:, i] != '') & ~np.isin(_upper(text[:, i]), INVALID_VALUES)
+        for row in np.flatnonzero(usable):
+            attributes[row][spec.label] = text[row, i]
+
+    return zip(column('FAMILY_ID'), column('ID'), column('VARIATION_ID'), attributes)
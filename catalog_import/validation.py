@@ -0,0 +1,99 @@
+"""Data-quality checks of the import, as a machine-readable report.
+
+transform_sheet() records the rows each rule flags while it converts a
+frame, from the same whole-column masks it builds the products with, so
+validation adds no pass over the data. Rows are identified by their data-row
+position in the sheet (0 = first row under the header; blank rows are not
+counted, as in pd.read_excel).
+
+"dropped" rules are rows the export leaves out, "warning" rules are rows
+exported with a problem the seeder would otherwise discover.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+REPORT_VERSION = 1
+DEFAULT_REPORT_PATH = 'import_validation_report.json'
+
+Rule = namedtuple('Rule', ['name', 'action', 'description'])
+
+RULES = [
+    Rule('missing_title', 'dropped', "no title"),
+    Rule('metadata_row', 'dropped', "template row (\"Título\", \"FIXED\", \"ATTRIBUTE\", a repeated header...)"),
+    Rule('missing_sku', 'warning', "no SKU; exported with sku null"),
+    Rule('duplicate_sku', 'warning', "SKU already used by an earlier row of the sheet"),
+    Rule('placeholder_brand', 'warning', "brand missing or a placeholder (\"BRAND\", \"nan\", \"N/A\"...)"),
+    Rule('placeholder_value', 'warning', "a spec cell holds a template marker (\"MANDATORY\", \"FIXED\"...); left out of the description"),
+    Rule('repeated_value', 'warning', "a spec without unit column, printed twice (\"Verde/Blanco Verde/Blanco\")"),
+]
+RULE_NAMES = [rule.name for rule in RULES]
+
+
+class SheetValidation:
+    """Offending rows of one sheet (or of one row range of it), rule by rule."""
+
+    def __init__(self, sheet_name):
+        self.sheet_name = sheet_name
+        self.rows = 0
+        self.offending = {name: [] for name in RULE_NAMES}
+        # SKU -> first row using it; duplicates across frames and tasks are resolved in merge()
+        self.first_skus = {}
+
+    def record(self, rule, rows):
+        """Flag rows (an int array of data-row positions)."""
+        if len(rows):
+            self.offending[rule].append(np.asarray(rows, dtype=np.int64))
+
+    def record_skus(self, rows, skus):
+        """Flag rows whose SKU (None = no SKU) is already used, by this call or an earlier one."""
+        skus = pd.Series(skus, dtype=object)
+        present = skus.notna().to_numpy()
+        rows, skus = np.asarray(rows)[present], skus[present]
+        repeated = (skus.duplicated() | skus.isin(self.first_skus.keys())).to_numpy()
+        self.record('duplicate_sku', rows[repeated])
+        self.first_skus.update(zip(skus[~repeated], rows[~repeated].tolist()))
+
+    def merge(self, other):
+        """Append the validation of the next row range of the same sheet."""
+        offset = self.rows
+        for name, parts in other.offending.items():
+            self.offending[name].extend(part + offset for part in parts)
+        skus = list(other.first_skus)
+        self.record_skus([other.first_skus[sku] + offset for sku in skus], skus)
+        self.rows += other.rows
+
+    def rule_rows(self, name):
+        parts = self.offending[name]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def summary(self):
+        rules = {}
+        for name in RULE_NAMES:
+            rows = self.rule_rows(name)
+            if len(rows):
+                rules[name] = {"count": int(len(rows)), "rows": rows.tolist()}
+        return {"rows": self.rows, "rules": rules}
+
+
+def build_report(source, reports):
+    """The report document for pipeline SheetReports (in workbook order)."""
+    totals = dict.fromkeys(RULE_NAMES, 0)
+    sheets = {}
+    for report in reports:
+        sheet = {"status": report.status}
+        if report.validation is not None:
+            sheet.update(report.validation.summary())
+            for name, entry in sheet['rules'].items():
+                totals[name] += entry['count']
+        if report.message:
+            sheet['message'] = report.message
+        sheets[report.sheet_name] = sheet
+    return {
+        "version": REPORT_VERSION,
+        "source": source,
+        "rules": {rule.name: {"action": rule.action, "description": rule.description} for rule in RULES},
+        "totals": totals,
+        "sheets": sheets,
+    }
@@ -0,0 +1,87 @@
+"""Collapse a sheet's variation rows into one product with several variants.
+
+MercadoLibre exports every color/size variation as its own row. Rows with
+the same FAMILY_ID (or, without one, the same publication ID with distinct
+VARIATION_IDs) are one product. group_variants() groups a sheet's rows in a
+single pass over a dict keyed by family, so the cost is linear in rows.
+The first row of a family supplies the product fields; every row becomes an
+entry of its "variants" list. A family's product is keyed "family:<FAMILY_ID>"
+(or "item:<ID>") however many rows it has, so the key does not change when
+a variation is added or removed.
+"""
+from catalog_import.assets import merge_images
+from catalog_import.attributes import merge_attributes
+from catalog_import.shipping import merge_shipping_class
+
+DEFAULT_VARIANT_NAME = 'Estándar'
+
+
+def _family_key(family_id, item_id, variation_id):
+    # Namespaces of their own: a row without VARIATION_ID is keyed "id:<ITEM_ID>" (transform._import_keys)
+    if family_id is not None:
+        return f"family:{family_id}"
+    if item_id is not None and variation_id is not None:
+        return f"item:{item_id}"
+    return None
+
+
+def _variant(product, item_id, attributes, name):
+    variant = {
+        "name": name,
+        "sku": product['sku'],
+        "item_id": item_id,
+        "attributes": attributes,
+        "import_key": product['import_key'],
+    }
+    if 'shipping' in product:
+        variant['shipping'] = product['shipping']
+    return variant
+
+
+def group_variants(products):
+    """Return one product per family, in order of first appearance, each with its "variants".
+
+    products are transform_sheet() dicts built with a variant plan (they
+    carry a "_variant" entry, which is consumed here).
+    """
+    groups = {}
+    for position, product in enumerate(products):
+        family_id, item_id, variation_id, attributes = product.pop('_variant')
+        key = _family_key(family_id, item_id, variation_id)
+        groups.setdefault(key if key is not None else position, []).append((product, item_id, attributes))
+
+    grouped = []
+    for key, rows in groups.items():
+        first = rows[0][0]
+        variants = []
+        for n, (product, item_id, attributes) in enumerate(rows, 1):
+            # Attribute values, else the row's own title if it differs, else a number
+            if attributes:
+                name = ' / '.join(attributes.values())
+            elif len(rows) == 1:
+                name = DEFAULT_VARIANT_NAME
+            elif product['name'] != first['name']:
+                name = product['name']
+            else:
+                name = f"Variante {n}"
+            variants.append(_variant(product, item_id, attributes, name))
+
+        product = dict(first)
+        if isinstance(key, str):
+            # Keyed by family even with one variation, so gaining a second one changes the product
+            # (in the manifest and diffs) rather than replacing it
+            product['import_key'] = key
+        if len(rows) > 1:
+            if 'attributes' in first:
+                # Facets must match every variant (e.g. each line diameter), not just the first
+                product['attributes'] = merge_attributes([row[0]['attributes'] for row in rows])
+            if 'images' in first:
+                # Pictures are the product's: every variation's, without repeats
+                product['images'] = merge_images(row[0]['images'] for row in rows)
+        if 'shipping' in first:
+            # Measures are per variant; the product is shipped as its most restrictive variant
+            del product['shipping']
+            product['shipping_class'] = merge_shipping_class(row[0]['shipping_class'] for row in rows)
+        product['variants'] = variants
+        grouped.append(product)
+    return grouped
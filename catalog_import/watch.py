@@ -0,0 +1,234 @@
+"""Watch mode: import every new or changed export dropped into a directory.
+
+    python -m catalog_import watch [--dir public] [generate_import_final.py options]
+
+Workbooks matching the pattern (Fichas_tecnicas-*.xlsx) are imported by
+generate_import_final.py's main(), run in this process: pandas, pyarrow and
+the pipeline are imported once, and the category rules (categories.load_rules)
+and header schemas stay compiled between imports, so a new export only pays
+for its own rows. Each one is exported to <output dir>/<workbook name>.json,
+ready for load_import_data.py, with its manifest, search index, reports and
+metrics beside it (<workbook name>.manifest.json, .search_index.bin...), so
+imports of different workbooks never overwrite or mix each other's files.
+Options given after the watch options are passed to the generator, e.g.
+--load-db to load each export right away.
+
+A file is imported once it has settled: its size and mtime unchanged for
+--settle seconds and its zip directory readable, so a copy still in
+progress is never read half-written. The directory is watched with
+watchdog's filesystem events when it is installed, else polled every
+--interval seconds. Imported workbooks are recorded by content hash in
+.import_cache/watch.json: restarting the watcher, or touching a file
+without changing it, imports nothing again.
+"""
+import fnmatch
+import json
+import os
+import runpy
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+from catalog_import.manifest import write_json_atomic
+from catalog_import.schema import CACHE_DIR, workbook_hash
+
+DEFAULT_WATCH_DIR = 'public'
+DEFAULT_PATTERN = 'Fichas_tecnicas-*.xlsx'
+DEFAULT_OUTPUT_DIR = 'imports'
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_INTERVAL_SECONDS = 1.0
+WATCH_STATE_PATH = os.path.join(CACHE_DIR, 'watch.json')
+
+# generate_import_final.py's per-run files, and the suffix each gets after the workbook name
+ARTIFACTS = [
+    ('--output', '.json'),
+    ('--manifest', '.manifest.json'),
+    ('--delta-output', '.delta.json'),
+    ('--search-index', '.search_index.bin'),
+    ('--duplicates-report', '.duplicates.json'),
+    ('--validation-report', '.validation.json'),
+    ('--metrics', '.metrics.jsonl'),
+    ('--profile-output', '.prof'),
+]
+
+# With filesystem events, the directory is still rescanned this often in case one was missed
+EVENT_RESCAN_SECONDS = 60.0
+
+
+def log(message):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+
+def scan(directory, pattern):
+    """{path: (size, mtime_ns)} of the directory's files matching pattern (Excel's ~$ lock files excluded)."""
+    found = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(('~$', '.')) or not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.is_file():
+                found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+def is_complete(path):
+    # An .xlsx is a zip, whose central directory is written last
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+class Debouncer:
+    """Reports each file version once, after it has not changed for settle seconds."""
+
+    def __init__(self, settle=DEFAULT_SETTLE_SECONDS):
+        self.settle = settle
+        self.pending = {}   # path -> (stat, first seen with that stat)
+        self.reported = {}  # path -> stat
+
+    def update(self, stats, now):
+        """The paths that settled since the last update."""
+        settled = []
+        for path, stat in stats.items():
+            if self.reported.get(path) == stat:
+                continue
+            previous = self.pending.get(path)
+            if previous is None or previous[0] != stat:
+                self.pending[path] = (stat, now)
+            elif now - previous[1] >= self.settle:
+                del self.pending[path]
+                self.reported[path] = stat
+                if is_complete(path):
+                    settled.append(path)
+                else:
+                    # Not a workbook (yet): a later write changes its stat and it is looked at again
+                    log(f"Skipping {path}: not a readable .xlsx")
+        for path in set(self.pending) - set(stats):
+            del self.pending[path]
+        return settled
+
+    def next_check(self, now):
+        """Seconds until the earliest pending file can settle, or None."""
+        if not self.pending:
+            return None
+        return max(min(since for _, since in self.pending.values()) + self.settle - now, 0.05)
+
+
+def _observer(directory, wake):
+    """A started watchdog observer setting wake on every event in directory, or None without watchdog."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    observer.schedule(Handler(), directory, recursive=False)
+    observer.start()
+    return observer
+
+
+def load_generator(script):
+    """generate_import_final.main, loaded once (running it as __main__ would exit the process)."""
+    return runpy.run_path(script, run_name='catalog_import_generate')['main']
+
+
+class Watcher:
+    def __init__(self, generate, directory=DEFAULT_WATCH_DIR, pattern=DEFAULT_PATTERN, output_dir=DEFAULT_OUTPUT_DIR,
+                 options=(), settle=DEFAULT_SETTLE_SECONDS, interval=DEFAULT_INTERVAL_SECONDS,
+                 state_path=WATCH_STATE_PATH):
+        self.generate = generate
+        self.directory = directory
+        self.pattern = pattern
+        self.output_dir = output_dir
+        self.options = list(options)
+        self.interval = interval
+        self.state_path = state_path
+        self.debouncer = Debouncer(settle)
+        self.state = {}
+        if os.path.exists(state_path):
+            with open(state_path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.imported = self.failed = 0
+
+    def artifact_paths(self, path):
+        """{generator option: path} of every file an import of the workbook at path writes."""
+        stem = os.path.join(self.output_dir, os.path.splitext(os.path.basename(path))[0])
+        return {option: stem + suffix for option, suffix in ARTIFACTS}
+
+    def process(self, path):
+        """Import one settled workbook, unless this content was imported already."""
+        key = os.path.abspath(path)
+        try:
+            digest = workbook_hash(path)
+        except FileNotFoundError:
+            return
+        if self.state.get(key, {}).get('hash') == digest:
+            return
+        artifacts = self.artifact_paths(path)
+        output = artifacts['--output']
+        os.makedirs(self.output_dir, exist_ok=True)
+        log(f"Importing {path} -> {output}")
+        started = time.perf_counter()
+        # The watch defaults come first, so options given on the command line override them
+        argv = ['--workbook', path] + [value for item in artifacts.items() for value in item] + self.options
+        try:
+            self.generate(argv)
+        except SystemExit as e:
+            # argparse errors (bad pass-through options) exit; nothing else would import either
+            if e.code:
+                raise
+        except Exception as e:
+            # Not recorded: a new version of the file, or restarting the watcher, tries again
+            self.failed += 1
+            log(f"Import of {path} failed: {e}")
+            return
+        seconds = time.perf_counter() - started
+        self.imported += 1
+        self.state[key] = {"hash": digest, "output": output, "imported_at": datetime.now().isoformat(timespec='seconds'),
+                           "seconds": round(seconds, 3)}
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        write_json_atomic(self.state_path, self.state)
+        log(f"Imported {path} in {seconds:.2f}s")
+
+    def poll(self, now=None):
+        """Scan once and import what settled; returns the seconds until a pending file can settle, or None."""
+        now = time.monotonic() if now is None else now
+        stats = scan(self.directory, self.pattern)
+        # Oldest first, by the mtime scanned: a file deleted since is not stat'ed again (process() skips it)
+        for path in sorted(self.debouncer.update(stats, now), key=lambda p: stats[p][1]):
+            self.process(path)
+        return self.debouncer.next_check(time.monotonic())
+
+    def run(self, once=False):
+        """Watch until interrupted; with once, import what is there (once settled) and return."""
+        wake = threading.Event()
+        observer = None if once else _observer(self.directory, wake)
+        if not once:
+            log(f"Watching {os.path.join(self.directory, self.pattern)} "
+                f"({'filesystem events' if observer is not None else f'polling every {self.interval:g}s'})")
+        try:
+            while True:
+                pending = self.poll()
+                if once and pending is None:
+                    return
+                if observer is None:
+                    timeout = self.interval if pending is None else min(self.interval, pending)
+                else:
+                    timeout = EVENT_RESCAN_SECONDS if pending is None else pending
+                wake.wait(timeout)
+                wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
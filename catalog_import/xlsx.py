@@ -0,0 +1,178 @@
+"""Workbook metadata, first rows and single columns straight from the .xlsx zip, standard library only.
+
+Opening the workbook with openpyxl (or pandas) costs an import of several
+hundred milliseconds plus parsing styles and every sheet's metadata before
+the first cell can be read. Listing sheets only needs xl/workbook.xml, and a
+header only needs the first rows of one sheet's XML plus the shared strings
+they point to, so these helpers read exactly that and stop. column_rows()
+reads a whole sheet but keeps only the cells of the columns asked for.
+
+Values come back as openpyxl gives them in read-only, data-only mode:
+strings, ints/floats, booleans, None for empty cells; the one difference is
+that date-formatted numbers stay numbers (styles are not read).
+"""
+import posixpath
+import re
+import zipfile
+from collections import namedtuple
+from xml.etree.ElementTree import iterparse
+
+MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# state: 'visible', 'hidden' or 'veryHidden'; part: the sheet's XML inside the zip
+SheetInfo = namedtuple('SheetInfo', ['name', 'state', 'part'])
+
+_CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+
+
+class SheetNotFound(KeyError):
+    """A sheet name the workbook does not have (a KeyError, like openpyxl's workbook[name])."""
+
+    def __str__(self):
+        return self.args[0]
+
+
+def _part_path(target):
+    # Relationship targets are relative to xl/, or absolute within the package
+    return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+
+def workbook_sheets(path):
+    """SheetInfo of every sheet, in workbook order."""
+    with zipfile.ZipFile(path) as archive:
+        targets = {}
+        with archive.open('xl/_rels/workbook.xml.rels') as f:
+            for _, element in iterparse(f):
+                if element.tag == PACKAGE_REL + 'Relationship':
+                    targets[element.get('Id')] = _part_path(element.get('Target'))
+
+        sheets = []
+        with archive.open('xl/workbook.xml') as f:
+            for _, element in iterparse(f):
+                if element.tag == MAIN + 'sheet':
+                    sheets.append(SheetInfo(element.get('name'), element.get('state', 'visible'),
+                                            targets.get(element.get(REL + 'id'))))
+    return sheets
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _number(text):
+    # Same rule as openpyxl's reader
+    return float(text) if '.' in text or 'E' in text or 'e' in text else int(text)
+
+
+def _shared_strings(archive, needed):
+    """{index: text} for the needed shared-string indexes, reading no further than the last one."""
+    strings = {}
+    if not needed or 'xl/sharedStrings.xml' not in archive.namelist():
+        return strings
+    last = max(needed)
+    with archive.open('xl/sharedStrings.xml') as f:
+        index = 0
+        for _, element in iterparse(f):
+            if element.tag != MAIN + 'si':
+                continue
+            if index in needed:
+                # Plain text, or rich text split in runs (phonetic hints in rPh are not part of the value)
+                runs = element.findall(MAIN + 't') + element.findall(f"{MAIN}r/{MAIN}t")
+                strings[index] = ''.join(t.text or '' for t in runs)
+            element.clear()
+            if index == last:
+                break
+            index += 1
+    return strings
+
+
+def _sheet_part(path, sheet_name):
+    part = next((s.part for s in workbook_sheets(path) if s.name == sheet_name), None)
+    if part is None:
+        raise SheetNotFound(f"Worksheet {sheet_name} does not exist.")
+    return part
+
+
+def _raw_rows(archive, part, max_rows=None, columns=None):
+    """Yield (row number, {column: (type, text)}) per row; only the cells of columns (indexes) if given."""
+    count = 0
+    with archive.open(part) as f:
+        for _, element in iterparse(f):
+            if element.tag != MAIN + 'row':
+                continue
+            count += 1
+            number = int(element.get('r') or count)
+            if max_rows is not None and number > max_rows:
+                break
+            cells = {}
+            for position, cell in enumerate(element.iter(MAIN + 'c')):
+                ref = _CELL_REF.match(cell.get('r') or '')
+                column = _column_index(ref.group(1)) if ref else position
+                if columns is not None and column not in columns:
+                    continue
+                kind = cell.get('t', 'n')
+                if kind == 'inlineStr':
+                    text = ''.join(t.text or '' for t in cell.iter(MAIN + 't'))
+                else:
+                    value = cell.find(MAIN + 'v')
+                    text = value.text if value is not None else None
+                if text is not None:
+                    cells[column] = (kind, text)
+            element.clear()
+            yield number, cells
+
+
+def _value(kind, text, strings):
+    if kind == 's':
+        return strings.get(int(text))
+    if kind == 'b':
+        return text == '1'
+    if kind in ('str', 'inlineStr', 'e'):
+        return text
+    return _number(text)
+
+
+def _string_indexes(raw):
+    return {int(text) for cells in raw for kind, text in cells.values() if kind == 's'}
+
+
+def head_rows(path, sheet_name, max_rows=20):
+    """The first max_rows rows of a sheet (blank rows included) as lists of values, trailing blanks cut."""
+    part = _sheet_part(path, sheet_name)
+    with zipfile.ZipFile(path) as archive:
+        raw = dict(_raw_rows(archive, part, max_rows))  # row number -> {column: (type, text)}
+        strings = _shared_strings(archive, _string_indexes(raw.values()))
+
+    rows = []
+    for number in range(1, min(max_rows, max(raw, default=0)) + 1):
+        cells = raw.get(number, {})
+        values = [None] * (max(cells) + 1 if cells else 0)
+        for column, (kind, text) in cells.items():
+            values[column] = _value(kind, text, strings)
+        rows.append(values)
+    return rows
+
+
+def column_rows(path, sheet_name, columns, min_row=1):
+    """(row number, [value of each of columns]) of every row from min_row on that has a value in one of them.
+
+    Only the cells of columns (0-based indexes) are kept while the sheet's
+    XML streams by, and only the shared strings they point to are looked
+    up, so the cost is one parse of the sheet and memory grows with the
+    projected columns only.
+    """
+    part = _sheet_part(path, sheet_name)
+    wanted = set(columns)
+    with zipfile.ZipFile(path) as archive:
+        raw = [(number, cells) for number, cells in _raw_rows(archive, part, columns=wanted) if number >= min_row and cells]
+        strings = _shared_strings(archive, _string_indexes(cells for _, cells in raw))
+
+    return [
+        (number, [_value(*cells[column], strings) if column in cells else None for column in columns])
+        for number, cells in raw
+    ]
@@ -0,0 +1,28 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('product_variants', function (Blueprint $table) {
+            $table->decimal('volumetric_weight_kg', 8, 3)->after('height_cm')->nullable()->comment('(L × W × H) / 4000, precomputed by the import');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('product_variants', function (Blueprint $table) {
+            $table->dropColumn('volumetric_weight_kg');
+        });
+    }
+};
@@ -0,0 +1,29 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('product_variants', function (Blueprint $table) {
+            $table->string('source_sku')->after('sku')->nullable()->index()->comment('SKU as listed in the workbook, before truncation or -N suffixes');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('product_variants', function (Blueprint $table) {
+            $table->dropIndex(['source_sku']);
+            $table->dropColumn('source_sku');
+        });
+    }
+};
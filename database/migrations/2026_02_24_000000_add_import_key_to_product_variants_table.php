@@ -0,0 +1,29 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('product_variants', function (Blueprint $table) {
+            $table->string('import_key')->after('source_sku')->nullable()->index()->comment('Key of the workbook row the variant comes from (sku:, id: or title:)');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('product_variants', function (Blueprint $table) {
+            $table->dropIndex(['import_key']);
+            $table->dropColumn('import_key');
+        });
+    }
+};
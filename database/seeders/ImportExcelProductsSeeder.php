@@ -7,20 +7,24 @@
 use App\Models\Category;
 use App\Models\Brand;
 use App\Models\Product;
+use App\Models\ProductAttribute;
+use App\Models\ProductVariant;
 use App\Models\ShippingClass;
 
 class ImportExcelProductsSeeder extends Seeder
 {
     /**
      * Run the database seeds.
+     *
+     * Queries once per product; for large catalogs `python3 load_import_data.py`
+     * (or `generate_import_final.py --load-db`) does the same import in bulk.
      */
     public function run(): void
     {
-        $json = file_get_contents(base_path('import_data_final.json'));
-        $inputData = json_decode($json, true);
+        $inputData = $this->records();
 
         if (!$inputData) {
-            $this->command->error('No JSON data found in import_data_final.json');
+            $this->command->error('No import data found (import_data_final.ndjson[.gz] or import_data_final.json)');
             return;
         }
 
@@ -30,12 +34,32 @@ public function run(): void
             ['name' => 'Envío Normal', 'price' => 5000, 'is_surcharge' => false]
         );
 
-        $this->command->info('Importing ' . count($inputData) . ' products...');
+        $this->command->info('Importing products...');
 
+        // Taken slugs, loaded once; the export already carries unique slugs,
+        // so this only matters for products created since it was generated
+        $takenSlugs = Product::pluck('slug')->flip()->all();
+        // Same for variant SKUs (product_variants.sku is unique): repeated or truncated SKUs get a suffix
+        $takenSkus = ProductVariant::pluck('sku')->flip()->all();
+        // Shipping class by size, precomputed by the generator ("shipping_class")
+        $shippingClasses = ShippingClass::pluck('id', 'code')->all();
+        $categories = [];
+
+        $imported = 0;
         foreach ($inputData as $data) {
+            // Near-duplicate of an earlier record of the export (the generator's dedup stage)
+            if (!empty($data['duplicate_of'])) {
+                continue;
+            }
+
             // Find Category
-            // Start simple: strict slug match
-            $category = Category::where('slug', $data['category_slug'])->first();
+            // Resolved by the generator when it was given the database (--categories-from / --load-db)
+            $category = isset($data['category_id']) ? ($categories[$data['category_id']] ??= Category::find($data['category_id'])) : null;
+
+            // Otherwise: strict slug match
+            if (!$category) {
+                $category = Category::where('slug', $data['category_slug'])->first();
+            }
             
             // If category not found, try to find by Name maybe? Or map to root
             if (!$category) {
@@ -68,16 +92,17 @@ public function run(): void
                 ['name' => $brandName]
             );
 
-            // Generate Unique Slug
-            $baseSlug = \Illuminate\Support\Str::slug($data['name']);
-            if (empty($baseSlug)) $baseSlug = 'producto-' . uniqid();
+            // Unique Slug (precomputed by generate_import_final.py for current exports)
+            $baseSlug = $data['slug'] ?? \Illuminate\Support\Str::slug($data['name']);
+            if (empty($baseSlug)) $baseSlug = 'producto';
             
             $slug = $baseSlug;
             $counter = 1;
-            while (Product::where('slug', $slug)->exists()) {
+            while (isset($takenSlugs[$slug])) {
                 $slug = $baseSlug . '-' . $counter;
                 $counter++;
             }
+            $takenSlugs[$slug] = true;
             
             // Create Product
             $product = Product::create([
@@ -85,26 +110,119 @@ public function run(): void
                 'slug' => $slug,
                 'category_id' => $category->id,
                 'brand_id' => $brand->id,
-                'shipping_class_id' => $defaultShipping->id,
+                'shipping_class_id' => $shippingClasses[$data['shipping_class'] ?? ''] ?? $defaultShipping->id,
                 'description' => substr($data['description'] ?? 'Sin descripción.', 0, 5000), // Limit length just in case
                 'short_description' => mb_convert_encoding(substr(strip_tags($data['description'] ?? ''), 0, 160), 'UTF-8', 'UTF-8'),
                 'base_price' => 14990, // Default price for imported items
                 'is_active' => true,
                 'is_restricted' => false, 
                 'age_verification_required' => false,
-                'main_image_url' => '/images/imagenesdemo/5.png', // Using the demo image requested
+                // Pictures fetched by generate_import_final.py --fetch-images, else the demo image
+                'main_image_url' => $data['main_image_url'] ?? '/images/imagenesdemo/5.png',
+                'gallery' => $data['gallery'] ?? null,
+                'thumbnail_url' => $data['thumbnail_url'] ?? null,
             ]);
 
-            // Create Default Variant for stock management
-            $product->variants()->create([
+            // Variants grouped by the generator (FAMILY_ID); older exports get one default variant
+            // (keyed by the record's row, without the "#N" of a repeated key)
+            $variants = $data['variants'] ?? [[
                 'name' => 'Estándar',
-                'sku' => substr($product->slug, 0, 100),
-                'price' => $product->base_price,
-                'stock_quantity' => 0,
-                'is_active' => true,
-            ]);
+                'sku' => null,
+                'attributes' => [],
+                'import_key' => isset($data['import_key']) ? explode('#', $data['import_key'])[0] : null,
+            ]];
+            foreach ($variants as $variant) {
+                $sku = $this->uniqueSku(!empty($variant['sku']) ? (string) $variant['sku'] : $product->slug, $takenSkus);
+
+                // Measures of the variant's row (on the record itself when variants are not grouped)
+                $shipping = $variant['shipping'] ?? $data['shipping'] ?? [];
+
+                $product->variants()->create([
+                    'name' => $variant['name'],
+                    'sku' => $sku,
+                    'source_sku' => !empty($variant['sku']) ? (string) $variant['sku'] : null,
+                    // What price/stock syncs match the workbook's rows against
+                    'import_key' => $variant['import_key'] ?? null,
+                    'variant_attributes' => $variant['attributes'] ?: null,
+                    'price' => $product->base_price,
+                    'stock_quantity' => 0,
+                    'weight_kg' => $shipping['weight_kg'] ?? null,
+                    'length_cm' => $shipping['length_cm'] ?? null,
+                    'width_cm' => $shipping['width_cm'] ?? null,
+                    'height_cm' => $shipping['height_cm'] ?? null,
+                    'volumetric_weight_kg' => $shipping['volumetric_weight_kg'] ?? null,
+                    'is_active' => true,
+                ]);
+            }
+
+            // Typed, unit-normalized specs for facet filtering
+            if (!empty($data['attributes'])) {
+                ProductAttribute::create([
+                    'product_id' => $product->id,
+                    'attributes' => $data['attributes'],
+                ]);
+            }
+            $imported++;
         }
         
-        $this->command->info('Import completed successfully!');
+        $this->command->info("Import completed successfully! ({$imported} products)");
+    }
+
+    /**
+     * The base cut to product_variants.sku's 100 characters, with a -N suffix
+     * (inside the limit) when taken; the same SKUs catalog_import.loader.unique_sku()
+     * gives the bulk loader.
+     */
+    private function uniqueSku(string $base, array &$taken, int $length = 100): string
+    {
+        $sku = mb_substr($base, 0, $length);
+        $counter = 1;
+        while (isset($taken[$sku])) {
+            $suffix = '-' . $counter;
+            $sku = mb_substr($base, 0, $length - strlen($suffix)) . $suffix;
+            $counter++;
+        }
+        $taken[$sku] = true;
+
+        return $sku;
+    }
+
+    /**
+     * Read the generator's export. NDJSON (optionally gzipped) is read one
+     * line at a time so memory stays flat; the JSON array is the fallback.
+     */
+    private function records(): ?iterable
+    {
+        foreach (['import_data_final.ndjson.gz', 'import_data_final.ndjson'] as $file) {
+            $path = base_path($file);
+            if (file_exists($path)) {
+                return $this->readNdjson($path);
+            }
+        }
+
+        $path = base_path('import_data_final.json');
+        if (!file_exists($path)) {
+            return null;
+        }
+
+        return json_decode(file_get_contents($path), true) ?: null;
+    }
+
+    private function readNdjson(string $path): \Generator
+    {
+        // gzopen() also reads uncompressed files transparently
+        $handle = gzopen($path, 'rb');
+
+        try {
+            while (($line = gzgets($handle)) !== false) {
+                $line = trim($line);
+                if ($line === '') {
+                    continue;
+                }
+                yield json_decode($line, true);
+            }
+        } finally {
+            gzclose($handle);
+        }
     }
 }
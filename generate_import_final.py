@@ -1,230 +1,328 @@
-import json
-import pandas as pd
-
-file_path = r'public/Fichas_tecnicas-2026_02_14-18_22.xlsx'
-
-# Mapping Sheet -> DB Category
-sheet_map = {
-    # PESCA
-    "Senuelos de pesca": "senuelos", # General Senuelos
-    "Carretes de pesca": "carretes-de-pesca", # General Carretes
-    "Canas de pescar": "canas-de-pesca", # General Canas
-    "Lineas de pesca": "lineas",
-    "Anzuelos de pesca": "anzuelos-jig-heads",
-    "Remeras de pesca": "indumentaria-pesca",
-    "Portacanas de pesca": "equipamiento-pesca",
-    "Cajas de accesorios de pesca": "cajas-de-senuelos",
-    "Boyas de pesca": "accesorios-pesca-tradicional",
-    "Guantes y mitones para pesca": "indumentaria-pesca",
-    "Pinzas de pesca": "herramientas-pesca",
-    "Imanes para pesca": "accesorios-pesca-tradicional",
-    
-    # OUTDOOR / CAMPING
-    "Equipamiento para camping y ...": "equipamiento-outdoor", # General Outdoor
-    "Linternas": "iluminacion",
-    "Infladores manuales y de pie": "esenciales-camping",
-    "Cargadores de baterias y pilas": "accesorios-supervivencia", 
-    "Bolsas secas": "mochilas-y-bolsos",
-    "Mochilas": "mochilas-y-bolsos",
-    "Bolsas de hidratacion": "hidratacion", 
-    
-    # CUCHILLERÍA / ARMAS / CAZA
-    "Cuchillos tacticos y deportivos": "cuchillos",
-    "Cuchillos de buceo": "cuchillos-outdoor",
-    "Cuchillos de cocina": "cuchillos-cocina",
-    "Fundas para armas": "accesorios-caza",
-    "Afiladores manuales para el ...": "herramientas-pesca", # Can be confusing, but closer to tool maintenance
-    "Redes de caza": "accesorios-caza",
-    "Bastones de tiro": "accesorios-caza",
-    "Postones": "postones",
-    
-    # ROPA
-    "Trajes de neopreno": "waders",
-    "Waders": "waders",
-    "Lentes deportivos": "anteojos-y-straps",
-    
-    # OTHER
-    "Articulos de belleza y cuida...": "accesorios-vestuario",
-    "Deportes y fitness": "outdoor",
-    "Suplementos": "outdoor",
-    "Equipamiento para aerobics y...": "outdoor",
-    "Medidores laser": "opticos",
-    "Maletas": "bolsos-y-mochilas-pesca",
-    "Cronometros": "accesorios-vestuario"
-}
-
-try:
-    xls = pd.ExcelFile(file_path)
-    sheet_names = [s for s in xls.sheet_names if s not in ['Ayuda', 'hidden']]
-    
-    products_list = []
-    
-    print(f"Processing {len(sheet_names)} sheets with refined mapping...")
-    
-    for sheet_name in sheet_names:
-        # Get category slug from map, default to 'outdoor' if unknown
-        cat_slug = sheet_map.get(sheet_name, 'outdoor')
-        
+import argparse
+import os
+import sys
+import time
+
+from catalog_import.assets import DEFAULT_CONNECTIONS, DEFAULT_RETRIES, ImagePipeline
+from catalog_import.categories import DEFAULT_MAP_PATH, category_id_for, load_rules
+from catalog_import.checkpoint import IncompleteImport, open_checkpoint
+from catalog_import.columnar import open_cache, workbook_sheet_names
+from catalog_import.dedup import DEFAULT_DUPLICATES_PATH, DEFAULT_THRESHOLD, DuplicateIndex
+from catalog_import.instrumentation import DEFAULT_METRICS_PATH, DEFAULT_PROFILE_PATH, Metrics
+from catalog_import.loader import BulkLoader, connect, existing_categories, existing_slugs
+from catalog_import.manifest import ManifestBuilder, build_delta, load_manifest, write_json_atomic
+from catalog_import.output import FORMATS, ExportFile, default_output_path
+from catalog_import.pipeline import DEFAULT_CHUNK_ROWS, iter_sheet_results, iter_task_results, plan_tasks
+from catalog_import.reader import close_shared_workbooks, product_sheet_names, shared_workbook
+from catalog_import.search import DEFAULT_INDEX_PATH, IndexBuilder
+from catalog_import.slugs import SlugIndex
+from catalog_import.validation import DEFAULT_REPORT_PATH, RULES, build_report
+from catalog_import.variants import group_variants
+
+DEFAULT_WORKBOOK = r'public/Fichas_tecnicas-2026_02_14-18_22.xlsx'
+
+# Sheet -> DB category mapping lives in catalog_import/category_map.json (see catalog_import.categories)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate import_data_final.json from the Fichas técnicas workbook.")
+    parser.add_argument('--workbook', default=DEFAULT_WORKBOOK,
+                        help=f"workbook to import (default: {DEFAULT_WORKBOOK})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="process sheets on N worker processes (default: 1, no pool)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="with --workers > 1, split sheets with more rows than this into row ranges")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="parse the workbook directly instead of through the columnar cache in .import_cache/")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="start over instead of reusing the sheets a previous, unfinished run completed")
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help="do not checkpoint finished sheets in .import_cache/checkpoints/ (a failed run then starts over)")
+    parser.add_argument('--no-group-variants', action='store_true',
+                        help="export one product per row instead of grouping FAMILY_ID variations into one product")
+    parser.add_argument('--no-attributes', action='store_true',
+                        help="do not emit the typed, unit-normalized \"attributes\" object of each product")
+    parser.add_argument('--no-shipping', action='store_true',
+                        help="do not emit the variants' shipping measures (weight, size, volumetric weight) and shipping class")
+    parser.add_argument('--no-images', action='store_true',
+                        help="do not emit the picture URLs of the sheets' image columns as each product's \"images\"")
+    parser.add_argument('--fetch-images', action='store_true',
+                        help="download the pictures into storage/app/public/products/import/ (once per URL, content-addressed) "
+                             "and set main_image_url, gallery and thumbnail_url to them")
+    parser.add_argument('--image-connections', type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"with --fetch-images, pictures downloaded at the same time (default: {DEFAULT_CONNECTIONS})")
+    parser.add_argument('--image-retries', type=int, default=DEFAULT_RETRIES,
+                        help=f"with --fetch-images, retries of a failed or throttled download (default: {DEFAULT_RETRIES})")
+    parser.add_argument('--thumbnail-workers', type=int,
+                        help="with --fetch-images, processes making thumbnails (needs Pillow; default: one per CPU, 0: none)")
+    parser.add_argument('--format', choices=FORMATS, default='json',
+                        help="json: one indented array (default); ndjson: one record per line, written as produced")
+    parser.add_argument('--gzip', action='store_true',
+                        help="gzip-compress the export")
+    parser.add_argument('--output',
+                        help="export path, '-' for stdout (default: import_data_final.json / import_data_final.ndjson[.gz])")
+    parser.add_argument('--manifest', default='import_manifest.json',
+                        help="content-hash manifest of the last export (default: import_manifest.json)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="write only added/changed/removed records to --delta-output instead of the full export")
+    parser.add_argument('--delta-output', default='import_data_delta.json',
+                        help="delta file written in --incremental mode (default: import_data_delta.json)")
+    parser.add_argument('--search-index', default=DEFAULT_INDEX_PATH,
+                        help=f"inverted search index written next to the export (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('--no-search-index', action='store_true',
+                        help="do not write the search index")
+    parser.add_argument('--no-dedup', action='store_true',
+                        help="do not look for near-duplicate products (by default every product is exported with its \"cluster_id\", "
+                             "duplicates also with \"duplicate_of\", and those are not loaded)")
+    parser.add_argument('--dedup-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"title similarity (Jaccard of title tokens) from which two products are duplicates (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--duplicates-report', default=DEFAULT_DUPLICATES_PATH,
+                        help=f"clusters of near-duplicate products found (default: {DEFAULT_DUPLICATES_PATH})")
+    parser.add_argument('--validation-report', default=DEFAULT_REPORT_PATH,
+                        help=f"data-quality report: offending rows per sheet and rule (default: {DEFAULT_REPORT_PATH})")
+    parser.add_argument('--metrics', default=DEFAULT_METRICS_PATH,
+                        help=f"JSON-lines file the run's stage and sheet metrics are appended to (default: {DEFAULT_METRICS_PATH})")
+    parser.add_argument('--profile', action='store_true',
+                        help="run under cProfile and tracemalloc and record the hottest functions and allocations "
+                             "(only this process is profiled: use with --workers 1)")
+    parser.add_argument('--profile-output', default=DEFAULT_PROFILE_PATH,
+                        help=f"raw cProfile stats for --profile, readable with pstats/snakeviz (default: {DEFAULT_PROFILE_PATH})")
+    parser.add_argument('--category-map', default=DEFAULT_MAP_PATH,
+                        help="sheet -> category rules (default: catalog_import/category_map.json)")
+    parser.add_argument('--categories-from', metavar='SQLITE_PATH',
+                        help="emit each product's category_id, resolved against this SQLite database's categories "
+                             "(default: the --slugs-from or --load-db database, if any)")
+    parser.add_argument('--slugs-from', metavar='SQLITE_PATH',
+                        help="treat the product slugs already in this SQLite database as taken "
+                             "(default: the --load-db database, if any)")
+    parser.add_argument('--load-db', metavar='SQLITE_PATH',
+                        help="also load the products into this SQLite database (e.g. database/database.sqlite), "
+                             "in one transaction, instead of running ImportExcelProductsSeeder")
+    args = parser.parse_args(argv)
+    if args.load_db and args.incremental:
+        parser.error("--load-db loads a full export; it cannot be combined with --incremental")
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold must be in (0, 1]")
+    if args.fetch_images and args.no_images:
+        parser.error("--fetch-images downloads the \"images\" that --no-images leaves out")
+    if args.image_connections < 1:
+        parser.error("--image-connections must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    file_path = args.workbook
+    output_path = args.output or default_output_path(args.format, args.gzip)
+    # Keep stdout clean when the export itself goes there
+    log = sys.stderr if output_path == '-' else sys.stdout
+    started = time.perf_counter()
+    metrics = Metrics(args.metrics, profile=args.profile, profile_path=args.profile_output).start()
+
+    # Sheet names and row counts come from the columnar cache when it is fresh;
+    # the workbook is only opened for what the cache does not know yet
+    use_cache = not args.no_cache
+    with metrics.stage('plan'):
+        rules = load_rules(args.category_map)
+        cache = open_cache(file_path) if use_cache else None
+        sheet_names = product_sheet_names(workbook_sheet_names(file_path, use_cache))
+
+        print(f"Processing {len(sheet_names)} sheets with refined mapping...", file=log)
+
+        cached = {s for s in sheet_names if cache is not None and cache.has_sheet(s)}
+        row_counts = {s: cache.row_count(s) for s in cached}
+        for s in sheet_names:
+            if s not in cached:
+                row_counts[s] = max((shared_workbook(file_path)[s].max_row or 1) - 1, 0)
+        close_shared_workbooks()
+
+        # Sheets not cached yet are converted whole by one task, never split
+        chunk_rows = args.chunk_rows if args.workers > 1 else None
+        tasks = plan_tasks(sheet_names, rules, row_counts, chunk_rows, cached if cache is not None else None)
+
+    builder = ManifestBuilder(file_path, load_manifest(args.manifest) if args.incremental else None)
+    added = []
+    changed = []
+    reports = []
+
+    group = not args.no_group_variants
+    plan_options = {"variants": group, "attributes": not args.no_attributes, "category_overrides": rules.category_ids,
+                    "shipping": not args.no_shipping, "images": not args.no_images}
+
+    # Finished tasks are saved as they complete; after a crash or a failed sheet, a rerun only redoes the rest
+    checkpoint = None if args.no_checkpoint else open_checkpoint(file_path, plan_options, resume=not args.no_resume)
+    resumed = sum(checkpoint.has(task) for task in tasks) if checkpoint is not None else 0
+    if resumed:
+        print(f"Resuming: {resumed} of {len(tasks)} task(s) already done", file=log)
+    conn = connect(args.load_db) if args.load_db else None
+    loader = None
+
+    # Every record gets its final, unique slug here, in workbook order, so it does not depend on --workers
+    slugs_db = args.slugs_from or args.load_db
+    slugs = SlugIndex(existing_slugs(slugs_db) if slugs_db else ())
+
+    search = None if args.no_search_index else IndexBuilder()
+    # Duplicates are matched against every earlier record, across sheets
+    dedup = None if args.no_dedup else DuplicateIndex(args.dedup_threshold)
+    images = None
+    if args.fetch_images:
+        images = ImagePipeline(connections=args.image_connections, retries=args.image_retries,
+                               thumbnail_workers=args.thumbnail_workers)
+        if images.thumbnails is None and args.thumbnail_workers != 0:
+            print("Pillow is not installed: pictures are stored without thumbnails", file=log)
+
+    # Slug -> category_id, resolved once per slug so the loaders need no fallback lookups
+    categories_db = args.categories_from or args.slugs_from or args.load_db
+    categories = existing_categories(categories_db) if categories_db else None
+    category_ids = {}
+
+    def export(writer):
+        # Records are written sheet by sheet, in workbook order, as soon as each sheet is done.
+        # 'transform' is the time spent waiting for sheets (read + transform, in the workers if any);
+        # 'export' covers slugs, manifest, search index, writing and loading.
+        results = iter_sheet_results(iter_task_results(file_path, tasks, args.workers, use_cache, plan_options, checkpoint))
+        for report, products in metrics.timed('transform', results):
+            reports.append(report)
+            rows = report.validation.rows if report.validation is not None else None
+            metrics.add('transform', 0, rows)
+            metrics.sheet(report.sheet_name, report.seconds, rows, report.products, report.rss_delta_mb, report.status)
+            if report.status == 'no-title':
+                print(f"Warning: No title column in {report.sheet_name}, skipping.", file=log)
+            elif report.status == 'error':
+                print(f"Error reading sheet {report.sheet_name}: {report.message}", file=log)
+            elif report.status == 'failed':
+                print(f"Failed sheet {report.sheet_name}: {report.message}", file=log)
+
+            if group:
+                with metrics.stage('group', len(products)):
+                    products = group_variants(products)
+
+            if images is not None:
+                with metrics.stage('images', len(products)):
+                    images.resolve(products)
+
+            with metrics.stage('export'):
+                for product in products:
+                    product['slug'] = slugs.claim_name(product['name'])
+
+            if dedup is not None:
+                with metrics.stage('dedup', len(products)):
+                    for product in products:
+                        dedup.mark(product)
+
+            with metrics.stage('export', len(products)):
+                for product in products:
+                    if categories is not None:
+                        slug = product['category_slug']
+                        if slug not in category_ids:
+                            category_ids[slug] = category_id_for(slug, categories, rules.default)
+                        product['category_id'] = category_ids[slug]
+                    status = builder.add(product)
+                    # Duplicates stay in the export (and manifest), marked; the loaders skip them
+                    if search is not None and 'duplicate_of' not in product:
+                        search.add(product)
+                    if loader is not None:
+                        loader.write(product)
+                    if writer is not None:
+                        writer.write(product)
+                    elif status == 'added':
+                        added.append(product)
+                    elif status == 'changed':
+                        changed.append(product)
+                if writer is not None:
+                    writer.flush()
+
+        # Nothing is assembled (no export file, no database commit) unless every sheet is there
+        failed = [r for r in reports if r.status == 'failed']
+        if failed:
+            raise IncompleteImport(failed)
+
+    if args.incremental:
+        export(None)
+        delta = build_delta(builder, added, changed)
+        write_json_atomic(args.delta_output, delta)
+        print(f"Total extracted: {len(builder.records)}", file=log)
+        print(f"Saved {args.delta_output}: {len(delta['added'])} added, "
+              f"{len(delta['changed'])} changed, {len(delta['removed'])} removed", file=log)
+    else:
         try:
-            # Read Sheet (Header=0 based on finding)
-            df = pd.read_excel(xls, sheet_name=sheet_name, header=0)
-            
-            # Normalize Headers
-            df.columns = [str(c).upper().strip() for c in df.columns]
-            
-            # Identify columns dynamically
-            def get_col(candidates):
-                for c in candidates:
-                    if c in df.columns: return c
-                return None
-            
-            title_col = get_col(['TÍTULO', 'TITLE', 'PRODUCT_NAME', 'NAME'])
-            sku_col = get_col(['SKU', 'PRODUCT_NUMBER', 'ID'])
-            brand_col = get_col(['BRAND', 'MARCA', 'MANUFACTURER'])
-            model_col = get_col(['MODEL', 'MODELO'])
-            
-            if not title_col:
-                print(f"Warning: No title column in {sheet_name}, skipping.")
-                continue
-
-            for _, row in df.iterrows():
-                title = row.get(title_col)
-                if pd.isna(title): continue
-                
-                # cleaner title
-                title_clean = str(title).strip()
-                
-                # Skip metadata rows often found in these dumps
-                # If title is literally "Título" or "Title" or "Fixed" or "Attribute"
-                if title_clean.upper() in ['TÍTULO', 'TITLE', 'PRODUCT_NAME', 'NAME', 'FIXED', 'ATTRIBUTE', 'VALUES', 'GROUPS', 'TAGS']:
-                    continue
-                    
-                # Skip if ID or SKU looks like a header
-                current_id = str(row.get('ID', '')).upper()
-                if current_id in ['ID', 'ITEM_ID']: continue
-
-                sku = row.get(sku_col, 'GEN-SKU')
-                brand = row.get(brand_col, 'Genérico')
-                model = row.get(model_col, '')
-                
-                # Construct description from available attributes
-                description = f"<b>{title_clean}</b><br>"
-                if pd.notna(model) and str(model).strip() and str(model).upper() not in ['MODEL', 'MODELO']:
-                    description += f"Modelo: {model}<br>"
-                
-                # Add extra attributes found in row to description
-                # Filter out empty or system columns
-                # Translation map for common technical specs
-                translations = {
-                    'WEIGHT': 'Peso',
-                    'LENGTH': 'Largo',
-                    'HEIGHT': 'Altura',
-                    'WIDTH': 'Ancho',
-                    'DEPTH': 'Profundidad',
-                    'MATERIAL': 'Material',
-                    'COLOR': 'Color',
-                    'SIZE': 'Tamaño',
-                    'CAPACITY': 'Capacidad',
-                    'LINE_CAPACITY': 'Capacidad de línea',
-                    'GEAR_RATIO': 'Relación de transmisión',
-                    'MAX_DRAG': 'Freno Máximo',
-                    'BEARINGS_NUMBER': 'Rodamientos',
-                    'ROD_ACTION': 'Acción',
-                    'ROD_POWER': 'Potencia',
-                    'SECTIONS_NUMBER': 'Secciones',
-                    'LURE_WEIGHT': 'Peso de señuelo',
-                    'MAX_HEIGHT': 'Altura Máxima',
-                    'MAX_WEIGHT_SUPPORTED': 'Peso Máximo Soportado',
-                    'SHOOTING_STICK_TYPE': 'Tipo de soporte',
-                    'IS_WATERPROOF': 'Es impermeable',
-                    'WITH_UV_PROTECTION': 'Con protección UV',
-                    'LENS_COLOR': 'Color del lente',
-                    'FRAME_COLOR': 'Color del marco',
-                    'TEMPLE_COLOR': 'Color de la varilla',
-                    'LENS_MATERIAL': 'Material del lente',
-                    'FRAME_MATERIAL': 'Material del marco'
-                }
-
-                # Ignored columns update
-                ignored_cols = [
-                    'ID', 'FAMILY_ID', 'DOMAIN_ID', 'CATEGORY_ID', 'PARENT_CATEGORY_ID', 
-                    title_col, sku_col, brand_col, model_col,
-                    'CHECK_SUMS', 'VARIATION_ID', 'GTIN', 'SELLER_SKU', 'PRODUCT_NUMBER', 'ITEM_NUMBER',
-                    'MAIN_COLOR', 'COLOR_PRIMARY_COLOR', 'tags', 'eshop_id', 'catalog_product_id'
-                ]
-                
-                specs = []
-                processed_cols = set()
-                
-                # First pass to identify columns to process (avoiding duplicates if logic changes)
-                cols_to_process = [c for c in df.columns if c not in processed_cols]
-                
-                for col in cols_to_process:
-                    col_str = str(col)
-                    col_upper = col_str.upper().strip()
-                    
-                    if col_upper in processed_cols: continue
-                    
-                    # Check if ignored
-                    is_ignored = False
-                    for ignored in ignored_cols:
-                        if ignored.upper() == col_upper:
-                            is_ignored = True
-                            break
-                    if is_ignored: continue
-
-                    # Check if it's a UNIT column (handled with base column)
-                    if col_upper.endswith('_UNIT'): continue
-
-                    if pd.notna(row[col]):
-                        val = str(row[col]).strip()
-                        
-                        # Filter invalid values
-                        if val.upper() in ['FIXED', 'ATTRIBUTE', 'N/A', 'NAN', 'IGNORE', 'MANDATORY', 'OPTIONAL', 'NO APLICA']: continue
-                        
-                        # Look for a unit column
-                        unit_col = None
-                        possible_unit_cols = [col_str + '_UNIT', col_str.replace('WEIGHT', 'WEIGHT_UNIT'), col_str.replace('LENGTH', 'LENGTH_UNIT')]
-                        
-                        unit_val = ""
-                        for uc in possible_unit_cols:
-                            if uc in df.columns and pd.notna(row[uc]):
-                                u_val = str(row[uc]).strip()
-                                if u_val and u_val.upper() not in ['N/A', 'NAN']:
-                                    unit_val = u_val
-                                    processed_cols.add(uc.upper()) # Mark unit as processed
-                                    break
-                        
-                        # Format final string
-                        display_val = f"{val} {unit_val}".strip()
-                        
-                        # Translate key
-                        display_key = translations.get(col_upper, col.title().replace('_', ' '))
-                        
-                        specs.append(f"{display_key}: {display_val}")
-                        processed_cols.add(col_upper)
-                
-                if specs:
-                    description += "<ul>" + "".join([f"<li>{s}</li>" for s in specs[:15]]) + "</ul>" # Limit specs
-                
-                products_list.append({
-                    "name": title_clean,
-                    "category_slug": cat_slug, 
-                    "brand_name": str(brand).strip() if pd.notna(brand) and str(brand).upper() not in ['BRAND', 'MARCA'] else "Genérico",
-                    "sku": str(sku).strip() if pd.notna(sku) else None,
-                    "description": description,
-                    "sheet_source": sheet_name
-                })
-                
-        except Exception as e:
-            print(f"Error reading sheet {sheet_name}: {e}")
-
-    print(f"Total extracted: {len(products_list)}")
-    
-    with open('import_data_final.json', 'w', encoding='utf-8') as f:
-        json.dump(products_list, f, indent=2, ensure_ascii=False)
-        
-    print("Saved import_data_final.json")
-
-except Exception as e:
-    print(f"Global Error: {e}")
+            # One transaction for the whole load: nothing is committed unless the export completes
+            with ExportFile(output_path, args.format, args.gzip) as writer:
+                if conn is not None:
+                    conn.execute("BEGIN")
+                    loader = BulkLoader(conn)
+                export(writer)
+                if loader is not None:
+                    loader.close()
+            if conn is not None:
+                conn.commit()
+        finally:
+            if conn is not None:
+                conn.close()
+        print(f"Total extracted: {writer.count}", file=log)
+        if group:
+            print(f"  ({sum(r.products for r in reports)} rows, variations grouped by FAMILY_ID)", file=log)
+        print(f"Saved {output_path}", file=log)
+        if loader is not None:
+            print(f"Loaded {loader.imported} products into {args.load_db} "
+                  f"({loader.brands_created} new brands, {len(loader.skipped)} skipped without category, "
+                  f"{loader.duplicates} duplicates skipped)", file=log)
+
+    if images is not None:
+        images.close()
+        print(f"Pictures: {images.fetched} downloaded ({images.stored} new files, {images.thumbnailed} thumbnails), "
+              f"{images.reused} already stored, {images.failed} failed", file=log)
+
+    # Only replace the manifest once the export it describes is on disk
+    with metrics.stage('manifest', len(builder.records)):
+        write_json_atomic(args.manifest, builder.manifest())
+
+    # Row lists can be long: one line per sheet entry is enough
+    with metrics.stage('validation'):
+        report = build_report(file_path, reports)
+        write_json_atomic(args.validation_report, report, indent=None)
+    flagged = ', '.join(f"{report['totals'][rule.name]} {rule.name}" for rule in RULES if report['totals'][rule.name])
+    print(f"Saved {args.validation_report}: {flagged or 'no issues'}", file=log)
+
+    if dedup is not None:
+        with metrics.stage('duplicates_report'):
+            duplicates = dedup.report(file_path)
+            write_json_atomic(args.duplicates_report, duplicates)
+        print(f"Saved {args.duplicates_report}: {duplicates['totals']['duplicates']} duplicate(s) "
+              f"in {duplicates['totals']['clusters']} cluster(s)", file=log)
+
+    # The index always covers the whole catalog, in --incremental mode too
+    if search is not None:
+        with metrics.stage('search_index', len(search.documents)):
+            search.write(args.search_index)
+        print(f"Saved {args.search_index}: {len(search.documents)} products", file=log)
+
+    # Per-sheet wall time (summed over the sheet's tasks)
+    print(f"\nTimings ({args.workers} worker{'s' if args.workers != 1 else ''}):", file=log)
+    for report in sorted(reports, key=lambda r: -r.seconds):
+        print(f"  {report.sheet_name:<40} {report.products:>6} rows {report.tasks:>3} task(s) {report.seconds:8.3f}s", file=log)
+    print(f"  {'Total wall time':<40} {time.perf_counter() - started:34.3f}s", file=log)
+
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    run = metrics.write(source=file_path, workers=args.workers, sheets=len(reports),
+                        rows=sum(r.validation.rows for r in reports if r.validation is not None),
+                        products=len(builder.records))
+    print(f"\nAppended run {run['run_id']} metrics to {args.metrics} (peak RSS {run['peak_rss_mb']} MiB)", file=log)
+    if args.profile:
+        print(f"Hottest functions (cumulative time; full stats in {args.profile_output}):", file=log)
+        for record in metrics.hottest():
+            print(f"  {record['cumulative_seconds']:8.3f}s {record['calls']:>9} calls  "
+                  f"{record['function']} ({os.path.basename(record['file'])}:{record['line']})", file=log)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except IncompleteImport as e:
+        print(f"Import incomplete, nothing written: {e}", file=sys.stderr)
+        print("Finished sheets are checkpointed: run again to retry only the failed ones.", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Global Error: {e}", file=sys.stderr)
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from catalog_import.loader import DEFAULT_BATCH_SIZE, DEFAULT_DATABASE, apply_patch, load_records
+from catalog_import.output import read_export
+
+# Same lookup order as ImportExcelProductsSeeder::records()
+EXPORT_FILES = ['import_data_final.ndjson.gz', 'import_data_final.ndjson', 'import_data_final.json']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk-load the generator's export into the app's SQLite database.")
+    parser.add_argument('export', nargs='?',
+                        help="export to load (default: the first of " + ', '.join(EXPORT_FILES) + " that exists)")
+    parser.add_argument('--database', default=DEFAULT_DATABASE,
+                        help=f"SQLite database (default: {DEFAULT_DATABASE})")
+    parser.add_argument('--patch', metavar='PATCH_PATH',
+                        help="apply a patch (python -m catalog_import diff) or --incremental delta instead of loading an export")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"records per batch of INSERTs (default: {DEFAULT_BATCH_SIZE})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.patch:
+        started = time.perf_counter()
+        with open(args.patch, encoding='utf-8') as f:
+            patch = json.load(f)
+        loader = apply_patch(args.database, patch, args.batch_size)
+        for name in loader.skipped:
+            print(f"Skipping product {name} - No valid category found.")
+        print(f"Applied {args.patch} to {args.database}: {loader.imported} inserted, {loader.updated} updated, "
+              f"{loader.deactivated} deactivated ({loader.brands_created} new brands, {loader.duplicates} duplicates skipped) "
+              f"in {time.perf_counter() - started:.2f}s")
+        return
+
+    path = args.export or next((f for f in EXPORT_FILES if os.path.exists(f)), None)
+    if path is None:
+        print("No import data found (" + ', '.join(EXPORT_FILES) + ")", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    loader = load_records(args.database, read_export(path), args.batch_size)
+
+    for name in loader.skipped:
+        print(f"Skipping product {name} - No valid category found.")
+    print(f"Loaded {loader.imported} products from {path} into {args.database} "
+          f"({loader.brands_created} new brands, {loader.duplicates} duplicates skipped) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from catalog_import.search import DEFAULT_INDEX_PATH, IndexBuilder, SearchIndex
+from catalog_import.synthetic import ADJECTIVES, BRANDS, NOUNS, synthetic_products
+from catalog_import.text import fold, tokenize
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query the catalog search index written by generate_import_final.py.")
+    parser.add_argument('query', nargs='?', help="search terms (accents and case are ignored)")
+    parser.add_argument('--category', help="only products of this category slug")
+    parser.add_argument('--limit', type=int, default=20, help="maximum results (default: 20)")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help=f"index file (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('--json', action='store_true',
+                        help="print the results as a JSON array of {\"slug\", \"score\"}, best first (for the app)")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="time queries on synthetic catalogs of --sizes products against a LIKE-style scan")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated catalog sizes for --benchmark (default: 1000,10000,100000)")
+    parser.add_argument('--queries', type=int, default=200, help="queries per size for --benchmark (default: 200)")
+    args = parser.parse_args()
+    if not args.benchmark and not args.query:
+        parser.error("a query is required (or --benchmark)")
+    return args
+
+
+def scan(records, query, limit):
+    """What a LIKE '%term%' query over every product name amounts to, for comparison."""
+    tokens = tokenize(query)
+    return [r['slug'] for r in records if all(t in fold(r['name']) for t in tokens)][:limit]
+
+
+def timed(fn, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def benchmark(args):
+    rng = random.Random(0)
+    brands = [b for b in BRANDS if b]
+    queries = [
+        rng.choice([rng.choice(NOUNS), f"{rng.choice(NOUNS)} {rng.choice(brands)}", f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)[:4]}"])
+        for _ in range(args.queries)
+    ]
+
+    print(f"{'products':>10} {'index':>10} {'build':>8} {'index p50':>10} {'p95':>8} {'scan p50':>10} {'p95':>8}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        records = list(synthetic_products(size))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index.bin')
+            started = time.perf_counter()
+            builder = IndexBuilder()
+            for record in records:
+                builder.add(record)
+            builder.write(path)
+            build = time.perf_counter() - started
+
+            with SearchIndex(path) as index:
+                index_p50, index_p95 = timed(lambda q: index.search(q, limit=20), queries)
+            scan_p50, scan_p95 = timed(lambda q: scan(records, q, 20), queries[:max(len(queries) // 10, 1)])
+            print(f"{size:>10} {os.path.getsize(path) / 1024:>8.0f}KB {build:>7.2f}s "
+                  f"{index_p50:>8.3f}ms {index_p95:>6.3f}ms {scan_p50:>8.2f}ms {scan_p95:>6.2f}ms")
+
+
+def main():
+    args = parse_args()
+    if args.benchmark:
+        benchmark(args)
+        return
+
+    if not os.path.exists(args.index):
+        print(f"No search index at {args.index}; run generate_import_final.py first.", file=sys.stderr)
+        sys.exit(1)
+    with SearchIndex(args.index) as index:
+        started = time.perf_counter()
+        results = index.search(args.query, args.category, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        if args.json:
+            json.dump([{"slug": slug, "score": score} for slug, score in results], sys.stdout)
+            print()
+            return
+        for slug, score in results:
+            print(f"{score:>4}  {slug}")
+        print(f"{len(results)} result(s) in {elapsed:.2f}ms ({index.documents} products indexed)")
+
+
+if __name__ == '__main__':
+    main()
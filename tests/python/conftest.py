@@ -0,0 +1,55 @@
+"""pytest setup for the catalog import tests: python -m pytest tests/python"""
+import itertools
+import os
+import sqlite3
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# The tables the loaders write, as the migrations create them on SQLite
+SCHEMA = """
+CREATE TABLE categories (id INTEGER PRIMARY KEY AUTOINCREMENT, parent_id INTEGER, name VARCHAR NOT NULL,
+    slug VARCHAR NOT NULL UNIQUE, description TEXT, display_order INTEGER DEFAULT 0, image_url VARCHAR,
+    created_at DATETIME, updated_at DATETIME);
+CREATE TABLE brands (id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR NOT NULL, slug VARCHAR NOT NULL UNIQUE,
+    logo_url VARCHAR, website VARCHAR, created_at DATETIME, updated_at DATETIME);
+CREATE TABLE shipping_classes (id INTEGER PRIMARY KEY AUTOINCREMENT, code VARCHAR NOT NULL UNIQUE, name VARCHAR NOT NULL,
+    description TEXT, allows_home_delivery TINYINT(1) DEFAULT 1, requires_special_carrier TINYINT(1) DEFAULT 0,
+    created_at DATETIME, updated_at DATETIME);
+CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, category_id INTEGER NOT NULL REFERENCES categories(id),
+    brand_id INTEGER REFERENCES brands(id), shipping_class_id INTEGER NOT NULL REFERENCES shipping_classes(id),
+    name VARCHAR NOT NULL, slug VARCHAR NOT NULL UNIQUE, description TEXT, short_description TEXT,
+    is_active TINYINT(1) DEFAULT 1, is_restricted TINYINT(1) DEFAULT 0, age_verification_required TINYINT(1) DEFAULT 0,
+    base_price NUMERIC NOT NULL, main_image_url VARCHAR, gallery TEXT, thumbnail_url VARCHAR, created_at DATETIME, updated_at DATETIME);
+CREATE TABLE product_variants (id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE, name VARCHAR,
+    sku VARCHAR NOT NULL UNIQUE, source_sku VARCHAR, import_key VARCHAR, variant_attributes TEXT, price NUMERIC NOT NULL,
+    compare_at_price NUMERIC, stock_quantity INTEGER DEFAULT 0, weight_kg NUMERIC, length_cm NUMERIC, width_cm NUMERIC,
+    height_cm NUMERIC, volumetric_weight_kg NUMERIC, is_active TINYINT(1) DEFAULT 1, created_at DATETIME, updated_at DATETIME);
+CREATE INDEX product_variants_source_sku_index ON product_variants (source_sku);
+CREATE INDEX product_variants_import_key_index ON product_variants (import_key);
+CREATE TABLE product_attributes (id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE, attributes TEXT NOT NULL,
+    created_at DATETIME, updated_at DATETIME);
+INSERT INTO shipping_classes (code, name) VALUES ('NORMAL', 'Envío Normal'), ('OVERSIZED', 'Sobredimensionado');
+INSERT INTO categories (name, slug) VALUES ('Outdoor', 'outdoor'), ('Cuchillos', 'cuchillos'), ('Señuelos', 'senuelos');
+"""
+
+_databases = itertools.count()
+
+
+@pytest.fixture
+def database():
+    """A fresh in-memory SQLite database with the schema, as a URI loader.connect() opens.
+
+    It lives as long as one connection to it is open: this fixture's.
+    """
+    uri = f"file:catalog_test_{next(_databases)}?mode=memory&cache=shared"
+    keeper = sqlite3.connect(uri, uri=True)
+    keeper.executescript(SCHEMA)
+    yield uri
+    keeper.close()
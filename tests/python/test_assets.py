@@ -0,0 +1,179 @@
+import json
+import struct
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from catalog_import import assets
+from catalog_import.assets import AssetStore, ImagePipeline, image_type, sniff_type
+
+
+def png(color=b'\x00\x00\x00'):
+    """A valid 1x1 RGB PNG."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(b'\x00' + color)) + chunk(b'IEND', b''))
+
+
+PICTURE = png()
+OTHER_PICTURE = png(b'\xff\x00\x00')
+
+# path -> list of (status, content type, body) answers, the last one repeated
+ROUTES = {
+    '/a.png': [(200, 'image/png', PICTURE)],
+    '/same-as-a.png': [(200, 'image/png', PICTURE)],
+    '/b.png': [(200, 'image/png', OTHER_PICTURE)],
+    '/flaky.png': [(503, 'text/plain', b'busy'), (429, 'text/plain', b'slow down'), (200, 'image/png', PICTURE)],
+    '/down.png': [(500, 'text/plain', b'error')],
+    '/gone.png': [(404, 'text/html', b'<html>not found</html>')],
+    '/login.jpg': [(200, 'text/html; charset=utf-8', b'<html>login</html>')],
+    '/fake.jpg': [(200, 'image/jpeg', b'<html>not really</html>')],
+    '/mislabeled': [(200, 'image/jpeg', PICTURE)],
+    '/moved.png': [(302, 'text/plain', b'')],
+    '/to-file.png': [(302, 'text/plain', b'')],
+}
+REDIRECTS = {'/moved.png': '/a.png', '/to-file.png': 'file:///etc/passwd'}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        hits = self.server.hits
+        hits[self.path] = hits.get(self.path, 0) + 1
+        answers = ROUTES[self.path]
+        status, content_type, body = answers[min(hits[self.path], len(answers)) - 1]
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if self.path in REDIRECTS:
+            self.send_header('Location', REDIRECTS[self.path])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.hits = {}
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(assets, 'BACKOFF_SECONDS', 0.01)
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def resolve(tmp_path, products, retries=2):
+    store = AssetStore(str(tmp_path / 'storage'), str(tmp_path / 'index.json'), '/storage/products/import')
+    pipeline = ImagePipeline(store, connections=4, retries=retries, thumbnail_workers=0, timeout=5)
+    try:
+        pipeline.resolve(products)
+    finally:
+        pipeline.close()
+    return pipeline
+
+
+def test_magic_bytes():
+    assert sniff_type(PICTURE) == 'image/png'
+    assert sniff_type(b'\xff\xd8\xff\xe0rest') == 'image/jpeg'
+    assert sniff_type(b'GIF89a...') == 'image/gif'
+    assert sniff_type(b'RIFF\x00\x00\x00\x00WEBPVP8 ') == 'image/webp'
+    assert sniff_type(b'\x00\x00\x00\x1cftypavif') == 'image/avif'
+    assert sniff_type(b'<html>') is None
+    assert image_type(PICTURE) == 'image/png'
+    assert image_type(b'<html>') is None
+
+
+def test_retries_429_and_5xx_then_stores(server, tmp_path):
+    product = {"images": [url(server, '/flaky.png')]}
+    pipeline = resolve(tmp_path, [product])
+    assert server.hits['/flaky.png'] == 3
+    assert (pipeline.fetched, pipeline.failed) == (1, 0)
+    assert product['main_image_url'].endswith('.png')
+
+
+def test_persistent_5xx_is_not_remembered(server, tmp_path):
+    product = {"images": [url(server, '/down.png')]}
+    pipeline = resolve(tmp_path, [product], retries=2)
+    assert server.hits['/down.png'] == 3
+    assert pipeline.failed == 1
+    assert 'main_image_url' not in product
+    # Transient: not in the index, so tried again next run
+    assert not (tmp_path / 'index.json').exists()
+
+
+def test_same_content_is_stored_once(server, tmp_path):
+    products = [{"images": [url(server, '/a.png'), url(server, '/b.png')]}, {"images": [url(server, '/same-as-a.png')]}]
+    pipeline = resolve(tmp_path, products)
+    assert (pipeline.fetched, pipeline.stored) == (3, 2)
+    assert products[1]['main_image_url'] == products[0]['main_image_url']
+    assert products[0]['gallery'] != [products[0]['main_image_url']]
+    assert len(list((tmp_path / 'storage').iterdir())) == 2
+
+
+def test_index_is_reused_by_later_runs(server, tmp_path):
+    first = [{"images": [url(server, '/a.png'), url(server, '/gone.png')]}]
+    resolve(tmp_path, first)
+    hits = dict(server.hits)
+
+    again = [{"images": [url(server, '/a.png'), url(server, '/gone.png')]}]
+    pipeline = resolve(tmp_path, again)
+    assert server.hits == hits
+    assert pipeline.reused == 2
+    assert again[0]['main_image_url'] == first[0]['main_image_url']
+
+    # A stored file removed since is fetched again
+    (tmp_path / 'storage' / first[0]['main_image_url'].rsplit('/', 1)[1]).unlink()
+    resolve(tmp_path, [{"images": [url(server, '/a.png')]}])
+    assert server.hits['/a.png'] == hits['/a.png'] + 1
+
+
+def test_non_images_are_rejected_and_remembered(server, tmp_path):
+    products = [{"images": [url(server, '/login.jpg'), url(server, '/fake.jpg'), url(server, '/gone.png')]}]
+    pipeline = resolve(tmp_path, products)
+    assert pipeline.failed == 3
+    assert 'main_image_url' not in products[0]
+    assert not (tmp_path / 'storage').exists()
+
+    index = json.loads((tmp_path / 'index.json').read_text())
+    assert index[url(server, '/login.jpg')] == {"file": None, "status": 200, "reason": "not an image (text/html)"}
+    assert index[url(server, '/fake.jpg')] == {"file": None, "status": 200, "reason": "unreadable image/jpeg"}
+    assert index[url(server, '/gone.png')] == {"file": None, "status": 404}
+    # Not retried on the next run
+    hits = dict(server.hits)
+    resolve(tmp_path, [{"images": [url(server, '/login.jpg'), url(server, '/fake.jpg')]}])
+    assert server.hits == hits
+
+
+def test_extension_follows_the_bytes(server, tmp_path):
+    product = {"images": [url(server, '/mislabeled')]}
+    resolve(tmp_path, [product])
+    assert product['main_image_url'].endswith('.png')
+
+
+def test_redirects_are_followed_to_http_urls_only(server, tmp_path):
+    products = [{"images": [url(server, '/moved.png')]}, {"images": [url(server, '/to-file.png')]}]
+    pipeline = resolve(tmp_path, products)
+    assert server.hits['/a.png'] == 1
+    assert products[0]['main_image_url'].endswith('.png')
+    assert 'main_image_url' not in products[1]
+    # Refused once, not retried
+    assert (server.hits['/to-file.png'], pipeline.failed) == (1, 1)
+    index = json.loads((tmp_path / 'index.json').read_text())
+    assert index[url(server, '/to-file.png')] == {
+        "file": None, "status": 302, "reason": "redirect to a non-http(s) URL (file:///etc/passwd)"}
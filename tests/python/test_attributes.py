@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from catalog_import.attributes import merge_attributes
+from catalog_import.transform import build_column_plan, transform_sheet
+
+COLUMNS = ['TITLE', 'SKU', 'BRAND', 'MODEL', 'WEIGHT', 'WEIGHT_UNIT', 'BEAM_DISTANCE', 'BEAM_DISTANCE_UNIT',
+           'MAX_PRESSURE', 'MAX_PRESSURE_UNIT', 'BEARINGS_NUMBER', 'IS_WATERPROOF', 'COLOR']
+
+
+def attributes(rows):
+    df = pd.DataFrame(rows, columns=COLUMNS, dtype=object)
+    plan = build_column_plan(COLUMNS, attributes=True)
+    return [p['attributes'] for p in transform_sheet(df, plan, 'Linternas', 'outdoor')]
+
+
+def test_measures_are_converted_to_the_canonical_unit():
+    assert attributes([
+        ['Linterna A', 'L-1', 'Nitecore', 'A1', '12,5', 'oz', '0.5', 'km', '30', 'PSI', '5', 'Sí', 'Negro'],
+        ['Linterna B', 'L-2', 'Nitecore', 'B1', '200', 'g', '500', 'm', np.nan, np.nan, 'N/A', 'No', ' Rojo '],
+        ['Linterna C', 'L-3', 'Nitecore', 'C1', '3', 'lb', '40', np.nan, '2', 'bar', 'FIXED', 'x', np.nan],
+    ]) == [
+        # oz/lb to grams rounded; BEAM_DISTANCE is kept in meters; units we do not convert keep their name
+        {'weight_g': 354.369, 'beam_distance_m': 500, 'max_pressure_psi': 30, 'bearings_number': 5,
+         'is_waterproof': True, 'color': 'Negro'},
+        {'weight_g': 200, 'beam_distance_m': 500, 'is_waterproof': False, 'color': 'Rojo'},
+        # Without a unit the number keeps the plain key; placeholders are left out
+        {'weight_g': 1360.7771, 'beam_distance': 40, 'max_pressure_bar': 2, 'is_waterproof': 'x'},
+    ]
+
+
+def test_merge_attributes():
+    assert merge_attributes([
+        {'weight_g': 12, 'color': 'Rojo'},
+        {'weight_g': 12, 'color': 'Azul', 'line_diameter_mm': 0.3},
+        {'color': 'Rojo'},
+    ]) == {'weight_g': 12, 'color': ['Rojo', 'Azul'], 'line_diameter_mm': 0.3}
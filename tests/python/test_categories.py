@@ -0,0 +1,56 @@
+import json
+
+import pandas as pd
+
+from catalog_import.categories import load_rules
+from catalog_import.text import fold, normalize_name
+from catalog_import.transform import build_column_plan, transform_sheet
+
+CATEGORY_MAP = {
+    "default": "outdoor",
+    "sheets": {"Cuchillos tacticos y deportivos": "cuchillos", "Equipamiento para camping y ...": "equipamiento-outdoor"},
+    "keywords": {"pesca": "pesca-deportiva"},
+    "category_ids": {"MLC440455": "cuchillos-outdoor"},
+}
+
+
+def write_rules(tmp_path, data=CATEGORY_MAP):
+    path = tmp_path / 'category_map.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return load_rules(str(path))
+
+
+def test_fold_and_normalize_name():
+    assert fold('Señuelo Rápido') == 'senuelo rapido'
+    assert normalize_name('  Cuchillos   TÁCTICOS ') == 'cuchillos tacticos'
+
+
+def test_resolve_exact_truncated_keyword_default(tmp_path):
+    rules = write_rules(tmp_path)
+    assert rules.resolve('Cuchillos tácticos y deportivos') == 'cuchillos'
+    assert rules.resolve('Equipamiento para camping y pesca') == 'equipamiento-outdoor'
+    assert rules.resolve('Boyas de pesca') == 'pesca-deportiva'
+    assert rules.resolve('Maletas') == 'outdoor'
+    assert 'cuchillos-outdoor' in rules.slugs()
+
+
+def test_category_id_overrides_the_sheet_category_per_row(tmp_path):
+    rules = write_rules(tmp_path)
+    df = pd.DataFrame({
+        'ID': ['MLC1', 'MLC2', 'MLC3'],
+        'SKU': ['A-1', 'A-2', 'A-3'],
+        'CATEGORY_ID': ['MLC416695', 'MLC440455', None],
+        'TITLE': ['Cuchillo Táctico', 'Cuchillo de Buceo', 'Cuchillo sin categoría'],
+        'BRAND': ['Mora', 'Cressi', 'Mora'],
+        'MODEL': ['Pro', 'Deep', None],
+    })
+    plan = build_column_plan(df.columns, category_overrides=rules.category_ids)
+    sheet_name = 'Cuchillos tacticos y deportivos'
+    products = transform_sheet(df, plan, sheet_name, rules.resolve(sheet_name))
+    assert [p['category_slug'] for p in products] == ['cuchillos', 'cuchillos-outdoor', 'cuchillos']
+
+
+def test_overrides_need_a_category_id_column(tmp_path):
+    rules = write_rules(tmp_path)
+    plan = build_column_plan(['SKU', 'TITLE', 'BRAND', 'MODEL'], category_overrides=rules.category_ids)
+    assert plan.category_overrides is None
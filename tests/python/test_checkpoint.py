@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from catalog_import import pipeline
+from catalog_import.categories import load_rules
+from catalog_import.checkpoint import Checkpoint, IncompleteImport
+from catalog_import.pipeline import TaskResult, iter_task_results, plan_tasks
+from catalog_import.watch import load_generator
+from conftest import REPO_ROOT
+from test_merge import PLAN_OPTIONS, write_workbook
+
+SHEETS = {
+    'Senuelos de pesca': [['', 'MLC1', 'SKU-1', '', 'Señuelo X-Rap', '', 'Rapala', 'X1']],
+    'Cuchillos': [['', 'MLC2', 'SKU-2', '', 'Cuchillo Mora', '', 'Morakniv', 'M1']],
+}
+
+
+def workbook(tmp_path):
+    return write_workbook(tmp_path / 'catalogo.xlsx', SHEETS['Senuelos de pesca'], more_sheets={'Cuchillos': SHEETS['Cuchillos']})
+
+
+def fail_sheet(sheet_name, run_task=pipeline.run_task):
+    """A run_task that fails the tasks of sheet_name and runs the others."""
+    def run(path, task, *args):
+        if task.sheet_name == sheet_name:
+            return TaskResult(task, 'failed', [], 0.0, 'RuntimeError: interrupted')
+        return run_task(path, task, *args)
+    return run
+
+
+def test_finished_tasks_are_loaded_instead_of_run(tmp_path, monkeypatch):
+    path = workbook(tmp_path)
+    tasks = plan_tasks(list(SHEETS), load_rules(), {name: 5 for name in SHEETS})
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint'))
+
+    monkeypatch.setattr(pipeline, 'run_task', fail_sheet('Cuchillos'))
+    first = list(iter_task_results(path, tasks, use_cache=False, plan_options=PLAN_OPTIONS, checkpoint=checkpoint))
+    assert [r.status for r in first] == ['ok', 'failed']
+    # Failed tasks are not saved, so they are retried
+    assert [checkpoint.has(task) for task in tasks] == [True, False]
+
+    # The saved task is loaded, not run again; the failed one is retried
+    monkeypatch.setattr(pipeline, 'run_task', fail_sheet('Senuelos de pesca'))
+    second = list(iter_task_results(path, tasks, use_cache=False, plan_options=PLAN_OPTIONS, checkpoint=checkpoint))
+    assert [r.status for r in second] == ['ok', 'ok']
+    assert second[0].products == first[0].products
+
+    # A checkpoint of the same sheet position for another category is not reused
+    assert checkpoint.load(tasks[0]._replace(cat_slug='outdoor')) is None
+
+
+def test_generator_resumes_a_failed_import(tmp_path, monkeypatch):
+    path = workbook(tmp_path)
+    monkeypatch.setattr('catalog_import.checkpoint.CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+    generate = load_generator(os.path.join(REPO_ROOT, 'generate_import_final.py'))
+    output = tmp_path / 'import_data_final.json'
+    argv = ['--workbook', path, '--output', str(output), '--no-cache', '--manifest', str(tmp_path / 'manifest.json'),
+            '--no-search-index', '--duplicates-report', str(tmp_path / 'duplicates.json'),
+            '--validation-report', str(tmp_path / 'validation.json'), '--metrics', str(tmp_path / 'metrics.jsonl')]
+
+    run_task = pipeline.run_task
+    monkeypatch.setattr(pipeline, 'run_task', fail_sheet('Cuchillos', run_task))
+    with pytest.raises(IncompleteImport):
+        generate(argv)
+    assert not output.exists()
+    assert len(os.listdir(tmp_path / 'checkpoints')) == 1
+
+    # --no-resume runs the finished sheet again
+    monkeypatch.setattr(pipeline, 'run_task', fail_sheet('Senuelos de pesca', run_task))
+    with pytest.raises(IncompleteImport):
+        generate(argv + ['--no-resume'])
+
+    # Only the failed sheet runs again
+    monkeypatch.setattr(pipeline, 'run_task', fail_sheet('Cuchillos', run_task))
+    generate(argv)
+    with open(output, encoding='utf-8') as f:
+        assert [r['name'] for r in json.load(f)] == ['Señuelo X-Rap', 'Cuchillo Mora']
+    # Removed once the export is complete
+    assert os.listdir(tmp_path / 'checkpoints') == []
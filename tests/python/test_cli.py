@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from catalog_import.cli import main
+from test_merge import write_workbook
+
+ROWS = [['', 'MLC1', 'SKU-1', '', 'Señuelo X-Rap', '', 'Rapala', 'X1']]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    return write_workbook(tmp_path / 'catalogo.xlsx', ROWS, more_sheets={'Ayuda': []})
+
+
+def run_json(capsys, *argv):
+    main(list(argv) + ['--json'])
+    return json.loads(capsys.readouterr().out)
+
+
+def test_sheets(workbook, capsys):
+    assert run_json(capsys, '--workbook', workbook, 'sheets') == ['Senuelos de pesca']
+    assert [s['name'] for s in run_json(capsys, '--workbook', workbook, 'sheets', '--all')] == ['Senuelos de pesca', 'Ayuda']
+
+
+def test_header_columns_and_profile(workbook, capsys):
+    header = run_json(capsys, '--workbook', workbook, 'header', 'Senuelos de pesca', '--rows', '4')
+    assert header['header_row'] == 0 and len(header['rows']) == 4
+
+    schema = run_json(capsys, '--workbook', workbook, 'columns', 'Senuelos de pesca')
+    assert schema['header_row'] == 0
+    assert (schema['aliases']['sku'], schema['aliases']['title'], schema['aliases']['item_id']) == ('SKU', 'TITLE', 'ID')
+
+    [profile] = run_json(capsys, '--workbook', workbook, 'profile', '--no-cache')
+    # The marker, title and label rows are data rows to the workbook
+    assert (profile['sheet'], profile['rows'], profile['filled']['sku']) == ('Senuelos de pesca', 4, 3)
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['columns', 'Nope'], "Nope"),
+    # No price or stock column: nothing to sync
+    (['sync', '--dry-run'], "no sheet of"),
+])
+def test_errors_exit_with_status_1(workbook, capsys, argv, message):
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--workbook', workbook] + argv)
+    assert exit_info.value.code == 1
+    assert message in capsys.readouterr().err
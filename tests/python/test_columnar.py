@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from catalog_import.columnar import ColumnarCache
+from catalog_import.reader import open_workbook, sheet_frames
+from test_reader import read_sheet, write_sheet
+
+pytest.importorskip('pyarrow')
+
+
+def cached_sheet(tmp_path, path):
+    cache = ColumnarCache(path, root=str(tmp_path / 'cache'))
+    if not cache.has_sheet('Senuelos de pesca'):
+        cache.build_sheet(open_workbook(path)['Senuelos de pesca'], 'Senuelos de pesca')
+    return cache
+
+
+def frame(frames):
+    # The cache keeps cells as text, which is how the transform reads them
+    return pd.concat(frames).map(lambda v: v if pd.isna(v) else str(v))
+
+
+def test_cache_serves_the_frames_the_reader_builds(tmp_path):
+    path = write_sheet(tmp_path / 'catalogo.xlsx')
+    cache = cached_sheet(tmp_path, path)
+    assert cache.row_count('Senuelos de pesca') == 4
+
+    columns, frames = cache.sheet_frames('Senuelos de pesca', chunk_size=3)
+    expected_columns, expected = sheet_frames(read_sheet(path))
+    assert columns == expected_columns
+    pd.testing.assert_frame_equal(frame(frames), frame(expected))
+
+    # Excel rows 4-5 (the sheet has a blank row 3)
+    _, frames = cache.sheet_frames('Senuelos de pesca', row_range=(4, 5))
+    assert frame(frames)['SKU'].tolist() == ['CU-1', 'CU-2']
+    assert [r['SKU'] for r in cache.iter_records('Senuelos de pesca')] == ['XR-1', 'CU-1', 'CU-2', '101']
+
+
+def test_cache_follows_the_workbook_content(tmp_path, monkeypatch):
+    path = write_sheet(tmp_path / 'catalogo.xlsx')
+    cache = cached_sheet(tmp_path, path)
+    cache.save_sheet_names(['Senuelos de pesca'])
+
+    # Same file: same directory, without hashing it again
+    with monkeypatch.context() as m:
+        m.setattr('catalog_import.columnar.workbook_hash', None)
+        assert ColumnarCache(path, root=str(tmp_path / 'cache')).dir == cache.dir
+        assert ColumnarCache(path, root=str(tmp_path / 'cache')).sheet_names() == ['Senuelos de pesca']
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    with open(path, 'ab') as f:
+        f.write(b'\0')
+    changed = ColumnarCache(path, root=str(tmp_path / 'cache'))
+    assert changed.dir != cache.dir
+    assert not changed.has_sheet('Senuelos de pesca') and changed.sheet_names() is None
+
+    # Restored: hashed again, back to the first directory
+    with open(path, 'wb') as f:
+        f.write(content)
+    assert ColumnarCache(path, root=str(tmp_path / 'cache')).dir == cache.dir
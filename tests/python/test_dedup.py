@@ -0,0 +1,68 @@
+import pytest
+
+from catalog_import.dedup import DuplicateIndex, jaccard
+
+
+def record(name, slug, brand='Rapala', category='senuelos'):
+    return {"name": name, "slug": slug, "brand_name": brand, "category_slug": category, "import_key": slug}
+
+
+def add_all(index, records):
+    return [index.add(r) for r in records]
+
+
+def test_jaccard():
+    assert jaccard({'a', 'b'}, {'a', 'b'}) == 1
+    assert jaccard({'a', 'b', 'c', 'd'}, {'a', 'b', 'c', 'e'}) == 3 / 5
+
+
+def test_threshold_is_inclusive():
+    # 4 of 5 distinct tokens shared: similarity exactly 0.8
+    records = [record('Señuelo Paseante Flotante Dorado', 'a'), record('Señuelo Paseante Flotante Dorado Brillante', 'b')]
+    assert add_all(DuplicateIndex(0.8), records) == [None, 'a']
+    assert add_all(DuplicateIndex(0.81), records) == [None, None]
+
+
+def test_stopwords_and_accents_do_not_count():
+    records = [record('Cuchara para Trolling Plateada', 'a'), record('cuchara trolling PLATEADA', 'b')]
+    assert add_all(DuplicateIndex(1.0), records) == [None, 'a']
+
+
+def test_blocks_by_brand_and_size_tokens():
+    records = [
+        record('Señuelo Paseante Flotante', 'a'),
+        record('Señuelo Paseante Flotante', 'other-brand', brand='Yo-Zuri'),
+        record('Señuelo Paseante Flotante 10cm', 'sized'),
+        record('Señuelo Paseante Flotante 12cm', 'other-size'),
+    ]
+    assert add_all(DuplicateIndex(0.5), records) == [None, None, None, None]
+
+
+def test_placeholder_brand_blocks_by_category():
+    records = [
+        record('Linterna Táctica Recargable', 'a', brand='Genérico', category='iluminacion'),
+        record('Linterna Táctica Recargable', 'b', brand='Genérico', category='outdoor'),
+        record('Linterna Táctica Recargable', 'c', brand='genérico', category='iluminacion'),
+    ]
+    assert add_all(DuplicateIndex(), records) == [None, None, 'a']
+
+
+def test_clusters_join_the_canonical_record():
+    index = DuplicateIndex(0.75)
+    add_all(index, [record('Mosca Seca Adams Anzuelo 14', 'a'), record('Mosca Seca Adams Parachute Anzuelo 14', 'b'),
+                    record('Mosca Seca Adams Anzuelo 14 Pack', 'c')])
+    assert [[m.slug for m in members] for members in index.clusters()] == [['a', 'b', 'c']]
+
+
+def test_every_member_gets_the_cluster_id():
+    index = DuplicateIndex()
+    records = [record('Cuchara para Trolling Plateada', 'a'), record('Linterna Táctica', 'lone'),
+               record('cuchara trolling PLATEADA', 'b')]
+    assert [index.mark(r) for r in records] == [None, None, 'a']
+    assert [(r['cluster_id'], r.get('duplicate_of')) for r in records] == [('a', None), ('lone', None), ('a', 'a')]
+
+
+@pytest.mark.parametrize('threshold', [0, -0.5, 1.5])
+def test_threshold_range(threshold):
+    with pytest.raises(ValueError):
+        DuplicateIndex(threshold)
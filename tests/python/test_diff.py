@@ -0,0 +1,77 @@
+import copy
+import json
+
+from catalog_import.diff import diff_records
+from catalog_import.loader import apply_patch, connect, load_records
+
+
+def record(key, name, slug, variants, category='senuelos', description='Señuelo.'):
+    return {
+        "name": name, "category_slug": category, "brand_name": "Rapala", "sku": None, "description": description,
+        "sheet_source": "Senuelos de pesca", "import_key": key, "attributes": {"color": "Rojo"},
+        "shipping_class": "NORMAL",
+        "variants": [{"name": n, "sku": sku, "item_id": None, "attributes": {"Color": n} if n else {}, "import_key": sku}
+                     for n, sku in variants],
+        "slug": slug,
+    }
+
+
+BASE = [
+    record('family:1', 'Señuelo X-Rap', 'senuelo-x-rap', [('Rojo', 'XR-ROJO'), ('Azul', 'XR-AZUL')]),
+    record('sku:CU-1', 'Cuchara Plateada', 'cuchara-plateada', [('', 'CU-1')]),
+    record('sku:OLD-1', 'Señuelo Descontinuado', 'senuelo-descontinuado', [('', 'OLD-1')]),
+]
+
+
+def updated_records():
+    new = copy.deepcopy(BASE[:2])
+    # Renamed (so its slug would change), one variant gone, one added
+    new[0].update(name='Señuelo X-Rap 10cm', slug='senuelo-x-rap-10cm', description='Señuelo de 10 cm.')
+    new[0]['variants'] = [new[0]['variants'][0], {"name": "Verde", "sku": "XR-VERDE", "item_id": None,
+                                                  "attributes": {"Color": "Verde"}, "import_key": "XR-VERDE"}]
+    new.append(record('sku:NEW-1', 'Cuchillo Mora', 'cuchillo-mora', [('', 'NEW-1')], category='cuchillos'))
+    return new
+
+
+def test_diff_records():
+    patch = diff_records(BASE, updated_records())
+    assert patch['summary'] == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1}
+    assert [r['import_key'] for r in patch['added']] == ['sku:NEW-1']
+    assert patch['removed'] == [{"import_key": 'sku:OLD-1', "name": 'Señuelo Descontinuado', "slug": 'senuelo-descontinuado'}]
+
+    [changed] = patch['changed']
+    assert changed['base_slug'] == 'senuelo-x-rap'
+    assert set(changed['changes']) == {'name', 'description', 'variants'}
+    assert changed['changes']['name'] == {"old": 'Señuelo X-Rap', "new": 'Señuelo X-Rap 10cm'}
+    assert changed['changes']['variants'] == {"added": ['Verde'], "removed": ['Azul'], "changed": {}}
+
+
+def test_identical_exports_make_an_empty_patch():
+    patch = diff_records(BASE, copy.deepcopy(BASE))
+    assert patch['summary'] == {"added": 0, "changed": 0, "removed": 0, "unchanged": 3}
+
+
+def test_apply_patch(database):
+    load_records(database, copy.deepcopy(BASE))
+    loader = apply_patch(database, diff_records(BASE, updated_records()))
+    assert (loader.imported, loader.deactivated) == (1, 1)
+
+    conn = connect(database)
+    try:
+        products = {slug: (name, active, description) for slug, name, active, description in
+                    conn.execute("SELECT slug, name, is_active, description FROM products")}
+        # Updated in place under its old slug, so product URLs do not move
+        assert products['senuelo-x-rap'] == ('Señuelo X-Rap 10cm', 1, 'Señuelo de 10 cm.')
+        assert 'senuelo-x-rap-10cm' not in products
+        assert products['cuchara-plateada'][1] == 1
+        assert products['senuelo-descontinuado'][1] == 0
+        assert products['cuchillo-mora'][1] == 1
+
+        variants = {name: (sku, active, json.loads(attributes) if attributes else None)
+                    for name, sku, active, attributes in conn.execute(
+                        "SELECT v.name, v.sku, v.is_active, v.variant_attributes FROM product_variants v "
+                        "JOIN products p ON p.id = v.product_id WHERE p.slug = 'senuelo-x-rap'")}
+        assert variants == {'Rojo': ('XR-ROJO', 1, {"Color": "Rojo"}), 'Azul': ('XR-AZUL', 0, {"Color": "Azul"}),
+                            'Verde': ('XR-VERDE', 1, {"Color": "Verde"})}
+    finally:
+        conn.close()
@@ -0,0 +1,64 @@
+import json
+import os
+
+from catalog_import.output import read_export
+from catalog_import.watch import load_generator
+from conftest import REPO_ROOT
+from test_merge import write_workbook
+
+WORKBOOK = os.path.join(REPO_ROOT, 'public', 'Fichas_tecnicas-2026_02_14-18_22.xlsx')
+EXPORT = os.path.join(REPO_ROOT, 'import_data_final.json')
+
+
+def test_regenerated_export_is_byte_identical(tmp_path):
+    generate = load_generator(os.path.join(REPO_ROOT, 'generate_import_final.py'))
+    output = tmp_path / 'import_data_final.json'
+    generate(['--workbook', WORKBOOK, '--output', str(output), '--no-cache', '--no-checkpoint',
+              '--manifest', str(tmp_path / 'manifest.json'), '--search-index', str(tmp_path / 'index.bin'),
+              '--duplicates-report', str(tmp_path / 'duplicates.json'),
+              '--validation-report', str(tmp_path / 'validation.json'), '--metrics', str(tmp_path / 'metrics.jsonl'),
+              '--category-map', os.path.join(REPO_ROOT, 'catalog_import', 'category_map.json')])
+    with open(EXPORT, 'rb') as f:
+        assert output.read_bytes() == f.read()
+
+
+def generate_small(tmp_path, rows, *options):
+    """Run the generator on a small workbook of rows (test_merge layout), artifacts in tmp_path."""
+    generate = load_generator(os.path.join(REPO_ROOT, 'generate_import_final.py'))
+    path = write_workbook(tmp_path / 'catalogo.xlsx', rows)
+    generate(['--workbook', path, '--no-cache', '--no-checkpoint', '--manifest', str(tmp_path / 'manifest.json'),
+              '--no-search-index', '--duplicates-report', str(tmp_path / 'duplicates.json'),
+              '--validation-report', str(tmp_path / 'validation.json'), '--metrics', str(tmp_path / 'metrics.jsonl')]
+             + list(options))
+
+
+ROWS = [
+    ['', 'MLC1', 'SKU-1', '', 'Señuelo X-Rap', '', 'Rapala', 'X1'],
+    ['', 'MLC2', 'SKU-2', '', 'Cuchara Plateada', '', 'Mepps', 'C1'],
+    ['', 'MLC3', 'SKU-3', '', 'Señuelo Descontinuado', '', 'Rapala', 'D1'],
+]
+
+
+def test_formats_hold_the_same_records(tmp_path):
+    exports = {}
+    for name, options in [('export.json', []), ('export.ndjson', ['--format', 'ndjson']),
+                          ('export.ndjson.gz', ['--format', 'ndjson', '--gzip']), ('export.json.gz', ['--gzip'])]:
+        generate_small(tmp_path, ROWS, '--output', str(tmp_path / name), *options)
+        exports[name] = list(read_export(str(tmp_path / name)))
+    assert [r['name'] for r in exports['export.json']] == ['Señuelo X-Rap', 'Cuchara Plateada', 'Señuelo Descontinuado']
+    assert all(records == exports['export.json'] for records in exports.values())
+
+
+def test_incremental_run_writes_only_the_delta(tmp_path):
+    generate_small(tmp_path, ROWS, '--output', str(tmp_path / 'export.json'))
+    rows = [ROWS[0][:4] + ['Señuelo X-Rap 10 cm'] + ROWS[0][5:], ROWS[1], ['', 'MLC4', 'SKU-4', '', 'Cuchillo Mora', '', 'Morakniv', 'M1']]
+    generate_small(tmp_path, rows, '--incremental', '--delta-output', str(tmp_path / 'delta.json'),
+                   '--output', str(tmp_path / 'unused.json'))
+
+    with open(tmp_path / 'delta.json', encoding='utf-8') as f:
+        delta = json.load(f)
+    assert [r['import_key'] for r in delta['added']] == ['sku:SKU-4']
+    assert [(r['import_key'], r['name'], r['base_slug']) for r in delta['changed']] == [
+        ('sku:SKU-1', 'Señuelo X-Rap 10 cm', 'senuelo-x-rap')]
+    assert [r['import_key'] for r in delta['removed']] == ['sku:SKU-3']
+    assert not (tmp_path / 'unused.json').exists()
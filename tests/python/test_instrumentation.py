@@ -0,0 +1,48 @@
+import json
+import sys
+
+import pytest
+
+from catalog_import.instrumentation import Metrics, rss_mb
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_records(tmp_path):
+    path = str(tmp_path / 'metrics.jsonl')
+    metrics = Metrics(path, script='generate_import_final.py').start()
+    with metrics.stage('plan'):
+        pass
+    for _ in metrics.timed('transform', range(3)):
+        metrics.add('export', 0.5, rows=10)
+    metrics.add('transform', 0, 300)
+    metrics.sheet('Senuelos de pesca', 0.25, 300, 120, rss_delta_mb=1.234)
+    run = metrics.write(rows=300, products=120)
+
+    records = read_jsonl(path)
+    assert [(r['type'], r.get('stage') or r.get('sheet')) for r in records] == [
+        ('stage', 'plan'), ('stage', 'transform'), ('stage', 'export'), ('sheet', 'Senuelos de pesca'), ('run', None)]
+    assert {r['run_id'] for r in records} == {run['run_id']}
+    export = records[2]
+    assert (export['seconds'], export['rows'], export['rows_per_second']) == (1.5, 30, 20)
+    assert records[3]['rows_per_second'] == 1200 and records[3]['rss_delta_mb'] == 1.2
+    assert (run['script'], run['rows'], run['products']) == ('generate_import_final.py', 300, 120)
+
+    # Appended, not overwritten
+    Metrics(path).start().write()
+    assert len(read_jsonl(path)) == len(records) + 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="RSS is read from /proc")
+def test_stages_measure_rss_growth(tmp_path):
+    metrics = Metrics(str(tmp_path / 'metrics.jsonl')).start()
+    with metrics.stage('allocate'):
+        block = bytearray(64 * 2 ** 20)
+        block[::4096] = b'x' * len(block[::4096])
+    metrics.write()
+    stage = read_jsonl(str(tmp_path / 'metrics.jsonl'))[0]
+    assert stage['rss_delta_mb'] >= 32 and stage['rss_mb'] >= stage['rss_delta_mb']
+    assert rss_mb() >= 64
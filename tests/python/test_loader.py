@@ -0,0 +1,34 @@
+import copy
+import json
+
+from catalog_import.loader import apply_patch, connect, load_records
+
+
+def record(slug, **pictures):
+    return {"name": slug.title(), "slug": slug, "category_slug": "outdoor", "brand_name": "Rapala", "description": "",
+            "import_key": f"sku:{slug}", "variants": [{"name": "", "sku": slug, "attributes": {}, "import_key": f"sku:{slug}"}],
+            **pictures}
+
+
+def products(database):
+    conn = connect(database)
+    try:
+        return {slug: (main, json.loads(gallery) if gallery else None, thumbnail) for slug, main, gallery, thumbnail in
+                conn.execute("SELECT slug, main_image_url, gallery, thumbnail_url FROM products")}
+    finally:
+        conn.close()
+
+
+def test_pictures_are_stored_and_kept_by_updates(database):
+    fetched = record('a', main_image_url='/storage/products/import/1.png', gallery=['/storage/products/import/1.png'],
+                     thumbnail_url='/storage/products/import/1.thumb.png')
+    load_records(database, [fetched, record('b')])
+    assert products(database) == {
+        'a': ('/storage/products/import/1.png', ['/storage/products/import/1.png'], '/storage/products/import/1.thumb.png'),
+        'b': ('/images/imagenesdemo/5.png', None, None),
+    }
+
+    # A re-export without --fetch-images keeps the pictures already stored
+    changed = dict(copy.deepcopy(record('a')), description='Nuevo.', base_slug='a')
+    apply_patch(database, {"added": [], "changed": [changed], "removed": []})
+    assert products(database)['a'][2] == '/storage/products/import/1.thumb.png'
@@ -0,0 +1,80 @@
+import copy
+
+from catalog_import.loader import apply_patch, connect, load_records
+from catalog_import.manifest import ManifestBuilder, build_delta
+
+
+def record(key, name, slug, sku, description='Señuelo.'):
+    return {
+        "name": name, "category_slug": "senuelos", "brand_name": "Rapala", "sku": None, "description": description,
+        "sheet_source": "Senuelos de pesca", "import_key": key, "attributes": {},
+        "shipping_class": "NORMAL",
+        "variants": [{"name": "", "sku": sku, "item_id": None, "attributes": {}, "import_key": key}],
+        "slug": slug,
+    }
+
+
+BASE = [
+    record('sku:XR-1', 'Señuelo X-Rap', 'senuelo-x-rap', 'XR-1'),
+    record('sku:CU-1', 'Cuchara Plateada', 'cuchara-plateada', 'CU-1'),
+    record('sku:OLD-1', 'Señuelo Descontinuado', 'senuelo-descontinuado', 'OLD-1'),
+]
+
+
+def incremental(previous, records):
+    """What generate_import_final.py --incremental does with the records: (builder, delta)."""
+    builder = ManifestBuilder('catalogo.xlsx', previous)
+    added, changed = [], []
+    for r in records:
+        status = builder.add(r)
+        if status == 'added':
+            added.append(r)
+        elif status == 'changed':
+            changed.append(r)
+    return builder, build_delta(builder, added, changed)
+
+
+def test_manifest_statuses():
+    builder, delta = incremental(None, copy.deepcopy(BASE))
+    assert [r['import_key'] for r in delta['added']] == ['sku:XR-1', 'sku:CU-1', 'sku:OLD-1']
+    assert builder.manifest()['records']['sku:XR-1']['slug'] == 'senuelo-x-rap'
+
+    _, delta = incremental(builder.manifest(), copy.deepcopy(BASE[:2]))
+    assert (delta['added'], delta['changed']) == ([], [])
+    assert delta['removed'] == [{"import_key": 'sku:OLD-1', "name": 'Señuelo Descontinuado', "slug": 'senuelo-descontinuado'}]
+
+
+def test_repeated_keys_are_numbered():
+    builder, _ = incremental(None, [record('sku:A', 'A', 'a', 'A'), record('sku:A', 'A', 'a-1', 'A')])
+    assert list(builder.manifest()['records']) == ['sku:A', 'sku:A#2']
+
+
+def test_delta_round_trip(database):
+    builder, delta = incremental(None, copy.deepcopy(BASE))
+    load_records(database, delta['added'])
+
+    # Re-exported with the database's slugs taken (--slugs-from db): every slug moves
+    new = copy.deepcopy(BASE[:2])
+    for r in new:
+        r['slug'] += '-1'
+    new[0]['description'] = 'Señuelo de 10 cm.'
+    _, delta = incremental(builder.manifest(), new)
+    assert [(r['slug'], r['base_slug']) for r in delta['changed']] == [
+        ('senuelo-x-rap-1', 'senuelo-x-rap'), ('cuchara-plateada-1', 'cuchara-plateada')]
+
+    loader = apply_patch(database, delta)
+    assert (loader.imported, loader.updated, loader.deactivated) == (0, 2, 1)
+
+    conn = connect(database)
+    try:
+        products = {slug: (active, description) for slug, active, description in
+                    conn.execute("SELECT slug, is_active, description FROM products")}
+        variants = conn.execute("SELECT COUNT(*) FROM product_variants").fetchone()[0]
+    finally:
+        conn.close()
+    assert products == {
+        'senuelo-x-rap': (1, 'Señuelo de 10 cm.'),
+        'cuchara-plateada': (1, 'Señuelo.'),
+        'senuelo-descontinuado': (0, 'Señuelo.'),
+    }
+    assert variants == 3
@@ -0,0 +1,107 @@
+import json
+import os
+
+from openpyxl import Workbook
+
+from catalog_import.categories import load_rules
+from catalog_import.dedup import DuplicateIndex
+from catalog_import.merge import WorkbookMerge, merge_workbooks, newest_first
+from conftest import REPO_ROOT
+
+COLUMNS = ['FAMILY_ID', 'ID', 'SKU', 'VARIATION_ID', 'TITLE', 'COLOR_VARIATION-COLUMN', 'BRAND', 'MODEL']
+PLAN_OPTIONS = {"variants": True, "attributes": True, "category_overrides": None, "shipping": True, "images": False}
+
+
+def write_workbook(path, rows, sheet_name='Senuelos de pesca', more_sheets=None):
+    """A workbook laid out like MercadoLibre's exports: codes, markers, title, labels, then the rows.
+
+    more_sheets ({sheet name: rows}) adds sheets after the first.
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+    for name, sheet_rows in {sheet_name: rows, **(more_sheets or {})}.items():
+        ws = wb.create_sheet(name)
+        ws.append(COLUMNS)
+        ws.append(['FIXED'] * 5 + ['VARIATION', 'ATTRIBUTE', 'ATTRIBUTE'])
+        ws.append([f"{name}\n(*) Campos requeridos"] + [None] * (len(COLUMNS) - 1))
+        ws.append(['Agrupador de variantes', 'Número de publicación', 'SKU', 'Variación ID', 'Título', 'Color', 'Marca', 'Modelo'])
+        for row in sheet_rows:
+            ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+def merge(paths, **kwargs):
+    result = WorkbookMerge()
+    records = list(merge_workbooks(paths, load_rules(), PLAN_OPTIONS, result, use_cache=False, **kwargs))
+    return records, result.report()
+
+
+def test_newest_first_by_file_name_date(tmp_path):
+    older = str(tmp_path / 'Fichas_tecnicas-2026_02_10-09_00.xlsx')
+    newer = str(tmp_path / 'Fichas_tecnicas-2026_02_14-18_22.xlsx')
+    assert newest_first([older, newer]) == [newer, older]
+    assert newest_first([newer, older]) == [newer, older]
+
+
+def test_latest_variation_wins_and_families_keep_older_variations(tmp_path):
+    older = write_workbook(tmp_path / 'Fichas_tecnicas-2026_02_10-09_00.xlsx', [
+        ['F1', 'MLC1', 'SKU-RED', '11', 'Señuelo Viejo', 'Rojo', 'Rapala', 'X1'],
+        ['F1', 'MLC2', 'SKU-BLUE', '12', 'Señuelo Viejo', 'Azul', 'Rapala', 'X1'],
+        ['', 'MLC3', 'SKU-GONE', '', 'Cuchara Descontinuada', '', 'Rapala', 'C1'],
+    ])
+    newer = write_workbook(tmp_path / 'Fichas_tecnicas-2026_02_14-18_22.xlsx', [
+        ['F1', 'MLC1', 'SKU-RED', '11', 'Señuelo Nuevo', 'Rojo', 'Rapala', 'X1'],
+        ['F1', 'MLC4', 'SKU-GREEN', '14', 'Señuelo Nuevo', 'Verde', 'Rapala', 'X1'],
+    ])
+    records, report = merge([older, newer])
+
+    by_key = {r['import_key']: r for r in records}
+    assert set(by_key) == {'family:F1', 'sku:SKU-GONE'}
+    family = by_key['family:F1']
+    # Product fields from the newest row; every variation of either export, the newest version of each
+    assert family['name'] == 'Señuelo Nuevo'
+    assert family['workbook_source'] == 'Fichas_tecnicas-2026_02_14-18_22.xlsx'
+    assert [(v['sku'], v['name']) for v in family['variants']] == [
+        ('SKU-RED', 'Rojo'), ('SKU-GREEN', 'Verde'), ('SKU-BLUE', 'Azul')]
+    assert by_key['sku:SKU-GONE']['workbook_source'] == 'Fichas_tecnicas-2026_02_10-09_00.xlsx'
+
+    assert report['totals'] == {"rows": 5, "kept": 4, "superseded": 1, "keys": 4}
+    assert [(s['import_key'], s['superseded_by']) for s in report['superseded']] == [('sku:SKU-RED', newer)]
+
+
+def test_slugs_seeded_from_existing(tmp_path):
+    path = write_workbook(tmp_path / 'Fichas_tecnicas-2026_02_14-18_22.xlsx', [
+        ['', 'MLC1', 'SKU-1', '', 'Cuchara Plateada', '', 'Rapala', 'C1'],
+        ['', 'MLC2', 'SKU-2', '', 'Cuchara Plateada', '', 'Mepps', 'C2'],
+    ])
+    records, _ = merge([path], existing_slugs=['cuchara-plateada'])
+    assert [r['slug'] for r in records] == ['cuchara-plateada-1', 'cuchara-plateada-2']
+
+
+def test_families_are_grouped_per_sheet(tmp_path):
+    older = write_workbook(tmp_path / 'Fichas_tecnicas-2026_02_10-09_00.xlsx', [
+        ['F1', 'MLC2', 'SKU-BLUE', '12', 'Señuelo Viejo', 'Azul', 'Rapala', 'X1'],
+    ], more_sheets={'Carretes de pesca': [['F1', 'MLC9', 'SKU-REEL', '19', 'Carrete', 'Negro', 'Rapala', 'R1']]})
+    newer = write_workbook(tmp_path / 'Fichas_tecnicas-2026_02_14-18_22.xlsx', [
+        ['F1', 'MLC1', 'SKU-RED', '11', 'Señuelo Nuevo', 'Rojo', 'Rapala', 'X1'],
+    ], more_sheets={'Linternas': [['F1', 'MLC5', 'SKU-LAMP', '15', 'Linterna', 'Negro', 'Rapala', 'L1']]})
+    records, _ = merge([older, newer])
+
+    # Same FAMILY_ID in three sheets: three products; the sheet both workbooks have joins its rows
+    assert [(r['sheet_source'], r['import_key'], [v['sku'] for v in r['variants']]) for r in records] == [
+        ('Senuelos de pesca', 'family:F1', ['SKU-RED', 'SKU-BLUE']),
+        ('Linternas', 'family:F1#2', ['SKU-LAMP']),
+        ('Carretes de pesca', 'family:F1#3', ['SKU-REEL']),
+    ]
+
+
+def test_merging_one_workbook_gives_the_generators_export():
+    workbook = os.path.join(REPO_ROOT, 'public', 'Fichas_tecnicas-2026_02_14-18_22.xlsx')
+    rules = load_rules(os.path.join(REPO_ROOT, 'catalog_import', 'category_map.json'))
+    options = dict(PLAN_OPTIONS, category_overrides=rules.category_ids, images=True)
+    records = list(merge_workbooks([workbook], rules, options, WorkbookMerge(), use_cache=False, dedup=DuplicateIndex()))
+    for record in records:
+        assert record.pop('workbook_source') == os.path.basename(workbook)
+    with open(os.path.join(REPO_ROOT, 'import_data_final.json'), encoding='utf-8') as f:
+        assert json.dumps(records, indent=2, ensure_ascii=False) == f.read()
@@ -0,0 +1,62 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from catalog_import.output import ExportFile, read_export
+
+RECORDS = [{"name": "Señuelo X-Rap", "slug": "senuelo-x-rap"}, {"name": "Cuchillo Mora", "slug": "cuchillo-mora"}]
+
+
+def test_json_array_matches_json_dump(tmp_path):
+    path = str(tmp_path / 'export.json')
+    with ExportFile(path) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == json.dumps(RECORDS, indent=2, ensure_ascii=False)
+
+    with ExportFile(path) as writer:
+        pass
+    assert list(read_export(path)) == []
+
+
+def test_ndjson_and_gzip_round_trip(tmp_path):
+    for name, fmt, compress in [('export.ndjson', 'ndjson', False), ('export.ndjson.gz', 'ndjson', True),
+                                ('export.json.gz', 'json', True)]:
+        path = str(tmp_path / name)
+        with ExportFile(path, fmt, compress) as writer:
+            for record in RECORDS:
+                writer.write(record)
+        assert list(read_export(path)) == RECORDS
+    with gzip.open(str(tmp_path / 'export.ndjson.gz'), 'rt', encoding='utf-8') as f:
+        assert f.read().splitlines() == [json.dumps(r, ensure_ascii=False, separators=(',', ':')) for r in RECORDS]
+
+
+def test_plain_ndjson_is_streamed_to_the_target(tmp_path):
+    path = str(tmp_path / 'export.ndjson')
+    with ExportFile(path, 'ndjson') as writer:
+        writer.write(RECORDS[0])
+        writer.flush()
+        # Readable while the export is still being written
+        assert list(read_export(path)) == RECORDS[:1]
+        assert os.listdir(tmp_path) == ['export.ndjson']
+
+
+@pytest.mark.parametrize('name, fmt, compress', [('export.json', 'json', False), ('export.ndjson.gz', 'ndjson', True)])
+def test_failed_export_keeps_the_last_good_one(tmp_path, name, fmt, compress):
+    path = str(tmp_path / name)
+    with ExportFile(path, fmt, compress) as writer:
+        writer.write(RECORDS[0])
+    with pytest.raises(RuntimeError):
+        with ExportFile(path, fmt, compress) as writer:
+            writer.write(RECORDS[1])
+            raise RuntimeError('sheet failed')
+    assert list(read_export(path)) == RECORDS[:1]
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        ExportFile('export.csv', 'csv')
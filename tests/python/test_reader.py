@@ -0,0 +1,64 @@
+import pandas as pd
+from openpyxl import Workbook
+
+from catalog_import.reader import iter_records, iter_sheet_rows, open_workbook, sheet_frames
+from catalog_import.xlsx import column_rows, head_rows
+
+HEADER = ['SKU', 'Title', None, 'COLOR', 'COLOR', 'WEIGHT']
+ROWS = [
+    ['XR-1', 'Señuelo X-Rap', 'x', 'Rojo', 'Azul', 12.0],
+    [None, None, None, None, None, None],
+    ['CU-1', 'Cuchara', None, 'N/A', '#DIV/0!', 7.5],
+    ['CU-2', 'Cuchara Larga'],
+    [101, 'n/a', None, None, None, 3],
+]
+
+
+def write_sheet(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Senuelos de pesca'
+    ws.append(HEADER)
+    for row in ROWS:
+        ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+def read_sheet(path):
+    return open_workbook(path)['Senuelos de pesca']
+
+
+def test_frames_match_read_excel(tmp_path):
+    path = write_sheet(tmp_path / 'catalogo.xlsx')
+    expected = pd.read_excel(path, sheet_name='Senuelos de pesca', dtype=object).dropna(how='all')
+
+    columns, frames = sheet_frames(read_sheet(path), chunk_size=2)
+    frames = list(frames)
+    assert [len(df) for df in frames] == [2, 2]
+    assert columns == ['SKU', 'TITLE', 'UNNAMED: 2', 'COLOR', 'COLOR.1', 'WEIGHT']
+    assert columns == [str(c).upper() for c in expected.columns]
+    assert pd.concat(frames).astype(str).values.tolist() == expected.astype(str).values.tolist()
+
+
+def test_records_and_row_ranges(tmp_path):
+    path = write_sheet(tmp_path / 'catalogo.xlsx')
+    records = list(iter_records(read_sheet(path)))
+    assert [r['SKU'] for r in records] == ['XR-1', 'CU-1', 'CU-2', 101]
+    assert records[1] == {'SKU': 'CU-1', 'TITLE': 'Cuchara', 'UNNAMED: 2': None, 'COLOR': None, 'COLOR.1': None, 'WEIGHT': 7.5}
+    assert records[0]['WEIGHT'] == 12 and isinstance(records[0]['WEIGHT'], int)
+
+    # Excel rows 4-5: the row after the blank one, and the short one padded to the header width
+    _, rows = iter_sheet_rows(read_sheet(path), row_range=(4, 5), row_numbers=True)
+    assert list(rows) == [(4, ['CU-1', 'Cuchara', None, None, None, 7.5]), (5, ['CU-2', 'Cuchara Larga', None, None, None, None])]
+
+
+def test_xml_reader_agrees_with_openpyxl(tmp_path):
+    path = write_sheet(tmp_path / 'catalogo.xlsx')
+    rows = head_rows(path, 'Senuelos de pesca', 3)
+    assert rows[0] == HEADER[:2] + [None] + HEADER[3:]
+    assert rows[1] == ['XR-1', 'Señuelo X-Rap', 'x', 'Rojo', 'Azul', 12]
+    assert rows[2] == []
+
+    assert column_rows(path, 'Senuelos de pesca', [0, 5], min_row=2) == [
+        (2, ['XR-1', 12]), (4, ['CU-1', 7.5]), (5, ['CU-2', None]), (6, [101, 3])]
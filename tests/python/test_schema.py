@@ -0,0 +1,36 @@
+import itertools
+
+from catalog_import.schema import key_columns, resolve_columns
+
+# The generator's original get_col() candidates, best first
+BASELINE = {
+    'sku': ['SKU', 'PRODUCT_NUMBER', 'ID'],
+    'title': ['TÍTULO', 'TITLE', 'PRODUCT_NAME', 'NAME'],
+    'brand': ['BRAND', 'MARCA', 'MANUFACTURER'],
+    'model': ['MODEL', 'MODELO'],
+}
+ADDED = {'sku': ['SELLER_SKU', 'ITEM_ID'], 'title': ['TITULO'], 'brand': [], 'model': []}
+
+
+def keys_of(columns):
+    return key_columns(resolve_columns(columns))
+
+
+def test_key_columns_keep_the_baseline_precedence():
+    for key, candidates in BASELINE.items():
+        headers = candidates + ADDED[key]
+        for size in range(1, len(headers) + 1):
+            for columns in itertools.permutations(headers, size):
+                expected = next((c for c in candidates if c in columns), None)
+                if expected is not None:
+                    assert keys_of(list(columns))[key] == expected, columns
+
+
+def test_added_headers_key_sheets_without_a_baseline_column():
+    assert keys_of(['SELLER_SKU', 'PRODUCT_NUMBER'])['sku'] == 'PRODUCT_NUMBER'
+    assert keys_of(['SELLER_SKU', 'ID'])['sku'] == 'ID'
+    assert keys_of(['ITEM_ID', 'SELLER_SKU'])['sku'] == 'ITEM_ID'
+    assert keys_of(['SELLER_SKU', 'TITULO'])['sku'] == 'SELLER_SKU'
+    assert keys_of(['TITULO', 'TITLE'])['title'] == 'TITLE'
+    assert keys_of(['TITULO'])['title'] == 'TITULO'
+    assert keys_of(['PRICE']) == {'title': None, 'sku': None, 'brand': None, 'model': None}
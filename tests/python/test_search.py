@@ -0,0 +1,46 @@
+from catalog_import.search import IndexBuilder, SearchIndex
+
+
+def record(name, slug, category='outdoor', brand='Genérico'):
+    return {"name": name, "slug": slug, "category_slug": category, "brand_name": brand, "description": "", "attributes": {}}
+
+
+def build(tmp_path, records):
+    builder = IndexBuilder()
+    for r in records:
+        builder.add(r)
+    path = str(tmp_path / 'index.bin')
+    builder.write(path)
+    return SearchIndex(path)
+
+
+def test_repeated_tokens_count_once(tmp_path):
+    with build(tmp_path, [record('Rifle Aire Comprimido', 'rifle'), record('Mira Telescópica Rifle', 'mira')]) as index:
+        assert index.search('rifle rifle') == index.search('rifle')
+        assert index.search('rifle rifle', prefix=False) == index.search('rifle', prefix=False)
+        # The token typed last keeps matching as a prefix
+        assert index.search('tel rifle tel') == [('mira', 8)]
+
+
+def test_category_filter_and_prefix(tmp_path):
+    records = [record('Señuelo Rapala', 'senuelo', 'senuelos', 'Rapala'), record('Cuchillo Mora', 'cuchillo', 'cuchillos', 'Mora')]
+    with build(tmp_path, records) as index:
+        assert index.search('senuelo') == [('senuelo', 4)]
+        assert index.search('rapala', category='senuelos') == [('senuelo', 7)]
+        assert index.search('rapala', category='cuchillos') == []
+        assert index.search('rapala', category='nope') == []
+        assert index.search('cuch') == [('cuchillo', 4)]
+        assert index.search('cuch', prefix=False) == []
+
+
+def test_numeric_attributes_are_indexed_with_their_unit(tmp_path):
+    paraban = dict(record('Paraban Trolling', 'paraban'), attributes={
+        "length_cm": 10.7, "max_immersion_depth_m": 30, "hooks_number": 2, "is_articulated": True, "color": "Rojo"})
+    with build(tmp_path, [paraban, record('Paraban 10 Cuerpos', 'otro')]) as index:
+        for query in ['10.7', '10,7', '10.7 cm', '10,7cm', '30 m', '30m', 'paraban 30']:
+            assert [slug for slug, _ in index.search(query, prefix=False)] == ['paraban'], query
+        assert [slug for slug, _ in index.search('paraban 2', prefix=False)] == ['paraban']
+        # "10" is a whole term of the other title, not a piece of 10.7
+        assert [slug for slug, _ in index.search('10', prefix=False)] == ['otro']
+        assert [slug for slug, _ in index.search('10.')] == ['otro', 'paraban']
+        assert index.search('true', prefix=False) == []
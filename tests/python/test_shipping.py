@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from catalog_import.shipping import merge_shipping_class, plan_shipping, shipping_fields
+
+COLUMNS = ['WEIGHT', 'WEIGHT_UNIT', 'LENGTH', 'LENGTH_UNIT', 'WIDTH', 'WIDTH_UNIT', 'HEIGHT', 'HEIGHT_UNIT']
+
+
+def shipping(*rows):
+    """shipping_fields() of rows of (weight, weight unit, length, width, height, length unit)."""
+    cells = [[w, wu, l, lu, wi, lu, h, lu] for w, wu, l, wi, h, lu in rows]
+    text = np.array([[str(c) if c is not None else '' for c in row] for row in cells], dtype=object)
+    present = np.array([[c is not None for c in row] for row in cells])
+    return list(shipping_fields(plan_shipping(COLUMNS), {c: i for i, c in enumerate(COLUMNS)}, present, text))
+
+
+@pytest.mark.parametrize('weight, unit, expected', [
+    ('25', 'kg', 'NORMAL'),
+    ('25.001', 'kg', 'OVERSIZED'),
+    ('25000', 'g', 'NORMAL'),
+    ('25001', 'g', 'OVERSIZED'),
+])
+def test_weight_boundary(weight, unit, expected):
+    [(_, shipping_class)] = shipping((weight, unit, None, None, None, None))
+    assert shipping_class == expected
+
+
+@pytest.mark.parametrize('length, unit, expected', [
+    ('120', 'cm', 'NORMAL'),
+    ('120.5', 'cm', 'OVERSIZED'),
+    ('1200', 'mm', 'NORMAL'),
+    ('1.21', 'm', 'OVERSIZED'),
+])
+def test_longest_side_boundary(length, unit, expected):
+    [(_, shipping_class)] = shipping((None, None, '10', length, '10', unit))
+    assert shipping_class == expected
+
+
+def test_volumetric_weight_counts_when_heavier():
+    # 100 x 40 x 25 / 4000 = 25 kg volumetric: still normal; one more cm tips it over
+    [(payload, shipping_class)] = shipping(('2', 'kg', '100', '40', '25', 'cm'))
+    assert payload == {"weight_kg": 2.0, "length_cm": 100.0, "width_cm": 40.0, "height_cm": 25.0, "volumetric_weight_kg": 25.0}
+    assert shipping_class == 'NORMAL'
+    [(_, shipping_class)] = shipping(('2', 'kg', '101', '40', '25', 'cm'))
+    assert shipping_class == 'OVERSIZED'
+
+
+def test_unknown_or_implausible_measures_have_no_class():
+    rows = shipping((None, None, None, None, None, None), ('0', 'kg', None, None, None, None),
+                    ('5', 'furlongs', None, None, None, None), ('2000', 'kg', None, None, None, None))
+    assert rows == [({}, None)] * 4
+
+
+def test_variants_ship_as_the_most_restrictive():
+    assert merge_shipping_class(['NORMAL', None, 'OVERSIZED']) == 'OVERSIZED'
+    assert merge_shipping_class(['NORMAL', None]) == 'NORMAL'
+    assert merge_shipping_class([None]) is None
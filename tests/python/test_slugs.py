@@ -0,0 +1,33 @@
+from catalog_import.slugs import SlugIndex, slugify
+
+
+def test_slugify_matches_laravel():
+    assert slugify('Señuelo Rapala X-Rap 10cm') == 'senuelo-rapala-x-rap-10cm'
+    assert slugify('Caña  de_pescar @ 2,1m!') == 'cana-de-pescar-at-21m'
+    assert slugify('¡¿!?') == ''
+
+
+def test_collisions_get_numbered_in_claim_order():
+    slugs = SlugIndex()
+    assert [slugs.claim_name('Cuchillo Táctico') for _ in range(3)] == [
+        'cuchillo-tactico', 'cuchillo-tactico-1', 'cuchillo-tactico-2']
+    assert slugs.claim('') == 'producto'
+    assert slugs.claim('') == 'producto-1'
+    assert len(slugs) == 5
+
+
+def test_seeded_slugs_and_suffixes_claimed_as_is():
+    slugs = SlugIndex(['waders', 'waders-1'])
+    assert slugs.claim('waders') == 'waders-2'
+    # A title whose own slug is a suffixed one takes it, and the base skips it
+    slugs = SlugIndex(['remera'])
+    assert slugs.claim('remera-1') == 'remera-1'
+    assert slugs.claim('remera') == 'remera-2'
+    assert slugs.claim('remera') == 'remera-3'
+    assert 'remera-1' in slugs
+
+
+def test_same_claims_give_the_same_slugs():
+    names = ['Mochila 20L', 'Mochila 20l', 'Mochila 20 L', 'mochila-20l']
+    first, second = SlugIndex(['mochila-20l']), SlugIndex(['mochila-20l'])
+    assert [first.claim_name(n) for n in names] == [second.claim_name(n) for n in names]
@@ -0,0 +1,119 @@
+import os
+
+import openpyxl
+import pytest
+
+from catalog_import.loader import apply_price_stock, connect, current_price_stock, load_records
+from catalog_import.sync import parse_price, parse_stock, price_stock_delta, required_columns, row_key, workbook_price_stock
+from catalog_import.watch import load_generator
+from conftest import REPO_ROOT
+
+
+@pytest.mark.parametrize('value, expected', [
+    (14990, 14990.0),
+    (14990.5, 14990.5),
+    ('14990', 14990.0),
+    ('$14.990', 14990.0),
+    ('$ 1.234.567', 1234567.0),
+    ('14.990,50', 14990.5),
+    ('14,5', 14.5),
+    ('14.5', 14.5),
+    (' 0 ', 0.0),
+    (-5, None),
+    ('-5', None),
+    ('Precio', None),
+    ('', None),
+    (None, None),
+    (True, None),
+])
+def test_parse_price(value, expected):
+    assert parse_price(value) == expected
+
+
+def test_parse_stock():
+    assert parse_stock('12') == 12
+    assert parse_stock(3.0) == 3
+    assert parse_stock('2,5') is None
+    assert parse_stock('FIXED') is None
+
+
+def test_price_stock_delta():
+    values = {'sku:A': (100.0, 5), 'sku:B': (200.0, None), 'id:C': (None, 7), 'id:D:1': (300.004, 1), 'sku:NEW': (1.0, 1)}
+    current = {'sku:A': (100, 5), 'sku:B': (150, 2), 'id:C': (10, 0), 'id:D:1': (300.0, 0)}
+    delta = price_stock_delta('Fichas.xlsx', values, current, [('Hoja', 'ok', 6, 5, 2)], duplicates=1)
+    # Prices compare as stored (2 decimals); None keeps the stored value
+    assert delta['changes'] == {'sku:B': [200.0, None], 'id:C': [None, 7], 'id:D:1': [None, 1]}
+    assert delta['summary'] == {"keys": 5, "changed": 3, "prices": 1, "stocks": 2, "unchanged": 1, "unknown": 1,
+                                "duplicates": 1, "unkeyed": 2}
+    assert delta['sheets'] == [{"sheet": 'Hoja', "status": 'ok', "rows": 6, "keys": 5, "unkeyed": 2}]
+
+
+def test_row_key():
+    assert row_key(' XR-1 ', 'MLC1', 7, 'Señuelo') == 'sku:XR-1'
+    assert row_key('', 'MLC1', 7, 'Señuelo') == 'id:MLC1:7'
+    assert row_key(None, 'MLC1', None, 'Señuelo') == 'id:MLC1'
+    assert row_key(None, None, None, ' Señuelo  X-Rap ') == 'title:señuelo x-rap'
+    assert row_key(None, None, None, None) is None
+
+
+def test_required_columns_are_named():
+    message = required_columns()
+    for column in ('SKU', 'ID', 'TITLE', 'PRECIO', 'CANTIDAD'):
+        assert column in message
+
+
+def test_sync_matches_the_workbook_sku_of_cut_and_suffixed_variants(database):
+    long_sku = 'L' * 120
+    load_records(database, [
+        {"name": "A", "slug": "a", "category_slug": "outdoor", "brand_name": "Rapala", "description": "",
+         "variants": [{"name": "Rojo", "sku": "DUP", "attributes": {}}]},
+        {"name": "B", "slug": "b", "category_slug": "outdoor", "brand_name": "Rapala", "description": "",
+         "variants": [{"name": "Rojo", "sku": "DUP", "attributes": {}}, {"name": "Azul", "sku": long_sku, "attributes": {}}]},
+    ])
+    current = current_price_stock(database)
+    assert set(current) == {'sku:DUP', 'sku:' + long_sku}
+
+    delta = price_stock_delta('Fichas.xlsx', {'sku:DUP': (10.0, 3), 'sku:' + long_sku: (5.0, None)}, current)
+    assert apply_price_stock(database, delta['changes']) == 3
+
+    conn = connect(database)
+    try:
+        assert sorted(conn.execute("SELECT sku, price, stock_quantity FROM product_variants")) == [
+            ('DUP', 10, 3), ('DUP-1', 10, 3), (long_sku[:100], 5, 0)]
+        assert sorted(conn.execute("SELECT slug, base_price FROM products")) == [('a', 10), ('b', 5)]
+    finally:
+        conn.close()
+
+
+def test_rows_without_a_sku_sync_by_their_import_key(tmp_path, database):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Senuelos de pesca'
+    sheet.append(['SKU', 'ID', 'VARIATION_ID', 'FAMILY_ID', 'TITLE', 'BRAND', 'MODEL', 'PRECIO', 'CANTIDAD'])
+    sheet.append(['XR-1', 'MLC1', None, None, 'Señuelo X-Rap', 'Rapala', 'XR', 1000, 5])
+    sheet.append([None, 'MLC2', 11, 'F1', 'Señuelo Paseante Rojo', 'Rapala', 'SP', 2000, 1])
+    sheet.append([None, 'MLC2', 12, 'F1', 'Señuelo Paseante Azul', 'Rapala', 'SP', 2500, 0])
+    sheet.append([None, None, None, None, 'Cuchara Plateada', 'Rapala', None, 900, 3])
+    sheet.append([None, None, None, None, None, None, None, 100, 1])
+    path = str(tmp_path / 'Fichas.xlsx')
+    workbook.save(path)
+
+    generate = load_generator(os.path.join(REPO_ROOT, 'generate_import_final.py'))
+    generate(['--workbook', path, '--output', str(tmp_path / 'export.json'), '--no-cache', '--no-checkpoint',
+              '--manifest', str(tmp_path / 'manifest.json'), '--no-search-index', '--load-db', database,
+              '--duplicates-report', str(tmp_path / 'duplicates.json'),
+              '--validation-report', str(tmp_path / 'validation.json'), '--metrics', str(tmp_path / 'metrics.jsonl')])
+
+    values, sheets, duplicates = workbook_price_stock(path)
+    assert sheets == [('Senuelos de pesca', 'ok', 4, 4, 1)]
+    delta = price_stock_delta(path, values, current_price_stock(database), sheets, duplicates)
+    assert delta['summary']['unknown'] == 0
+    assert sorted(delta['changes']) == ['id:MLC2:11', 'id:MLC2:12', 'sku:XR-1', 'title:cuchara plateada']
+    assert apply_price_stock(database, delta['changes']) == 4
+
+    conn = connect(database)
+    try:
+        assert sorted(conn.execute("SELECT import_key, price, stock_quantity FROM product_variants")) == [
+            ('id:MLC2:11', 2000, 1), ('id:MLC2:12', 2500, 0), ('sku:XR-1', 1000, 5), ('title:cuchara plateada', 900, 3)]
+    finally:
+        conn.close()
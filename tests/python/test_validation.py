@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from catalog_import.pipeline import SheetReport
+from catalog_import.transform import build_column_plan, transform_sheet
+from catalog_import.validation import RULE_NAMES, SheetValidation, build_report
+
+COLUMNS = ['TITLE', 'SKU', 'BRAND', 'MODEL', 'COLOR']
+ROWS = [
+    ['Título', 'SKU', 'Marca', 'Modelo', 'Color'],
+    ['Señuelo X-Rap', 'XR-1', 'Rapala', 'X1', 'Rojo'],
+    [np.nan, 'XR-2', 'Rapala', 'X2', 'Azul'],
+    ['Señuelo X-Rap Azul', 'XR-1', 'N/A', 'X1', 'MANDATORY'],
+    ['Cuchara', np.nan, 'Mepps', 'C1', 'Plata'],
+    ['Cuchara Larga', 'XR-1', 'Mepps', 'C2', 'Oro'],
+]
+
+
+def validate(rows):
+    validation = SheetValidation('Senuelos de pesca')
+    df = pd.DataFrame(rows, columns=COLUMNS, dtype=object)
+    transform_sheet(df, build_column_plan(COLUMNS), 'Senuelos de pesca', 'senuelos', validation)
+    return validation
+
+
+def test_rules_flag_the_offending_rows():
+    summary = validate(ROWS).summary()
+    assert summary['rows'] == 6
+    assert {name: entry['rows'] for name, entry in summary['rules'].items()} == {
+        'missing_title': [2],
+        'metadata_row': [0],
+        'missing_sku': [4],
+        'duplicate_sku': [3, 5],
+        'placeholder_brand': [3],
+        'placeholder_value': [3],
+        # COLOR is read as its own unit column: every color is printed twice
+        'repeated_value': [1, 4, 5],
+    }
+
+
+def test_row_ranges_merge_into_the_sheet_validation():
+    whole = validate(ROWS)
+    # Each task numbers its rows from 0; merge() shifts them, and SKUs repeat across ranges
+    first, second = validate(ROWS[:4]), validate(ROWS[4:])
+    first.merge(second)
+    assert first.summary() == whole.summary()
+
+
+def test_report_totals():
+    report = build_report('catalogo.xlsx', [
+        SheetReport('Senuelos de pesca', 'ok', 3, 1, 0.1, None, validate(ROWS)),
+        SheetReport('Ayuda', 'no-title', 0, 1, 0.0, None),
+        SheetReport('Cuchillos', 'failed', 0, 1, 0.0, 'RuntimeError: boom'),
+    ])
+    assert list(report['rules']) == RULE_NAMES
+    assert report['totals']['duplicate_sku'] == 2 and report['totals']['missing_title'] == 1
+    assert report['sheets']['Ayuda'] == {"status": 'no-title'}
+    assert report['sheets']['Cuchillos'] == {"status": 'failed', "message": 'RuntimeError: boom'}
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from catalog_import.transform import build_column_plan, transform_sheet
+from catalog_import.variants import group_variants
+from test_merge import COLUMNS
+
+
+def grouped(rows):
+    df = pd.DataFrame(rows, columns=COLUMNS, dtype=object)
+    plan = build_column_plan(COLUMNS, variants=True, attributes=True)
+    return group_variants(transform_sheet(df, plan, 'Senuelos de pesca', 'senuelos'))
+
+
+def variants(product):
+    return [(v['name'], v['sku'], v['import_key']) for v in product['variants']]
+
+
+def test_families_are_grouped_in_order_of_first_appearance():
+    products = grouped([
+        ['F1', 'MLC1', 'R-1', '11', 'Señuelo X-Rap', 'Rojo', 'Rapala', 'X1'],
+        ['F1', 'MLC2', 'R-2', '12', 'Señuelo X-Rap', 'Azul', 'Rapala', 'X1'],
+        [np.nan, 'MLC3', 'C-1', np.nan, 'Cuchara', np.nan, 'Rapala', 'C1'],
+        [np.nan, 'MLC4', 'K-1', '41', 'Kit Señuelos', np.nan, 'Rapala', 'K1'],
+        [np.nan, 'MLC4', 'K-2', '42', 'Kit Señuelos Grande', np.nan, 'Rapala', 'K1'],
+        ['F1', 'MLC5', 'R-3', '13', 'Señuelo X-Rap Verde', 'Verde', 'Rapala', 'X1'],
+    ])
+    assert [(p['name'], p['import_key']) for p in products] == [
+        ('Señuelo X-Rap', 'family:F1'), ('Cuchara', 'sku:C-1'), ('Kit Señuelos', 'item:MLC4')]
+
+    # Named after the variation attributes, else the row's own title, else numbered
+    assert variants(products[0]) == [('Rojo', 'R-1', 'sku:R-1'), ('Azul', 'R-2', 'sku:R-2'), ('Verde', 'R-3', 'sku:R-3')]
+    assert [v['attributes'] for v in products[0]['variants']] == [{'Color': 'Rojo'}, {'Color': 'Azul'}, {'Color': 'Verde'}]
+    assert variants(products[1]) == [('Estándar', 'C-1', 'sku:C-1')]
+    assert variants(products[2]) == [('Variante 1', 'K-1', 'sku:K-1'), ('Kit Señuelos Grande', 'K-2', 'sku:K-2')]
+
+
+def test_a_family_keeps_its_key_with_one_variation():
+    one = grouped([['F1', 'MLC1', 'R-1', '11', 'Señuelo X-Rap', 'Rojo', 'Rapala', 'X1']])
+    two = grouped([['F1', 'MLC1', 'R-1', '11', 'Señuelo X-Rap', 'Rojo', 'Rapala', 'X1'],
+                   ['F1', 'MLC2', 'R-2', '12', 'Señuelo X-Rap', 'Azul', 'Rapala', 'X1']])
+    assert [p['import_key'] for p in one] == [p['import_key'] for p in two] == ['family:F1']
+    assert variants(one[0]) == [('Rojo', 'R-1', 'sku:R-1')]
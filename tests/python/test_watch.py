@@ -0,0 +1,98 @@
+import os
+import zipfile
+
+from catalog_import.watch import ARTIFACTS, Debouncer, Watcher
+
+
+def write_xlsx(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('xl/workbook.xml', '<workbook/>')
+
+
+def make_watcher(tmp_path, generate):
+    directory = tmp_path / 'in'
+    directory.mkdir(exist_ok=True)
+    return Watcher(generate, str(directory), output_dir=str(tmp_path / 'out'), settle=1.0,
+                   state_path=str(tmp_path / 'watch.json'))
+
+
+def test_every_artifact_is_per_workbook(tmp_path):
+    calls = []
+    watcher = make_watcher(tmp_path, calls.append)
+    workbook = tmp_path / 'in' / 'Fichas_tecnicas-2026_02_14-18_22.xlsx'
+    write_xlsx(workbook)
+    watcher.process(str(workbook))
+
+    argv = calls[0]
+    options = dict(zip(argv[::2], argv[1::2]))
+    stem = os.path.join(str(tmp_path / 'out'), 'Fichas_tecnicas-2026_02_14-18_22')
+    assert options['--workbook'] == str(workbook)
+    assert {option: options[option] for option, _ in ARTIFACTS} == {option: stem + suffix for option, suffix in ARTIFACTS}
+
+    # Same content again: not re-imported
+    watcher.process(str(workbook))
+    assert len(calls) == 1
+
+
+def test_poll_skips_files_deleted_after_settling(tmp_path, monkeypatch):
+    calls = []
+    watcher = make_watcher(tmp_path, calls.append)
+    kept, deleted = tmp_path / 'in' / 'Fichas_tecnicas-a.xlsx', tmp_path / 'in' / 'Fichas_tecnicas-b.xlsx'
+    write_xlsx(kept)
+    write_xlsx(deleted)
+    watcher.poll(now=0.0)
+
+    # Gone between the scan and the import
+    update = watcher.debouncer.update
+
+    def update_then_delete(stats, now):
+        settled = update(stats, now)
+        if deleted.exists():
+            deleted.unlink()
+        return settled
+
+    monkeypatch.setattr(watcher.debouncer, 'update', update_then_delete)
+    watcher.poll(now=5.0)
+    assert [argv[1] for argv in calls] == [str(kept)]
+    assert watcher.failed == 0
+
+
+def test_debouncer_reports_a_version_once_settled(tmp_path):
+    path = str(tmp_path / 'Fichas_tecnicas-a.xlsx')
+    write_xlsx(path)
+    debouncer = Debouncer(settle=2.0)
+    assert debouncer.update({path: (10, 1)}, now=0.0) == []
+    assert debouncer.next_check(now=0.5) == 1.5
+    assert debouncer.update({path: (10, 1)}, now=1.9) == []
+    assert debouncer.update({path: (10, 1)}, now=2.0) == [path]
+    assert debouncer.next_check(now=2.0) is None
+    # Same version: not again
+    assert debouncer.update({path: (10, 1)}, now=10.0) == []
+
+
+def test_debouncer_restarts_on_every_change(tmp_path):
+    path = str(tmp_path / 'Fichas_tecnicas-a.xlsx')
+    write_xlsx(path)
+    debouncer = Debouncer(settle=2.0)
+    debouncer.update({path: (10, 1)}, now=0.0)
+    debouncer.update({path: (20, 2)}, now=1.5)
+    assert debouncer.update({path: (20, 2)}, now=3.0) == []
+    assert debouncer.update({path: (20, 2)}, now=3.5) == [path]
+    # A new version settles again
+    debouncer.update({path: (30, 3)}, now=4.0)
+    assert debouncer.update({path: (30, 3)}, now=6.0) == [path]
+
+
+def test_debouncer_skips_incomplete_and_vanished_files(tmp_path):
+    partial = tmp_path / 'Fichas_tecnicas-partial.xlsx'
+    partial.write_bytes(b'PK\x03\x04 still copying')
+    gone = str(tmp_path / 'Fichas_tecnicas-gone.xlsx')
+    debouncer = Debouncer(settle=1.0)
+    debouncer.update({str(partial): (20, 1), gone: (5, 1)}, now=0.0)
+    debouncer.update({str(partial): (20, 1)}, now=0.5)
+    assert gone not in debouncer.pending
+    assert debouncer.update({str(partial): (20, 1)}, now=1.0) == []
+    # Not a zip yet: looked at again once it changes
+    write_xlsx(partial)
+    debouncer.update({str(partial): (99, 2)}, now=2.0)
+    assert debouncer.update({str(partial): (99, 2)}, now=3.0) == [str(partial)]